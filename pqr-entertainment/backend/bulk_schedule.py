@@ -0,0 +1,277 @@
+"""Bulk schedule import: validate a whole week plan in memory, insert the rest.
+
+A plan is a list of shows (dicts, e.g. rows of a CSV file or a JSON list):
+
+    theatre_id | theatre + city, screen_number,
+    movie_id | movie | event_id | event,
+    start_time | date + start, [end_time | end]  (default: start + duration),
+    [price_economy, price_central, price_premium]
+
+Instead of one has_conflict() / has_city_movie_for_date() query per show,
+validate_plan() reads the theatres, titles and the existing shows of the
+plan's date range once and checks every row in a single pass in start order:
+
+- screen overlap with existing shows: per screen, the existing shows go
+  into an interval tree (backend.intervals) and every plan row of that
+  screen is checked in one batch, as scheduling.has_conflicts does;
+- screen overlap within the plan: accepted rows of a screen never overlap
+  each other, so only the last accepted end matters (a sweep);
+- one show per movie per city per day: a set of (city, movie_id, date)
+  seeded from the database and extended with each accepted row.
+
+When two plan rows clash, the one that starts first (then the one listed
+first) wins. Everything here takes an open sqlite3 connection with
+row_factory = sqlite3.Row, so it works on the app's pooled connection
+(inside db.transaction()) as well as from utility_scripts/bulk_schedule_import.py.
+"""
+import csv
+import json
+import sqlite3
+from datetime import datetime, timedelta
+
+from backend import seats as seat_codec
+from backend.intervals import ScreenIntervals
+
+DEFAULT_PRICES = (150.0, 220.0, 320.0)
+
+
+def read_plan(path: str) -> list:
+    """Load a plan from a .json file (a list, or {"shows": [...]}) or a CSV
+    file with a header row."""
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('shows') or []
+        return list(data)
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _field(raw: dict, key: str):
+    v = raw.get(key)
+    if isinstance(v, str):
+        v = v.strip()
+    return None if v in (None, '') else v
+
+
+def _parse_time(raw: dict, key: str, clock_key: str):
+    """ISO timestamp from raw[key], or from raw['date'] + raw[clock_key] (HH:MM)"""
+    value = _field(raw, key)
+    if value is None and _field(raw, 'date') and _field(raw, clock_key):
+        value = f"{_field(raw, 'date')}T{_field(raw, clock_key)}"
+    return None if value is None else datetime.fromisoformat(str(value))
+
+
+class _Catalog:
+    """Theatres, movies and events, read once per validation"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.theatres = {r['theatre_id']: r for r in conn.execute(
+            "SELECT theatre_id, city, name, seating_schema_json FROM theatres")}
+        self.theatre_names = {}
+        for r in self.theatres.values():
+            self.theatre_names.setdefault((r['city'].lower(), r['name'].lower()), []).append(r['theatre_id'])
+        self.movies, self.movie_titles = self._titles(conn, "SELECT movie_id, title, duration_seconds FROM movies")
+        self.events, self.event_titles = self._titles(conn, "SELECT event_id, title, duration_seconds FROM events")
+
+    @staticmethod
+    def _titles(conn, query):
+        by_id, by_title = {}, {}
+        for r in conn.execute(query):
+            by_id[r[0]] = r['duration_seconds']
+            by_title.setdefault(r['title'].lower(), []).append(r[0])
+        return by_id, by_title
+
+    @staticmethod
+    def _lookup(raw, id_key, title_key, by_id, by_title, what):
+        """(id, error) for an id or an unambiguous title"""
+        if _field(raw, id_key) is not None:
+            try:
+                ident = int(_field(raw, id_key))
+            except (TypeError, ValueError):
+                return None, f"invalid {id_key}"
+            return (ident, None) if ident in by_id else (None, f"unknown {what} {ident}")
+        title = str(_field(raw, title_key))
+        ids = by_title.get(title.lower(), [])
+        if len(ids) != 1:
+            return None, f"{'ambiguous' if ids else 'unknown'} {what} '{title}'"
+        return ids[0], None
+
+    def theatre(self, raw):
+        if _field(raw, 'theatre_id') is None and _field(raw, 'theatre') is None:
+            return None, "missing theatre_id (or theatre + city)"
+        if _field(raw, 'theatre_id') is not None:
+            return self._lookup(raw, 'theatre_id', 'theatre', self.theatres, {}, 'theatre')
+        ids = self.theatre_names.get((str(_field(raw, 'city') or '').lower(), str(_field(raw, 'theatre')).lower()), [])
+        if len(ids) != 1:
+            return None, f"{'ambiguous' if ids else 'unknown'} theatre '{_field(raw, 'theatre')}' in '{_field(raw, 'city')}'"
+        return ids[0], None
+
+    def title(self, raw):
+        """('movie' | 'event', id, duration_seconds, error)"""
+        has_movie = _field(raw, 'movie_id') is not None or _field(raw, 'movie') is not None
+        has_event = _field(raw, 'event_id') is not None or _field(raw, 'event') is not None
+        if has_movie == has_event:
+            return None, None, None, "give exactly one of movie_id/movie or event_id/event"
+        if has_movie:
+            ident, err = self._lookup(raw, 'movie_id', 'movie', self.movies, self.movie_titles, 'movie')
+            return 'movie', ident, self.movies.get(ident), err
+        ident, err = self._lookup(raw, 'event_id', 'event', self.events, self.event_titles, 'event')
+        return 'event', ident, self.events.get(ident), err
+
+
+def _normalize(raw: dict, catalog: _Catalog):
+    """One plan row as a show dict, or (None, reason)"""
+    if not isinstance(raw, dict):
+        return None, "not a mapping"
+    theatre_id, err = catalog.theatre(raw)
+    if err:
+        return None, err
+    theatre = catalog.theatres[theatre_id]
+    try:
+        screen_number = int(_field(raw, 'screen_number'))
+    except (TypeError, ValueError):
+        return None, "invalid screen_number"
+    screens = seat_codec.screen_count(theatre['seating_schema_json'])
+    if not 1 <= screen_number <= screens:
+        return None, f"screen_number {screen_number} out of range 1-{screens} for theatre {theatre_id}"
+    kind, title_id, duration, err = catalog.title(raw)
+    if err:
+        return None, err
+    try:
+        start = _parse_time(raw, 'start_time', 'start')
+        end = _parse_time(raw, 'end_time', 'end')
+    except ValueError:
+        return None, "invalid start/end time"
+    if start is None:
+        return None, "missing start_time (or date + start)"
+    if end is None:
+        if not duration:
+            return None, f"missing end_time and the {kind} has no duration"
+        end = start + timedelta(seconds=int(duration))
+    if end <= start:
+        return None, "end time must be after start time"
+    try:
+        prices = tuple(float(_field(raw, k) if _field(raw, k) is not None else d)
+                       for k, d in zip(('price_economy', 'price_central', 'price_premium'), DEFAULT_PRICES))
+    except (TypeError, ValueError):
+        return None, "invalid price"
+    return {
+        'theatre_id': theatre_id, 'city': theatre['city'], 'screen_number': screen_number,
+        'movie_id': title_id if kind == 'movie' else None,
+        'event_id': title_id if kind == 'event' else None,
+        'start': start, 'end': end, 'prices': prices,
+        'layout': seat_codec.layout_from_schema(theatre['seating_schema_json']),
+    }, None
+
+
+def _load_existing(conn: sqlite3.Connection, shows):
+    """Existing shows around the plan's date range: per-screen interval
+    trees plus {(city, movie_id, date): screen_id}."""
+    if not shows:
+        return {}, {}
+    first = min(s['start'] for s in shows)
+    last = max(s['end'] for s in shows)
+    rows = conn.execute(
+        "SELECT ss.screen_id, ss.theatre_id, ss.screen_number, ss.movie_id, ss.start_time, ss.end_time, ss.show_date, t.city "
+        "FROM scheduled_screens ss JOIN theatres t ON ss.theatre_id = t.theatre_id "
+        "WHERE ss.show_date BETWEEN DATE(?, '-1 day') AND DATE(?)",
+        (first.isoformat(), last.isoformat())
+    ).fetchall()
+    per_screen, city_days = {}, {}
+    for r in rows:
+        per_screen.setdefault((r['theatre_id'], r['screen_number']), ScreenIntervals()).add(
+            r['screen_id'], datetime.fromisoformat(r['start_time']), datetime.fromisoformat(r['end_time']))
+        if r['movie_id'] is not None:
+            city_days.setdefault((r['city'], r['movie_id'], r['show_date']), r['screen_id'])
+    return per_screen, city_days
+
+
+def validate_plan(conn: sqlite3.Connection, plan):
+    """Check every row of a plan against the database and each other.
+    Returns (valid, violations): valid shows in start order, and one
+    {'row': n, 'reasons': [...]} per rejected row (n is 1-based in plan order).
+    """
+    catalog = _Catalog(conn)
+    shows, violations = [], []
+    for n, raw in enumerate(plan, start=1):
+        show, err = _normalize(raw, catalog)
+        if err:
+            violations.append({'row': n, 'reasons': [err]})
+        else:
+            show['row'] = n
+            shows.append(show)
+
+    existing, city_days = _load_existing(conn, shows)
+    by_screen = {}
+    for show in shows:
+        by_screen.setdefault((show['theatre_id'], show['screen_number']), []).append(show)
+    clashes = {}          # row -> screen_id of an existing show it overlaps
+    for screen, group in by_screen.items():
+        if screen in existing:
+            found = existing[screen].first_overlaps([(s['start'], s['end']) for s in group])
+            clashes.update((s['row'], sid) for s, sid in zip(group, found) if sid is not None)
+    last_on_screen = {}   # (theatre_id, screen_number) -> last accepted show
+    taken = {}            # (city, movie_id, date) -> row of the accepted show
+    valid = []
+    for show in sorted(shows, key=lambda s: (s['start'], s['row'])):
+        screen = (show['theatre_id'], show['screen_number'])
+        day = (show['city'], show['movie_id'], show['start'].date().isoformat())
+        reasons = []
+        if show['row'] in clashes:
+            reasons.append(f"overlaps existing show {clashes[show['row']]} on theatre {screen[0]} screen {screen[1]}")
+        prev = last_on_screen.get(screen)
+        if prev is not None and prev['end'] > show['start']:
+            reasons.append(f"overlaps row {prev['row']} on theatre {screen[0]} screen {screen[1]}")
+        if show['movie_id'] is not None:
+            if day in city_days:
+                reasons.append(f"movie {show['movie_id']} already has show {city_days[day]} in {day[0]} on {day[2]}")
+            elif day in taken:
+                reasons.append(f"movie {show['movie_id']} already scheduled by row {taken[day]} in {day[0]} on {day[2]}")
+        if reasons:
+            violations.append({'row': show['row'], 'reasons': reasons})
+            continue
+        last_on_screen[screen] = show
+        if show['movie_id'] is not None:
+            taken[day] = show['row']
+        valid.append(show)
+    violations.sort(key=lambda v: v['row'])
+    return valid, violations
+
+
+def _insert(conn: sqlite3.Connection, shows):
+    conn.executemany(
+        """INSERT INTO scheduled_screens (theatre_id, movie_id, event_id, screen_number, start_time, end_time,
+               seat_bits, seat_rows, seat_cols, price_economy, price_central, price_premium)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [(s['theatre_id'], s['movie_id'], s['event_id'], s['screen_number'], s['start'].isoformat(), s['end'].isoformat(),
+          seat_codec.empty(*s['layout']), *s['layout'], *s['prices'])
+         for s in shows]
+    )
+
+
+def import_plan(conn: sqlite3.Connection, plan, strict: bool = False, dry_run: bool = False) -> dict:
+    """Validate a plan and insert its valid rows in one transaction.
+    strict: insert nothing if any row is rejected. dry_run: validate only.
+    Runs inside the caller's transaction if one is open (e.g. in
+    db.transaction()), otherwise in its own BEGIN IMMEDIATE ... COMMIT, so
+    no other writer can slip a clashing show in between validation and insert.
+    Returns {'total', 'valid', 'inserted', 'violations'}.
+    """
+    own_tx = not conn.in_transaction and not dry_run
+    if own_tx:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        valid, violations = validate_plan(conn, plan)
+        inserted = 0
+        if valid and not dry_run and not (strict and violations):
+            _insert(conn, valid)
+            inserted = len(valid)
+        if own_tx:
+            conn.commit()
+    except BaseException:
+        if own_tx:
+            conn.rollback()
+        raise
+    return {'total': len(plan), 'valid': len(valid), 'inserted': inserted, 'violations': violations}
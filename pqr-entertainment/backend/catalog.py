@@ -0,0 +1,67 @@
+from dbwrap import db
+
+# Genre/language/actor facets over the junction tables of migration 10
+# (movie_genres, movie_languages, movie_actors, event_genres). Triggers on
+# movies and events keep them in step with the *_json columns, so a filter
+# dropdown or a genre chart is one GROUP BY over an index instead of loading
+# and parsing every row's JSON.
+
+# facet name -> (junction table, value column, catalog table, key column, owner column)
+FACETS = {
+    'movie_genre': ('movie_genres', 'genre', 'movies', 'movie_id', 'producer_id'),
+    'movie_language': ('movie_languages', 'language', 'movies', 'movie_id', 'producer_id'),
+    'movie_actor': ('movie_actors', 'actor', 'movies', 'movie_id', 'producer_id'),
+    'event_genre': ('event_genres', 'genre', 'events', 'event_id', 'host_id'),
+}
+
+
+def _facet(facet: str):
+    try:
+        return FACETS[facet]
+    except KeyError:
+        raise ValueError(f"Unknown facet: {facet}") from None
+
+
+def facet_counts(facet: str, producer_id: int = None):
+    """[(value, count)] for a facet, most common first; producer_id limits
+    it to one producer's movies (or hosted events)"""
+    table, value, source, key, owner = _facet(facet)
+    if producer_id is None:
+        rows = db.execute_query(
+            f"SELECT {value} AS value, COUNT(*) AS n FROM {table} GROUP BY {value}", fetch_all=True)
+    else:
+        rows = db.execute_query(
+            f"""SELECT f.{value} AS value, COUNT(*) AS n FROM {source} s JOIN {table} f ON f.{key} = s.{key}
+                WHERE s.{owner} = ? GROUP BY f.{value}""",
+            (producer_id,), fetch_all=True)
+    return sorted(((r['value'], r['n']) for r in rows or []), key=lambda vc: (-vc[1], vc[0]))
+
+
+def facet_values(facet: str, producer_id: int = None):
+    """Sorted distinct values of a facet (for filter dropdowns)"""
+    table, value, source, key, owner = _facet(facet)
+    if producer_id is None:
+        rows = db.execute_query(f"SELECT DISTINCT {value} AS value FROM {table} ORDER BY {value}", fetch_all=True)
+    else:
+        rows = db.execute_query(
+            f"""SELECT DISTINCT f.{value} AS value FROM {source} s JOIN {table} f ON f.{key} = s.{key}
+                WHERE s.{owner} = ? ORDER BY f.{value}""",
+            (producer_id,), fetch_all=True)
+    return [r['value'] for r in rows or []]
+
+
+def genre_counts(producer_id: int = None) -> dict:
+    """{genre: titles} over movies and events together"""
+    counts = {}
+    for facet in ('movie_genre', 'event_genre'):
+        for value, n in facet_counts(facet, producer_id):
+            counts[value] = counts.get(value, 0) + n
+    return counts
+
+
+def filter_sql(facet: str, alias: str = None) -> str:
+    """WHERE-clause fragment keeping rows tagged with one facet value; bind
+    the value as its single parameter. alias qualifies the key column."""
+    table, value, source, key, owner = _facet(facet)
+    column = f"{alias}.{key}" if alias else key
+    return f"{column} IN (SELECT {key} FROM {table} WHERE {value} = ?)"
@@ -0,0 +1,137 @@
+import random
+
+# Interval tree for the shows of one screen.
+# A treap ordered by (start, screen_id), where every node also holds the
+# latest end in its subtree. An overlap query for [start, end) skips any
+# subtree whose latest end is not after start, and everything right of the
+# first node starting at or after end, so it costs O(log n + k) for k
+# overlapping shows however long the longest show is. Inserting or removing
+# a show is O(log n) expected and keeps the latest ends up to date on the
+# way back up.
+
+
+class _Node:
+    __slots__ = ('start', 'sid', 'end', 'max_end', 'priority', 'left', 'right')
+
+    def __init__(self, start, end, sid, priority):
+        self.start, self.end, self.sid = start, end, sid
+        self.max_end = end
+        self.priority = priority
+        self.left = self.right = None
+
+    def update(self):
+        m = self.end
+        if self.left is not None and self.left.max_end > m:
+            m = self.left.max_end
+        if self.right is not None and self.right.max_end > m:
+            m = self.right.max_end
+        self.max_end = m
+
+
+def _rotate_right(node):
+    top = node.left
+    node.left, top.right = top.right, node
+    node.update()
+    top.update()
+    return top
+
+
+def _rotate_left(node):
+    top = node.right
+    node.right, top.left = top.left, node
+    node.update()
+    top.update()
+    return top
+
+
+def _insert(node, new):
+    if node is None:
+        return new
+    if (new.start, new.sid) < (node.start, node.sid):
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            return _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            return _rotate_left(node)
+    node.update()
+    return node
+
+
+def _remove(node, start, sid):
+    if node is None:
+        return None
+    if (start, sid) == (node.start, node.sid):
+        if node.left is None:
+            return node.right
+        if node.right is None:
+            return node.left
+        if node.left.priority > node.right.priority:
+            node = _rotate_right(node)
+            node.right = _remove(node.right, start, sid)
+        else:
+            node = _rotate_left(node)
+            node.left = _remove(node.left, start, sid)
+    elif (start, sid) < (node.start, node.sid):
+        node.left = _remove(node.left, start, sid)
+    else:
+        node.right = _remove(node.right, start, sid)
+    node.update()
+    return node
+
+
+class ScreenIntervals:
+    """Shows of one (theatre_id, screen_number) as [start, end) intervals"""
+
+    def __init__(self, rows=()):
+        self._root = None
+        self._shows = {}  # screen_id -> (start, end)
+        self._random = random.Random(0)
+        for sid, start, end in rows:
+            self.add(sid, start, end)
+
+    def __len__(self):
+        return len(self._shows)
+
+    def add(self, sid, start, end):
+        """Insert a show, replacing the one with the same screen_id"""
+        self.remove(sid)
+        self._shows[sid] = (start, end)
+        self._root = _insert(self._root, _Node(start, end, sid, self._random.random()))
+
+    def remove(self, sid):
+        """Drop a show by screen_id; nothing happens if it is not here"""
+        show = self._shows.pop(sid, None)
+        if show is not None:
+            self._root = _remove(self._root, show[0], sid)
+
+    def overlapping(self, start, end, exclude_sid=None) -> list:
+        """screen_ids of the shows overlapping [start, end), by start"""
+        found = []
+        self._collect(self._root, start, end, exclude_sid, found, None)
+        return found
+
+    def first_overlap(self, start, end, exclude_sid=None):
+        """screen_id of the earliest show overlapping [start, end), or None"""
+        found = []
+        self._collect(self._root, start, end, exclude_sid, found, 1)
+        return found[0] if found else None
+
+    def first_overlaps(self, slots, exclude_sid=None) -> list:
+        """first_overlap for each (start, end) in slots"""
+        return [self.first_overlap(start, end, exclude_sid) for start, end in slots]
+
+    def _collect(self, node, start, end, exclude_sid, found, limit):
+        # in order, so the earliest overlap is found first
+        while node is not None and node.max_end > start:
+            self._collect(node.left, start, end, exclude_sid, found, limit)
+            if limit is not None and len(found) >= limit:
+                return
+            if node.start >= end:
+                return
+            if node.end > start and node.sid != exclude_sid:
+                found.append(node.sid)
+                if limit is not None and len(found) >= limit:
+                    return
+            node = node.right
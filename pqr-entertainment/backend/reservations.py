@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+from dbwrap import db
+from backend import seats as seat_codec
+
+# Seat reservation engine.
+# A show's seat_bits is only ever replaced with a compare-and-swap on
+# scheduled_screens.seat_version: the UPDATE matches only if nobody else has
+# written the seat map since we read it. A lost swap re-reads and retries, so
+# concurrent bookers on one show can never overwrite each other's seats.
+#
+# Seats picked in the seat grid are held in seat_holds for HOLD_TTL_SECONDS
+# so nobody else can buy them before payment; the sweeper thread deletes
+# expired holds. Triggers keep scheduled_screens.seats_held in step, and held
+# seats are excluded from seats_available.
+
+MAX_ATTEMPTS = 8
+HOLD_TTL_SECONDS = int(os.environ.get('TBMS_HOLD_TTL', 300))
+SWEEP_INTERVAL_SECONDS = 15
+
+_sweeper = None
+_sweeper_stop = threading.Event()
+
+
+def _held_by_others(conn, screen_id: int, user_id, now: float):
+    rows = conn.execute(
+        "SELECT seat FROM seat_holds WHERE screen_id = ? AND expires_at > ? AND user_id IS NOT ?",
+        (screen_id, now, user_id)
+    ).fetchall()
+    return {r['seat'] for r in rows}
+
+
+def _check_seat(label, rows, cols, bits):
+    """(row, col) of a free, valid seat, or None"""
+    try:
+        r, c = seat_codec.seat_position(label, rows)
+    except ValueError:
+        return None
+    if not (0 <= r < rows and 0 <= c < cols) or seat_codec.is_booked(bits, cols, r, c):
+        return None
+    return r, c
+
+
+def _swap_seat_bits(screen_id: int, labels, booked: bool, all_or_nothing: bool, user_id=None):
+    """Shared CAS loop for reserve/release. Returns (changed, rejected) labels."""
+    for _ in range(MAX_ATTEMPTS):
+        with db.transaction() as conn:
+            row = conn.execute(
+                "SELECT seat_bits, seat_rows, seat_cols, seat_version FROM scheduled_screens WHERE screen_id = ?",
+                (screen_id,)
+            ).fetchone()
+            if row is None:
+                return [], list(labels)
+            bits, rows, cols, version = row['seat_bits'], row['seat_rows'], row['seat_cols'], row['seat_version']
+            # seats someone else is holding are as good as sold
+            blocked = _held_by_others(conn, screen_id, user_id, time.time()) if booked else set()
+            changed, rejected, positions = [], [], []
+            for label in labels:
+                try:
+                    r, c = seat_codec.seat_position(label, rows)
+                except ValueError:
+                    rejected.append(label)
+                    continue
+                if (not (0 <= r < rows and 0 <= c < cols) or label in blocked
+                        or seat_codec.is_booked(bits, cols, r, c) == booked):
+                    rejected.append(label)
+                else:
+                    changed.append(label)
+                    positions.append((r, c))
+            if not positions or (rejected and all_or_nothing):
+                return [], rejected
+            new_bits = seat_codec.set_seats(bits, cols, positions, booked=booked)
+            cur = conn.execute(
+                """UPDATE scheduled_screens
+                   SET seat_bits = ?, seats_booked = ?, seat_version = seat_version + 1
+                   WHERE screen_id = ? AND seat_version = ?""",
+                (new_bits, seat_codec.count_booked(new_bits), screen_id, version)
+            )
+            if cur.rowcount == 1:
+                if booked and user_id is not None:
+                    # the buyer's own holds are converted into the sale
+                    conn.executemany(
+                        "DELETE FROM seat_holds WHERE screen_id = ? AND seat = ? AND user_id = ?",
+                        [(screen_id, label, user_id) for label in changed]
+                    )
+                return changed, rejected
+        # another writer swapped first: re-read and try again
+    raise RuntimeError(f"Could not update seats for show {screen_id}: too much contention")
+
+
+def reserve_seats(screen_id: int, labels, all_or_nothing: bool = True, user_id=None):
+    """Atomically mark seats (labels like 'J1') as booked for a show.
+    Returns (reserved, lost): lost are seats already taken (e.g. by a
+    concurrent booker), held by another user, or invalid. With
+    all_or_nothing (default) nothing is reserved if any seat is lost.
+    user_id's own holds do not block and are consumed. Inside
+    db.transaction() the reservation commits or rolls back with the
+    caller's block.
+    """
+    return _swap_seat_bits(screen_id, list(labels), True, all_or_nothing, user_id)
+
+
+def release_seats(screen_id: int, labels):
+    """Free previously reserved seats. Returns (released, not_booked)."""
+    return _swap_seat_bits(screen_id, list(labels), False, False)
+
+
+def hold_seats(screen_id: int, user_id: int, labels, ttl_seconds: int = None):
+    """Hold free seats for user_id until now + ttl_seconds (default
+    HOLD_TTL_SECONDS). Re-holding your own seat extends it; an expired hold
+    of another user is taken over. Returns (held, unavailable).
+    """
+    ttl = HOLD_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+    now = time.time()
+    held, unavailable = [], []
+    with db.transaction() as conn:
+        row = conn.execute(
+            "SELECT seat_bits, seat_rows, seat_cols FROM scheduled_screens WHERE screen_id = ?",
+            (screen_id,)
+        ).fetchone()
+        if row is None:
+            return [], list(labels)
+        for label in labels:
+            if _check_seat(label, row['seat_rows'], row['seat_cols'], row['seat_bits']) is None:
+                unavailable.append(label)
+                continue
+            cur = conn.execute(
+                """INSERT INTO seat_holds (screen_id, seat, user_id, expires_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (screen_id, seat) DO UPDATE
+                   SET user_id = excluded.user_id, expires_at = excluded.expires_at
+                   WHERE seat_holds.user_id = excluded.user_id OR seat_holds.expires_at <= ?""",
+                (screen_id, label, user_id, now + ttl, now)
+            )
+            (held if cur.rowcount == 1 else unavailable).append(label)
+    return held, unavailable
+
+
+def release_holds(screen_id: int, user_id: int, labels=None):
+    """Drop user_id's holds on a show (all of them when labels is None)"""
+    if labels is None:
+        db.execute_query("DELETE FROM seat_holds WHERE screen_id = ? AND user_id = ?", (screen_id, user_id))
+    else:
+        db.execute_many(
+            "DELETE FROM seat_holds WHERE screen_id = ? AND user_id = ? AND seat = ?",
+            [(screen_id, user_id, label) for label in labels]
+        )
+
+
+def held_seats(screen_id: int, exclude_user_id=None):
+    """Labels of seats currently held on a show by anyone but exclude_user_id"""
+    rows = db.execute_query(
+        "SELECT seat FROM seat_holds WHERE screen_id = ? AND expires_at > ? AND user_id IS NOT ?",
+        (screen_id, time.time(), exclude_user_id), fetch_all=True
+    ) or []
+    return {r['seat'] for r in rows}
+
+
+def expire_holds(now: float = None) -> int:
+    """Delete holds past their expiry; returns how many were released"""
+    with db.transaction() as conn:
+        cur = conn.execute("DELETE FROM seat_holds WHERE expires_at <= ?", (time.time() if now is None else now,))
+        return cur.rowcount
+
+
+def _sweep_loop(interval: float):
+    while not _sweeper_stop.wait(interval):
+        try:
+            expire_holds()
+        except Exception:
+            pass
+
+
+def start_hold_sweeper(interval: float = SWEEP_INTERVAL_SECONDS):
+    """Start the background thread that releases expired holds (idempotent)"""
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return _sweeper
+    _sweeper_stop.clear()
+    _sweeper = threading.Thread(target=_sweep_loop, args=(interval,), name='seat-hold-sweeper', daemon=True)
+    _sweeper.start()
+    return _sweeper
+
+
+def stop_hold_sweeper():
+    _sweeper_stop.set()
@@ -1,55 +1,418 @@
 from dbwrap import db
+from backend.seats import screen_count
+from backend.intervals import ScreenIntervals
 from datetime import datetime, timedelta
+import math
+import random
+import threading
+import time
 
 def _overlaps(a_start: datetime, a_end: datetime, b_start: datetime, b_end: datetime) -> bool:
     return max(a_start, b_start) < min(a_end, b_end)
 
+
+# Per-screen interval index. A screen's shows are loaded on its first
+# query and then kept in step with scheduled_screens by replaying
+# schedule_log (migration 15: triggers log every insert, move and delete,
+# made by this process or any other) into the loaded trees before each
+# query. A write only changes the shows it touched, on their own screens;
+# nothing is reloaded unless the log was pruned past the last entry seen.
+_index = {}
+_log_seq = None   # last schedule_log entry applied to _index
+_index_lock = threading.Lock()
+
+
+def invalidate_index():
+    """Forget all cached screen intervals (next query reloads)"""
+    global _log_seq
+    with _index_lock:
+        _index.clear()
+        _log_seq = None
+
+
+def _load_screen(theatre_id: int, screen_number: int) -> ScreenIntervals:
+    rows = db.execute_query(
+        "SELECT screen_id, start_time, end_time FROM scheduled_screens "
+        "WHERE theatre_id = ? AND screen_number = ?",
+        (theatre_id, screen_number), fetch_all=True
+    ) or []
+    return ScreenIntervals((r['screen_id'], datetime.fromisoformat(r['start_time']), datetime.fromisoformat(r['end_time']))
+                           for r in rows)
+
+
+def _sync_index():
+    """Apply the schedule_log entries written since the last sync to the
+    loaded screens (call with _index_lock held). Replaying an entry a
+    screen loaded after it already reflects is harmless: shows are
+    replaced by screen_id."""
+    global _log_seq
+    if _log_seq is None:
+        _index.clear()
+        _log_seq = db.execute_query("SELECT COALESCE(MAX(seq), 0) AS seq FROM schedule_log", fetch_one=True)['seq']
+        return
+    rows = db.execute_query("SELECT * FROM schedule_log WHERE seq > ? ORDER BY seq", (_log_seq,), fetch_all=True)
+    if not rows:
+        return
+    if rows[0]['seq'] != _log_seq + 1:
+        # entries we never saw were pruned: start over
+        _index.clear()
+    else:
+        for r in rows:
+            old = _index.get((r['old_theatre_id'], r['old_screen_number']))
+            if old is not None:
+                old.remove(r['screen_id'])
+            new = _index.get((r['theatre_id'], r['screen_number']))
+            if new is not None and r['start_time'] is not None:
+                new.add(r['screen_id'], datetime.fromisoformat(r['start_time']), datetime.fromisoformat(r['end_time']))
+    _log_seq = rows[-1]['seq']
+
+
+def _screen_index(theatre_id: int, screen_number: int) -> ScreenIntervals:
+    if db.in_transaction():
+        # may see uncommitted rows that could still roll back: don't cache
+        return _load_screen(theatre_id, screen_number)
+    key = (theatre_id, screen_number)
+    with _index_lock:
+        _sync_index()
+        intervals = _index.get(key)
+        if intervals is None:
+            intervals = _index[key] = _load_screen(theatre_id, screen_number)
+        return intervals
+
+
+def find_conflicts(theatre_id: int, screen_number: int, start_iso: str, end_iso: str, exclude_screen_id: int = None) -> list:
+    """screen_ids of shows on the same theatre+screen overlapping [start,end]"""
+    return _screen_index(theatre_id, screen_number).overlapping(
+        datetime.fromisoformat(start_iso), datetime.fromisoformat(end_iso), exclude_screen_id)
+
 def has_conflict(theatre_id: int, screen_number: int, start_iso: str, end_iso: str, exclude_screen_id: int = None) -> bool:
     """Return True if proposed [start,end] overlaps an existing show on same theatre+screen"""
-    q = (
-        "SELECT screen_id, start_time, end_time FROM scheduled_screens "
-        "WHERE theatre_id = ? AND screen_number = ?"
-    )
-    params = [theatre_id, screen_number]
-    if exclude_screen_id is not None:
-        q += " AND screen_id <> ?"
-        params.append(exclude_screen_id)
-    rows = db.execute_query(q, tuple(params), fetch_all=True) or []
-    start = datetime.fromisoformat(start_iso)
-    end = datetime.fromisoformat(end_iso)
+    return has_conflicts(theatre_id, screen_number, [(start_iso, end_iso)], exclude_screen_id)[0]
+
+def has_conflicts(theatre_id: int, screen_number: int, slots, exclude_screen_id: int = None) -> list:
+    """Batched has_conflict: one bool per (start_iso, end_iso) in slots,
+    answered from a single index lookup."""
+    intervals = _screen_index(theatre_id, screen_number)
+    return [sid is not None for sid in intervals.first_overlaps(
+        [(datetime.fromisoformat(s), datetime.fromisoformat(e)) for s, e in slots], exclude_screen_id)]
+
+def _align_up(t: datetime, step_minutes: int, anchor: datetime = None) -> datetime:
+    """Round up to the next multiple of step_minutes past the hour, or past
+    anchor when given"""
+    t = t.replace(second=0, microsecond=0) + (timedelta(minutes=1) if (t.second or t.microsecond) else timedelta(0))
+    if step_minutes <= 1:
+        return t
+    base = anchor.replace(second=0, microsecond=0) if anchor else t.replace(hour=0, minute=0)
+    over = int((t - base).total_seconds() // 60) % step_minutes
+    return t + timedelta(minutes=(step_minutes - over) % step_minutes)
+
+def _screens_in_scope(theatre_id: int = None, screen_number: int = None, city: str = None):
+    """[(theatre_id, screen_number)] for one screen, a whole theatre or a whole city"""
+    if theatre_id is not None and screen_number is not None:
+        return [(theatre_id, screen_number)]
+    if theatre_id is not None:
+        rows = db.execute_query("SELECT theatre_id, seating_schema_json FROM theatres WHERE theatre_id = ?", (theatre_id,), fetch_all=True)
+    elif city is not None:
+        rows = db.execute_query("SELECT theatre_id, seating_schema_json FROM theatres WHERE city = ? ORDER BY theatre_id", (city,), fetch_all=True)
+    else:
+        raise ValueError("Give a theatre_id (optionally with screen_number) or a city")
+    return [(r['theatre_id'], n) for r in (rows or []) for n in range(1, screen_count(r['seating_schema_json']) + 1)]
+
+def _day_shows(screens, day_start: datetime, day_end: datetime, exclude_screen_id: int = None):
+    """Shows overlapping [day_start, day_end) for the given screens, grouped
+    per screen and sorted by start: one query for the whole scope."""
+    theatre_ids = sorted({t for t, _ in screens})
+    marks = ','.join('?' * len(theatre_ids))
+    rows = db.execute_query(
+        f"SELECT screen_id, theatre_id, screen_number, start_time, end_time FROM scheduled_screens "
+        f"WHERE theatre_id IN ({marks}) AND show_date BETWEEN DATE(?, '-1 day') AND DATE(?)",
+        (*theatre_ids, day_start.isoformat(), day_end.isoformat()), fetch_all=True
+    ) or []
+    wanted = set(screens)
+    shows = {key: [] for key in screens}
     for r in rows:
-        rs = datetime.fromisoformat(r['start_time'])
-        re = datetime.fromisoformat(r['end_time'])
-        if _overlaps(start, end, rs, re):
-            return True
-    return False
-
-def suggest_next_slot(theatre_id: int, screen_number: int, start_iso: str, duration_minutes: int, exclude_screen_id: int = None) -> str:
-    """If conflict, suggest the nearest next free slot on same day after proposed start."""
-    start = datetime.fromisoformat(start_iso)
-    # try stepping in 15-minute increments up to same day 23:59
-    for step in range(1, 60):
-        candidate_start = (start.replace(second=0, microsecond=0) + timedelta(minutes=15*step))
-        candidate_end = candidate_start + timedelta(minutes=duration_minutes)
-        # same date
-        if candidate_start.date() != start.date():
+        key = (r['theatre_id'], r['screen_number'])
+        if key not in wanted or r['screen_id'] == exclude_screen_id:
+            continue
+        s, e = datetime.fromisoformat(r['start_time']), datetime.fromisoformat(r['end_time'])
+        if s < day_end and e > day_start:
+            shows[key].append((s, e))
+    for busy in shows.values():
+        busy.sort()
+    return shows
+
+def _gaps_for_screen(busy, not_before: datetime, closing: datetime, duration: timedelta,
+                     buffer: timedelta, step_minutes: int, limit: int, anchor: datetime = None):
+    """Single pass over one screen's sorted shows; yields (start, gap_start,
+    gap_end) for shows that end by closing, gaps rounded inwards to whole minutes"""
+    found = []
+    cursor = not_before
+    last_start = closing - duration
+    for s, e in busy + [(closing + buffer, closing + buffer)]:
+        gap_end = min(s - buffer, closing).replace(second=0, microsecond=0)
+        start = _align_up(cursor, step_minutes, anchor)
+        if start <= last_start and start + duration <= gap_end:
+            found.append((start, _align_up(cursor, 1), gap_end))
+            if len(found) >= limit:
+                break
+        if start > last_start:
             break
-        if not has_conflict(theatre_id, screen_number, candidate_start.isoformat(), candidate_end.isoformat(), exclude_screen_id):
-            return candidate_start.isoformat()
-    return ""
+        cursor = max(cursor, e + buffer)
+    return found
+
+def find_free_slots(duration_minutes: int, day_iso: str, theatre_id: int = None, screen_number: int = None,
+                    city: str = None, not_before_iso: str = None, buffer_minutes: int = 0,
+                    step_minutes: int = 15, limit: int = 1, exclude_screen_id: int = None,
+                    anchor_iso: str = None, open_time: str = '09:00', close_time: str = '23:30') -> list:
+    """Earliest free slots for a show of duration_minutes starting on day_iso.
+    Scope is one screen (theatre_id + screen_number), every screen of a
+    theatre (theatre_id) or every theatre in a city (city). buffer_minutes
+    of cleaning time is kept before and after existing shows; starts are
+    rounded up to a multiple of step_minutes past the hour, or past
+    anchor_iso when given. Shows start at or after open_time and end by
+    close_time, as in plan_week. Returns up to `limit` gaps, earliest
+    first, as dicts: theatre_id, screen_number, start, end, gap_start,
+    gap_end (the free stretch around the slot, within opening hours)."""
+    day = datetime.fromisoformat(day_iso).replace(hour=0, minute=0, second=0, microsecond=0)
+    opening = day + timedelta(minutes=_clock_minutes(open_time))
+    closing = day + timedelta(minutes=_clock_minutes(close_time))
+    duration = timedelta(minutes=duration_minutes)
+    buffer = timedelta(minutes=buffer_minutes)
+    not_before = max(opening, datetime.fromisoformat(not_before_iso)) if not_before_iso else opening
+    anchor = datetime.fromisoformat(anchor_iso) if anchor_iso else None
+    screens = _screens_in_scope(theatre_id, screen_number, city)
+    if not screens:
+        return []
+    shows = _day_shows(screens, opening - buffer, closing + buffer, exclude_screen_id)
+    results = []
+    for key in screens:
+        for start, gap_start, gap_end in _gaps_for_screen(shows[key], not_before, closing,
+                                                          duration, buffer, step_minutes, limit, anchor):
+            results.append({
+                'theatre_id': key[0], 'screen_number': key[1],
+                'start': start.isoformat(), 'end': (start + duration).isoformat(),
+                'gap_start': gap_start.isoformat(), 'gap_end': gap_end.isoformat(),
+            })
+    results.sort(key=lambda r: (r['start'], r['theatre_id'], r['screen_number']))
+    return results[:limit]
+
+def suggest_next_slot(theatre_id: int, screen_number: int, start_iso: str, duration_minutes: int,
+                      exclude_screen_id: int = None, buffer_minutes: int = 0) -> str:
+    """If conflict, suggest the nearest next free slot on same day after
+    proposed start, a multiple of 15 minutes later (10:07 gives 10:22, ...),
+    within find_free_slots' default opening hours."""
+    start = datetime.fromisoformat(start_iso)
+    slots = find_free_slots(duration_minutes, start_iso, theatre_id=theatre_id, screen_number=screen_number,
+                            not_before_iso=(start + timedelta(minutes=15)).isoformat(), buffer_minutes=buffer_minutes,
+                            exclude_screen_id=exclude_screen_id, anchor_iso=start_iso)
+    return slots[0]['start'] if slots else ""
 
 def has_city_movie_for_date(city: str, movie_id: int, date_iso: str, exclude_screen_id: int = None) -> bool:
     """Return True if any show exists in the given city for the movie on the same calendar date.
     If exclude_screen_id is provided, ignore that screen (for reschedules).
+    One probe of the idx_screens_city_movie_day unique index; the index also
+    rejects a duplicate insert with db.CityMovieConflictError if two admins
+    race past this check.
     """
     q = (
-        "SELECT ss.screen_id FROM scheduled_screens ss "
-        "JOIN theatres t ON ss.theatre_id = t.theatre_id "
-        "WHERE t.city = ? AND ss.movie_id = ? AND DATE(ss.start_time) = DATE(?)"
+        "SELECT screen_id FROM scheduled_screens "
+        "WHERE city = ? AND movie_id = ? AND show_date = DATE(?) AND legacy_dup = 0"
     )
     params = [city, movie_id, date_iso]
     if exclude_screen_id is not None:
-        q += " AND ss.screen_id <> ?"
+        q += " AND screen_id <> ?"
         params.append(exclude_screen_id)
     row = db.execute_query(q, tuple(params), fetch_one=True)
     return bool(row)
+
+
+# Automatic week planner.
+# The goal is the most scheduled minutes under the one-show-per-movie-per-
+# city-per-day rule. Each (city, day) is planned on its own: a day's shows
+# are a subset of the movies, each placed once into a screen's free gap
+# (existing shows and opening hours removed). That is a multiple-knapsack
+# problem, so we pack longest-first, each show onto the least loaded theatre
+# and screen it fits (tightest gap on ties), then spend the time budget on
+# swaps of the packing order, keeping any order that schedules more minutes.
+# The headline figure is utilization of the free screen time. With only one
+# show per movie, a city with many screens cannot be filled, so the report
+# also gives the upper bound (every placeable movie, capped by the free
+# time): `optimal` means no plan under the rule schedules more minutes, not
+# that the screens are full.
+
+def _clock_minutes(hhmm: str) -> int:
+    h, m = hhmm.split(':')
+    return int(h) * 60 + int(m)
+
+def _free_gaps(busy, day: datetime, open_min: int, close_min: int, buffer_minutes: int):
+    """[start, end) minute offsets from midnight that one screen is free, given its sorted shows"""
+    gaps = []
+    cursor = open_min
+    for s, e in busy:
+        s_min = math.floor((s - day).total_seconds() / 60) - buffer_minutes
+        if s_min > cursor:
+            gaps.append((cursor, min(s_min, close_min)))
+        cursor = max(cursor, math.ceil((e - day).total_seconds() / 60) + buffer_minutes)
+    if cursor < close_min:
+        gaps.append((cursor, close_min))
+    return [g for g in gaps if g[1] > g[0]]
+
+def _pack(gaps, items, order, step_minutes: int, buffer_minutes: int):
+    """Place items (movie_id, minutes) in `order`, each into a gap of the
+    theatre, then the screen, with the fewest minutes placed so far, and the
+    gap that leaves the least room on ties. Returns (scheduled minutes,
+    [(screen, movie_id, start_min)])."""
+    free = [[key, start, end] for key, start, end in gaps]
+    theatre_load, screen_load = {}, {}
+    placed, total = [], 0
+    for i in order:
+        movie_id, minutes = items[i]
+        best, best_rank = None, None
+        for g in free:
+            start = -(-g[1] // step_minutes) * step_minutes
+            left = g[2] - start - minutes
+            if left < 0:
+                continue
+            rank = (theatre_load.get(g[0][0], 0), screen_load.get(g[0], 0), left)
+            if best is None or rank < best_rank:
+                best, best_rank = g, rank
+        if best is None:
+            continue
+        start = -(-best[1] // step_minutes) * step_minutes
+        best[1] = start + minutes + buffer_minutes
+        theatre_load[best[0][0]] = theatre_load.get(best[0][0], 0) + minutes
+        screen_load[best[0]] = screen_load.get(best[0], 0) + minutes
+        placed.append((best[0], movie_id, start))
+        total += minutes
+    return total, placed
+
+def _upper_bound(gaps, items, step_minutes: int, buffer_minutes: int) -> int:
+    """Most minutes any packing could schedule. A gap of c minutes holding k
+    shows needs sum(minutes) + (k - 1) * buffer <= c, so counting every show
+    as minutes + buffer against sum(c + buffer) over the gaps is a valid
+    relaxation; filling it fractionally, longest first, gives the bound."""
+    caps = [end - (-(-start // step_minutes) * step_minutes) for _, start, end in gaps]
+    lengths = sorted((m for _, m in items), reverse=True)
+    if not lengths:
+        return 0
+    caps = [c for c in caps if c >= lengths[-1]]
+    lengths = [m for m in lengths if caps and m <= max(caps)]
+    room = sum(c + buffer_minutes for c in caps)
+    bound = 0.0
+    for m in lengths:
+        take = min(1.0, room / (m + buffer_minutes))
+        bound += take * m
+        room -= take * (m + buffer_minutes)
+        if room <= 0:
+            break
+    return min(int(bound), sum(caps))
+
+def _plan_day(gaps, items, step_minutes: int, buffer_minutes: int, deadline: float, rng):
+    """Best packing found before the deadline: (minutes, placements, bound, iterations)"""
+    bound = _upper_bound(gaps, items, step_minutes, buffer_minutes)
+    order = sorted(range(len(items)), key=lambda i: -items[i][1])
+    best_total, best_placed = _pack(gaps, items, order, step_minutes, buffer_minutes)
+    iterations = 1
+    while best_total < bound and len(order) > 1 and time.perf_counter() < deadline:
+        trial = order[:]
+        i, j = rng.randrange(len(trial)), rng.randrange(len(trial))
+        trial[i], trial[j] = trial[j], trial[i]
+        total, placed = _pack(gaps, items, trial, step_minutes, buffer_minutes)
+        iterations += 1
+        if total >= best_total:
+            order, best_total, best_placed = trial, total, placed
+    return best_total, best_placed, bound, iterations
+
+def plan_week(start_date_iso: str, days: int = 7, city: str = None, movie_ids=None,
+              open_time: str = '09:00', close_time: str = '23:30', buffer_minutes: int = 15,
+              step_minutes: int = 15, time_budget: float = 2.0, hall_type: str = 'cinema', seed: int = None):
+    """Plan movie shows for `days` days from start_date_iso in one city (all
+    cities when city is None) around the existing schedule: no overlaps on a
+    screen, buffer_minutes between shows, every show inside opening hours and
+    at most one show per movie per city per day, spread over the theatres
+    and screens. Maximizes scheduled minutes under that rule and stops
+    improving after time_budget seconds. Returns (plan, report): plan rows
+    are ready for backend.bulk_schedule.import_plan; report has the
+    objective, then per-day and total utilization (scheduled / free
+    capacity minutes), the most utilization the rule allows, the upper
+    bound and the gap to it."""
+    started = time.perf_counter()
+    deadline = started + time_budget
+    rng = random.Random(seed)
+    first_day = datetime.fromisoformat(start_date_iso).replace(hour=0, minute=0, second=0, microsecond=0)
+    last_day = first_day + timedelta(days=days - 1)
+    open_min, close_min = _clock_minutes(open_time), _clock_minutes(close_time)
+
+    movies = db.execute_query(
+        "SELECT movie_id, duration_seconds FROM movies WHERE duration_seconds > 0 ORDER BY movie_id", fetch_all=True
+    ) or []
+    if movie_ids is not None:
+        wanted = set(movie_ids)
+        movies = [m for m in movies if m['movie_id'] in wanted]
+    durations = {m['movie_id']: m['duration_seconds'] for m in movies}
+
+    if city is None:
+        theatres = db.execute_query("SELECT theatre_id, city, seating_schema_json FROM theatres WHERE hall_type = ? ORDER BY city, theatre_id",
+                                    (hall_type,), fetch_all=True) or []
+    else:
+        theatres = db.execute_query("SELECT theatre_id, city, seating_schema_json FROM theatres WHERE city = ? AND hall_type = ? ORDER BY theatre_id",
+                                    (city, hall_type), fetch_all=True) or []
+    city_screens = {}
+    for t in theatres:
+        city_screens.setdefault(t['city'], []).extend(
+            (t['theatre_id'], n) for n in range(1, screen_count(t['seating_schema_json']) + 1))
+
+    used = set()  # (city, movie_id, date) already shown
+    for r in db.execute_query(
+            "SELECT DISTINCT city, movie_id, show_date FROM scheduled_screens "
+            "WHERE movie_id IS NOT NULL AND show_date BETWEEN DATE(?) AND DATE(?)",
+            (first_day.isoformat(), last_day.isoformat()), fetch_all=True) or []:
+        used.add((r['city'], r['movie_id'], r['show_date']))
+
+    units = [(c, first_day + timedelta(days=d)) for c in sorted(city_screens) for d in range(days)]
+    plan, day_reports = [], []
+    for n, (unit_city, day) in enumerate(units):
+        screens = city_screens[unit_city]
+        busy = _day_shows(screens, day + timedelta(minutes=open_min - buffer_minutes),
+                          day + timedelta(minutes=close_min + buffer_minutes))
+        gaps = [(key, start, end) for key in screens
+                for start, end in _free_gaps(busy[key], day, open_min, close_min, buffer_minutes)]
+        date_iso = day.date().isoformat()
+        items = [(mid, -(-secs // 60)) for mid, secs in durations.items() if (unit_city, mid, date_iso) not in used]
+        # split what is left of the budget evenly over the remaining days
+        unit_deadline = time.perf_counter() + max(0.0, deadline - time.perf_counter()) / (len(units) - n)
+        total, placed, bound, iterations = _plan_day(gaps, items, step_minutes, buffer_minutes, unit_deadline, rng)
+        for (theatre_id, screen_number), movie_id, start_min in placed:
+            start = day + timedelta(minutes=start_min)
+            plan.append({
+                'theatre_id': theatre_id, 'screen_number': screen_number, 'movie_id': movie_id,
+                'start_time': start.isoformat(), 'end_time': (start + timedelta(seconds=durations[movie_id])).isoformat(),
+            })
+        capacity = sum(end - start for _, start, end in gaps)
+        placed_ids = {movie_id for _, movie_id, _ in placed}
+        day_reports.append({
+            'city': unit_city, 'date': date_iso, 'shows': len(placed),
+            'utilization': total / capacity if capacity else 0.0,
+            'utilization_bound': bound / capacity if capacity else 0.0,
+            'scheduled_minutes': total, 'capacity_minutes': capacity, 'upper_bound_minutes': bound,
+            'screens_used': len({key for key, _, _ in placed}),
+            'optimality_gap': (bound - total) / bound if bound else 0.0,
+            'optimal': total >= bound,
+            'unplaced': [mid for mid, _ in items if mid not in placed_ids],
+            'iterations': iterations,
+        })
+    plan.sort(key=lambda r: (r['start_time'], r['theatre_id'], r['screen_number']))
+    scheduled = sum(d['scheduled_minutes'] for d in day_reports)
+    capacity = sum(d['capacity_minutes'] for d in day_reports)
+    bound = sum(d['upper_bound_minutes'] for d in day_reports)
+    report = {
+        'objective': 'most scheduled minutes with one show per movie per city per day',
+        'utilization': scheduled / capacity if capacity else 0.0,
+        'utilization_bound': bound / capacity if capacity else 0.0,
+        'days': day_reports, 'shows': len(plan),
+        'scheduled_minutes': scheduled, 'capacity_minutes': capacity, 'upper_bound_minutes': bound,
+        'optimality_gap': (bound - scheduled) / bound if bound else 0.0,
+        'optimal': all(d['optimal'] for d in day_reports),
+        'elapsed_seconds': time.perf_counter() - started,
+    }
+    return plan, report
@@ -0,0 +1,279 @@
+import difflib
+import json
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+
+from dbwrap import db
+
+# Catalog search over the catalog_fts full-text index (migration 9).
+# Every word of the query is a prefix match ("incep" finds Inception) and all
+# words must match somewhere in the title, description, cast/performers,
+# genres or languages. Hits are ordered by bm25 with title matches weighted
+# highest. When nothing matches, words missing from the index vocabulary are
+# swapped for their closest indexed terms (difflib), so "intersteller" still
+# finds Interstellar. Databases without FTS5 fall back to LIKE on the title.
+#
+# Results are kept in a small LRU keyed by (words, genre, limit) and dropped
+# whenever movies or events change. Typing "incep" after "ince" cannot match
+# anything "ince" did not, so when an earlier, complete result set covers the
+# new query it is filtered in memory (keeping its order) instead of asking
+# SQLite again; this keeps as-you-type search cheap on a large catalog.
+# Ranking costs time per match, so a short prefix matching more than
+# RANK_LIMIT rows ranks only its title hits and lists the rest unranked.
+
+MAX_RESULTS = 200
+TYPO_CUTOFF = 0.75
+TYPO_CANDIDATES = 3
+CACHE_SIZE = 64
+RANK_LIMIT = 2000
+
+# letters and digits, like the unicode61 tokenizer (underscore separates)
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+_fts_available = None
+_vocab = None          # (catalog change counter, sorted terms, {(first letter, length): [terms]})
+_vocab_lock = threading.Lock()
+_cache = OrderedDict()  # (words, genre, limit) -> (movies, events, complete)
+_cache_version = None   # catalog change counter the cache was filled at
+_cache_lock = threading.Lock()
+
+
+def fts_available() -> bool:
+    global _fts_available
+    if _fts_available is None:
+        row = db.execute_query(
+            "SELECT 1 AS ok FROM sqlite_master WHERE type = 'table' AND name = 'catalog_fts'", fetch_one=True)
+        _fts_available = bool(row)
+    return _fts_available
+
+
+def _words(text: str):
+    return [w.lower() for w in _WORD_RE.findall(text or '')]
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _vocabulary():
+    """Indexed terms (sorted, and grouped by first letter and length),
+    reloaded only when movies or events change"""
+    global _vocab
+    version = db.change_version('catalog')
+    with _vocab_lock:
+        if _vocab is not None and _vocab[0] == version:
+            return _vocab[1], _vocab[2]
+    rows = db.execute_query("SELECT term FROM catalog_vocab", fetch_all=True) or []
+    terms = sorted(r['term'] for r in rows)
+    buckets = {}
+    for t in terms:
+        buckets.setdefault((t[0], len(t)), []).append(t)
+    with _vocab_lock:
+        _vocab = (version, terms, buckets)
+    return terms, buckets
+
+
+def _has_prefix(terms, word: str) -> bool:
+    i = bisect_left(terms, word)
+    return i < len(terms) and terms[i].startswith(word)
+
+
+def _close_terms(buckets, word: str):
+    """Closest indexed terms to a misspelt word. Only terms within two
+    characters of its length can pass the cutoff, and the first letter is
+    taken as typed (a typo there is rare), so only those are scored."""
+    pool = [t for n in range(len(word) - 2, len(word) + 3) for t in buckets.get((word[0], n), ())]
+    return difflib.get_close_matches(word, pool, n=TYPO_CANDIDATES, cutoff=TYPO_CUTOFF)
+
+
+def _match_expression(words, genre=None, fuzzy=False, title_only=False):
+    """FTS5 MATCH string: every word as a prefix (or, fuzzy, any of its
+    closest indexed terms), plus an optional phrase filter on genres.
+    title_only requires the words to match in the title."""
+    parts = []
+    terms, buckets = _vocabulary() if fuzzy else (None, None)
+    for w in words:
+        if fuzzy:
+            if _has_prefix(terms, w):
+                parts.append(_quote(w) + '*')
+                continue
+            close = _close_terms(buckets, w)
+            if not close:
+                return None
+            parts.append('(' + ' OR '.join(_quote(t) for t in close) + ')')
+        else:
+            parts.append(_quote(w) + '*')
+    if title_only and parts:
+        parts = ['{title} : (' + ' AND '.join(parts) + ')']
+    if genre:
+        parts.append('genres : ' + _quote(' '.join(_words(genre))))
+    return ' AND '.join(parts)
+
+
+def _hit_count(expression, cap: int) -> int:
+    """Number of catalog_fts hits, counting no further than cap"""
+    row = db.execute_query(
+        "SELECT COUNT(*) AS n FROM (SELECT 1 FROM catalog_fts WHERE catalog_fts MATCH ? LIMIT ?)",
+        (expression, cap), fetch_one=True)
+    return row['n'] if row else 0
+
+
+def _top_ids(expression, limit, ranked=True):
+    """([movie_id], [event_id]): the first `limit` of each matching
+    expression, best first if ranked, else in catalog order"""
+    if ranked:
+        rows = db.execute_query(
+            """SELECT rowid FROM (
+                   SELECT rowid, row_number() OVER (PARTITION BY rowid % 2 ORDER BY rank) AS n
+                   FROM catalog_fts WHERE catalog_fts MATCH ?)
+               WHERE n <= ? ORDER BY rowid % 2, n""",
+            (expression, limit), fetch_all=True)
+    else:
+        rows = db.execute_query(
+            """SELECT rowid FROM (SELECT rowid FROM catalog_fts WHERE catalog_fts MATCH ? AND rowid % 2 = 0 LIMIT ?)
+               UNION ALL
+               SELECT rowid FROM (SELECT rowid FROM catalog_fts WHERE catalog_fts MATCH ? AND rowid % 2 = 1 LIMIT ?)""",
+            (expression, limit, expression, limit), fetch_all=True)
+    ids = [r['rowid'] for r in rows or []]
+    return [i // 2 for i in ids if i % 2 == 0], [i // 2 for i in ids if i % 2 == 1]
+
+
+def _rows(table, key, ids):
+    """Rows of table for ids, in the order given"""
+    if not ids:
+        return []
+    rows = db.execute_query(f"SELECT * FROM {table} WHERE {key} IN ({','.join('?' * len(ids))})",
+                            tuple(ids), fetch_all=True) or []
+    by_id = {r[key]: r for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _fts_search(words, genre, limit, fuzzy=False):
+    """(movies, events, ranked) for the query, or None if a fuzzy word has
+    no close term. movie rowids are even and event rowids odd, so one pass
+    ranks both; ranked is False when there were too many hits to rank."""
+    expression = _match_expression(words, genre, fuzzy)
+    if expression is None:
+        return None
+    ranked = _hit_count(expression, RANK_LIMIT + 1) <= RANK_LIMIT
+    if ranked or not words:
+        movie_ids, event_ids = _top_ids(expression, limit, ranked)
+    else:
+        # title hits first (ranked if few enough), then the rest in catalog order
+        title = _match_expression(words, genre, fuzzy, title_only=True)
+        movie_ids, event_ids = _top_ids(title, limit, _hit_count(title, RANK_LIMIT + 1) <= RANK_LIMIT)
+        more_movies, more_events = _top_ids(expression, 2 * limit, ranked=False)
+        seen_movies, seen_events = set(movie_ids), set(event_ids)
+        movie_ids += [i for i in more_movies if i not in seen_movies]
+        event_ids += [i for i in more_events if i not in seen_events]
+    return _rows('movies', 'movie_id', movie_ids[:limit]), _rows('events', 'event_id', event_ids[:limit]), ranked
+
+
+def _like_search(query, genre, limit):
+    movie_sql, event_sql, params = "SELECT * FROM movies WHERE title LIKE ?", "SELECT * FROM events WHERE title LIKE ?", [f"%{query}%"]
+    if genre:
+        movie_sql += " AND genres_json LIKE ?"
+        event_sql += " AND genres_json LIKE ?"
+        params.append(f"%{genre}%")
+    movies = db.execute_query(movie_sql + " LIMIT ?", (*params, limit), fetch_all=True) or []
+    events = db.execute_query(event_sql + " LIMIT ?", (*params, limit), fetch_all=True) or []
+    return movies, events
+
+
+def _fold(text: str) -> str:
+    """Lower-case and strip diacritics, as remove_diacritics does"""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+
+def _row_terms(row, people_column):
+    """Folded index terms of a movie or event row (the catalog_fts columns)"""
+    text = [row.get('title'), row.get('description')]
+    for column in (people_column, 'genres_json', 'languages_json'):
+        try:
+            text.extend(json.loads(row.get(column) or '[]'))
+        except (TypeError, ValueError):
+            text.append(row.get(column))
+    return set(_WORD_RE.findall(_fold(' '.join(str(t) for t in text if t))))
+
+
+def _row_matches(terms, words) -> bool:
+    """True if every word is a prefix of one of the row's terms"""
+    return all(any(t.startswith(w) for t in terms) for w in words)
+
+
+def _narrows(words, earlier) -> bool:
+    """True if every match of words also matched the earlier words (each
+    earlier word is a prefix of one of the new ones)"""
+    return words != earlier and all(any(w.startswith(e) for w in words) for e in earlier)
+
+
+def _cached(key):
+    """(movies, events) for key from the cache, else the smallest complete
+    earlier result set that key narrows, filtered in memory, else None"""
+    global _cache_version
+    version = db.change_version('catalog')
+    with _cache_lock:
+        if version != _cache_version:
+            _cache.clear()
+            _cache_version = version
+        if key in _cache:
+            _cache.move_to_end(key)
+            movies, events, _ = _cache[key]
+            return list(movies), list(events)
+        words, genre, limit = key
+        base = min(((m, e) for (w, g, n), (m, e, complete) in _cache.items()
+                    if complete and g == genre and n >= limit and _narrows(words, w)),
+                   key=lambda me: len(me[0]) + len(me[1]), default=None)
+    if base is None:
+        return None
+    folded = [_fold(w) for w in words]
+    movies = [m for m in base[0] if _row_matches(_row_terms(m, 'actors_json'), folded)]
+    events = [e for e in base[1] if _row_matches(_row_terms(e, 'performers_json'), folded)]
+    if not movies and not events:
+        # nothing left: let search() try its typo fallback
+        return None
+    _remember(key, movies[:limit], events[:limit], True)
+    return movies[:limit], events[:limit]
+
+
+def _remember(key, movies, events, complete):
+    with _cache_lock:
+        _cache[key] = (movies, events, complete)
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def search(query: str, genre: str = None, limit: int = MAX_RESULTS):
+    """Ranked (movies, events) rows matching query, optionally only those
+    tagged with genre. An empty query lists the genre (or everything).
+    Cheap to call on every keystroke; see the cache notes above."""
+    genre = None if genre in (None, '', 'All') else genre
+    words = _words(query)
+    if not fts_available():
+        return _like_search((query or '').strip(), genre, limit)
+    key = (tuple(words), genre, limit)
+    hit = _cached(key)
+    if hit is not None:
+        return hit
+    complete = True
+    if not words and not genre:
+        movies = db.execute_query("SELECT * FROM movies LIMIT ?", (limit,), fetch_all=True) or []
+        events = db.execute_query("SELECT * FROM events LIMIT ?", (limit,), fetch_all=True) or []
+    else:
+        movies, events, complete = _fts_search(words, genre, limit)
+        if not movies and not events and words:
+            found = _fts_search(words, genre, limit, fuzzy=True)
+            if found is not None:
+                movies, events, _ = found
+                complete = False
+    # a fuzzy, partly ranked or truncated result can't stand in for a longer
+    # query's matches
+    _remember(key, movies, events, complete and len(movies) < limit and len(events) < limit)
+    return list(movies), list(events)
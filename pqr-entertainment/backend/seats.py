@@ -0,0 +1,168 @@
+"""Compact seat-state codec for scheduled_screens.seat_bits.
+
+A show's seats are a row-major bitset stored as a BLOB: seat (r, c) is bit
+r * cols + c, least significant bit first within each byte. Row 0 is the
+back row (the top of the seat grid, 'J' in a 10-row hall), matching the old
+seat_map_json matrix, so a 10x10 hall fits in 13 bytes. Counting booked seats
+is a bytes.translate() through a popcount table plus sum(), with no parsing.
+"""
+import json
+import math
+import re
+
+DEFAULT_ROWS = 10
+DEFAULT_COLS = 10
+
+# number of set bits in every possible byte value
+_POPCOUNT = bytes(bin(i).count('1') for i in range(256))
+_LABEL_RE = re.compile(r'^([A-Z]+)(\d+)$')
+
+
+def size_bytes(rows: int, cols: int) -> int:
+    return (rows * cols + 7) // 8
+
+
+def empty(rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS) -> bytes:
+    """All seats free"""
+    return bytes(size_bytes(rows, cols))
+
+
+def count_booked(bits) -> int:
+    """Number of booked seats (popcount of the bitset)"""
+    if not bits:
+        return 0
+    return sum(bytes(bits).translate(_POPCOUNT))
+
+
+def count_free(bits, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS) -> int:
+    return rows * cols - count_booked(bits)
+
+
+def is_booked(bits, cols: int, row: int, col: int) -> bool:
+    i = row * cols + col
+    if not bits or (i >> 3) >= len(bits):
+        return False
+    return bool(bits[i >> 3] & (1 << (i & 7)))
+
+
+def set_seats(bits, cols: int, positions, booked: bool = True) -> bytes:
+    """Return a copy of bits with each (row, col) in positions marked booked
+    (or freed when booked=False)."""
+    out = bytearray(bits or b'')
+    for row, col in positions:
+        i = row * cols + col
+        if (i >> 3) >= len(out):
+            out.extend(bytes((i >> 3) + 1 - len(out)))
+        if booked:
+            out[i >> 3] |= 1 << (i & 7)
+        else:
+            out[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+    return bytes(out)
+
+
+def encode(seat_map) -> bytes:
+    """Pack a list-of-lists 0/1 matrix (the old seat_map_json form)"""
+    cols = max((len(r) for r in seat_map), default=0)
+    positions = [(r, c) for r, row in enumerate(seat_map) for c, v in enumerate(row) if v]
+    return set_seats(empty(len(seat_map), cols), cols, positions)
+
+
+def decode(bits, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS):
+    """Unpack to a list-of-lists 0/1 matrix"""
+    return [[1 if is_booked(bits, cols, r, c) else 0 for c in range(cols)] for r in range(rows)]
+
+
+def from_json(seat_map_json, rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS):
+    """Convert a legacy seat_map_json value to (bits, rows, cols); invalid or
+    empty JSON gives an empty hall of the given size."""
+    try:
+        seat_map = json.loads(seat_map_json)
+        if seat_map and all(isinstance(r, list) for r in seat_map):
+            cols = max(len(r) for r in seat_map)
+            return encode(seat_map), len(seat_map), cols
+    except Exception:
+        pass
+    return empty(rows, cols), rows, cols
+
+
+def row_label(row: int, rows: int) -> str:
+    """Display letter of grid row `row` (0 = back row); the front row is 'A'"""
+    n = rows - 1 - row
+    label = ''
+    while True:
+        label = chr(ord('A') + n % 26) + label
+        n = n // 26 - 1
+        if n < 0:
+            return label
+
+
+def seat_label(row: int, col: int, rows: int) -> str:
+    return f"{row_label(row, rows)}{col + 1}"
+
+
+def seat_position(label: str, rows: int):
+    """Inverse of seat_label: 'J1' -> (0, 0) in a 10-row hall"""
+    m = _LABEL_RE.match(label.strip().upper())
+    if not m:
+        raise ValueError(f"Invalid seat label: {label}")
+    n = 0
+    for ch in m.group(1):
+        n = n * 26 + (ord(ch) - ord('A') + 1)
+    return rows - n, int(m.group(2)) - 1
+
+
+def price_band(row: int, rows: int, hall_type: str = 'cinema') -> str:
+    """Price column ('price_economy', 'price_central' or 'price_premium') of
+    grid row `row` (0 = back row). The rows split 30/40/30 from the back; a
+    cinema charges premium at the back (recliners), a stage at the front."""
+    back, front = round(rows * 0.3), round(rows * 0.7)
+    if back <= row < front:
+        return 'price_central'
+    at_back = row < back
+    if (hall_type or 'cinema').lower() == 'stage':
+        at_back = not at_back
+    return 'price_premium' if at_back else 'price_economy'
+
+
+def band_labels(band: str, rows: int, hall_type: str = 'cinema') -> str:
+    """Row letters of a price band, front first ('A-C'); '' if it has no rows"""
+    labels = [row_label(r, rows) for r in reversed(range(rows)) if price_band(r, rows, hall_type) == band]
+    if not labels:
+        return ''
+    return labels[0] if len(labels) == 1 else f"{labels[0]}-{labels[-1]}"
+
+
+def seat_price(show, label: str):
+    """Price of a seat from a show row with price_economy/central/premium,
+    seat_rows and hall_type (the theatre's)"""
+    rows = show['seat_rows'] or DEFAULT_ROWS
+    row, _ = seat_position(label, rows)
+    return show[price_band(row, rows, show['hall_type'])]
+
+
+def layout_from_schema(seating_schema_json):
+    """(rows, cols) of one screen from a theatre's seating_schema_json.
+    Explicit 'rows'/'cols' win; otherwise seats_per_screen is laid out in
+    rows of ten."""
+    try:
+        schema = json.loads(seating_schema_json or '{}')
+    except Exception:
+        schema = {}
+    try:
+        rows, cols = int(schema.get('rows') or 0), int(schema.get('cols') or 0)
+        if rows > 0 and cols > 0:
+            return rows, cols
+        seats = int(schema.get('seats_per_screen') or DEFAULT_ROWS * DEFAULT_COLS)
+        if seats > 0:
+            return math.ceil(seats / DEFAULT_COLS), DEFAULT_COLS
+    except (TypeError, ValueError, AttributeError):
+        pass
+    return DEFAULT_ROWS, DEFAULT_COLS
+
+
+def screen_count(seating_schema_json) -> int:
+    """Number of screens in a theatre (seating_schema_json 'screens', default 5)"""
+    try:
+        return max(1, int(json.loads(seating_schema_json or '{}').get('screens') or 5))
+    except (TypeError, ValueError, AttributeError):
+        return 5
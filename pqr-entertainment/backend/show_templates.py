@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+from dbwrap import db
+from backend import bulk_schedule
+from backend import seats as seat_codec
+
+# Recurring show templates.
+# A template ("movie 3 on theatre 5 screen 2, daily at 19:00 until 30 Nov")
+# is one show_templates row. Its concrete shows are written to
+# scheduled_screens only up to a rolling horizon, when a listing or booking
+# page calls ensure_expanded(); expanded_through records how far each
+# template has been written. Expanded rows go through the same validation as
+# a bulk import, so a slot that would overlap another show or repeat a movie
+# in the city that day is skipped, never double-booked. expanded_through
+# stops before a template's first skipped day, so skipped slots are tried
+# again on the next expansion (until their day has passed); slots already
+# written are not planned twice, and slots earlier than now are never written.
+#
+# Editing a template rewrites one row and retracts only its future, unsold
+# shows (at most a horizon's worth); they are re-expanded from the new
+# definition on the next ensure_expanded().
+
+HORIZON_DAYS = int(os.environ.get('TBMS_TEMPLATE_HORIZON', 7))
+EVERY_DAY = 0b1111111  # weekdays bitmask, bit 0 = Monday
+
+_FIELDS = ('theatre_id', 'screen_number', 'movie_id', 'event_id', 'times', 'weekdays',
+           'start_date', 'end_date', 'duration_seconds', 'price_economy', 'price_central', 'price_premium')
+
+# (templates change counter, today, expanded-through date) after the last
+# ensure_expanded(), so repeated page opens skip the expansion query
+_ensured = None
+_ensured_lock = threading.Lock()
+
+
+def _check_times(times):
+    """Normalize showtimes to sorted 'HH:MM' strings"""
+    out = set()
+    for t in times:
+        try:
+            out.add(datetime.strptime(str(t).strip(), '%H:%M').strftime('%H:%M'))
+        except ValueError:
+            raise ValueError(f"Invalid showtime: {t}") from None
+    if not out:
+        raise ValueError("A template needs at least one showtime")
+    return sorted(out)
+
+
+def _validate(fields: dict):
+    if (fields.get('movie_id') is None) == (fields.get('event_id') is None):
+        raise ValueError("Give exactly one of movie_id or event_id")
+    if fields.get('movie_id') is not None and len(fields['times']) > 1:
+        raise ValueError("A movie can only be shown once per city per day")
+    if not 0 < int(fields.get('weekdays', EVERY_DAY)) <= EVERY_DAY:
+        raise ValueError("weekdays must select at least one day")
+    date.fromisoformat(fields['start_date'])
+    if fields.get('end_date') is not None and fields['end_date'] < fields['start_date']:
+        raise ValueError("end_date is before start_date")
+    theatre = db.execute_query("SELECT seating_schema_json FROM theatres WHERE theatre_id = ?",
+                               (fields['theatre_id'],), fetch_one=True)
+    if theatre is None:
+        raise ValueError(f"Unknown theatre {fields['theatre_id']}")
+    if not 1 <= int(fields['screen_number']) <= seat_codec.screen_count(theatre['seating_schema_json']):
+        raise ValueError(f"Theatre {fields['theatre_id']} has no screen {fields['screen_number']}")
+
+
+def create_template(theatre_id: int, screen_number: int, times, start_date: str, end_date: str = None,
+                    movie_id: int = None, event_id: int = None, weekdays: int = EVERY_DAY,
+                    duration_seconds: int = None, prices=bulk_schedule.DEFAULT_PRICES):
+    """Store a recurring schedule and expand it through the horizon.
+    times: showtimes like ['10:00', '14:00'] (one for a movie); dates are
+    inclusive, end_date None repeats forever; duration_seconds None uses the
+    title's duration. Returns (template_id, skipped): the slots within the
+    horizon that the scheduling rules rejected, as expand_templates()
+    reports them (later days are checked as they come into the horizon)."""
+    fields = dict(theatre_id=theatre_id, screen_number=screen_number, movie_id=movie_id, event_id=event_id,
+                  times=_check_times(times), weekdays=weekdays, start_date=start_date, end_date=end_date)
+    _validate(fields)
+    with db.transaction() as conn:
+        cur = conn.execute(
+            """INSERT INTO show_templates (theatre_id, screen_number, movie_id, event_id, times_json, weekdays,
+                   start_date, end_date, duration_seconds, price_economy, price_central, price_premium)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (theatre_id, screen_number, movie_id, event_id, json.dumps(fields['times']), weekdays,
+             start_date, end_date, duration_seconds, *prices)
+        )
+        template_id = cur.lastrowid
+    result = ensure_expanded() or {'skipped': []}
+    return template_id, [v for v in result['skipped'] if v['template_id'] == template_id]
+
+
+def _retract(conn, template_id: int) -> int:
+    """Delete the template's future shows nobody has booked or is holding"""
+    cur = conn.execute(
+        """DELETE FROM scheduled_screens
+           WHERE template_id = ? AND start_time >= ? AND seats_booked = 0 AND seats_held = 0""",
+        (template_id, datetime.now().replace(microsecond=0).isoformat())
+    )
+    return cur.rowcount
+
+
+def update_template(template_id: int, **changes):
+    """Change a template (any of the create_template fields; prices as
+    price_economy/price_central/price_premium). Future unsold shows are
+    re-expanded from the new definition; sold ones are kept."""
+    unknown = set(changes) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown template fields: {', '.join(sorted(unknown))}")
+    row = db.execute_query("SELECT * FROM show_templates WHERE template_id = ?", (template_id,), fetch_one=True)
+    if row is None:
+        raise ValueError(f"Unknown template {template_id}")
+    fields = {k: row[k] for k in _FIELDS if k != 'times'}
+    fields['times'] = json.loads(row['times_json'])
+    fields.update(changes)
+    fields['times'] = _check_times(fields['times'])
+    _validate(fields)
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    with db.transaction() as conn:
+        _retract(conn, template_id)
+        conn.execute(
+            """UPDATE show_templates SET theatre_id = ?, screen_number = ?, movie_id = ?, event_id = ?,
+                   times_json = ?, weekdays = ?, start_date = ?, end_date = ?, duration_seconds = ?,
+                   price_economy = ?, price_central = ?, price_premium = ?,
+                   expanded_through = MIN(COALESCE(expanded_through, ?), ?)
+               WHERE template_id = ?""",
+            (fields['theatre_id'], fields['screen_number'], fields['movie_id'], fields['event_id'],
+             json.dumps(fields['times']), fields['weekdays'], fields['start_date'], fields['end_date'],
+             fields['duration_seconds'], fields['price_economy'], fields['price_central'], fields['price_premium'],
+             yesterday, yesterday, template_id)
+        )
+    ensure_expanded()
+
+
+def delete_template(template_id: int) -> int:
+    """Stop a recurring schedule: its future unsold shows are deleted, sold
+    and past shows stay as ordinary shows. Returns how many were deleted."""
+    with db.transaction() as conn:
+        deleted = _retract(conn, template_id)
+        conn.execute("UPDATE scheduled_screens SET template_id = NULL WHERE template_id = ?", (template_id,))
+        conn.execute("DELETE FROM show_templates WHERE template_id = ?", (template_id,))
+    return deleted
+
+
+def _template_rows(t, first: date, last: date, not_before: datetime, written=()):
+    """Plan rows (bulk_schedule format) for one template's shows in [first,
+    last], leaving out those starting before not_before or already written
+    (start_time strings)"""
+    times = json.loads(t['times_json'])
+    rows = []
+    day = first
+    while day <= last:
+        if t['weekdays'] & (1 << day.weekday()):
+            for hhmm in times:
+                start = datetime.fromisoformat(f"{day.isoformat()}T{hhmm}")
+                if start < not_before or start.isoformat() in written:
+                    continue
+                row = {
+                    'template_id': t['template_id'], 'theatre_id': t['theatre_id'],
+                    'screen_number': t['screen_number'], 'movie_id': t['movie_id'], 'event_id': t['event_id'],
+                    'start_time': start.isoformat(),
+                    'price_economy': t['price_economy'], 'price_central': t['price_central'],
+                    'price_premium': t['price_premium'],
+                }
+                if t['duration_seconds']:
+                    row['end_time'] = (start + timedelta(seconds=t['duration_seconds'])).isoformat()
+                rows.append(row)
+        day += timedelta(days=1)
+    return rows
+
+
+def expand_templates(through: str = None) -> dict:
+    """Write every template's shows up to `through` (default: today +
+    HORIZON_DAYS). Past slots are never written. Returns {'inserted',
+    'skipped'}; skipped lists the slots rejected by the scheduling rules as
+    {'template_id', 'start_time', 'reasons'}."""
+    now = datetime.now().replace(microsecond=0)
+    today = now.date()
+    target = max(date.fromisoformat(through[:10]) if through else today, today + timedelta(days=HORIZON_DAYS))
+    with db.transaction() as conn:
+        templates = conn.execute(
+            """SELECT * FROM show_templates
+               WHERE COALESCE(expanded_through, '') < ? AND start_date <= ?
+                 AND (end_date IS NULL OR COALESCE(expanded_through, '') < end_date)""",
+            (target.isoformat(), target.isoformat())
+        ).fetchall()
+        plan, last_days = [], {}
+        for t in templates:
+            after = date.fromisoformat(t['expanded_through']) + timedelta(days=1) if t['expanded_through'] else today
+            first = max(after, today, date.fromisoformat(t['start_date']))
+            last = min(target, date.fromisoformat(t['end_date'])) if t['end_date'] else target
+            # days after a skipped one were written last time; don't plan them again
+            written = {r[0] for r in conn.execute(
+                "SELECT start_time FROM scheduled_screens WHERE template_id = ? AND show_date >= ?",
+                (t['template_id'], first.isoformat()))}
+            plan.extend(_template_rows(t, first, last, now, written))
+            last_days[t['template_id']] = last
+        valid, violations = bulk_schedule.validate_plan(conn, plan)
+        for v in violations:
+            # stop short of a skipped day, so the next expansion retries it
+            row = plan[v['row'] - 1]
+            retry = date.fromisoformat(row['start_time'][:10]) - timedelta(days=1)
+            last_days[row['template_id']] = min(last_days[row['template_id']], retry)
+        marks = [(last.isoformat(), template_id) for template_id, last in last_days.items()]
+        conn.executemany(
+            """INSERT INTO scheduled_screens (theatre_id, movie_id, event_id, screen_number, start_time, end_time,
+                   seat_bits, seat_rows, seat_cols, price_economy, price_central, price_premium, template_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [(s['theatre_id'], s['movie_id'], s['event_id'], s['screen_number'], s['start'].isoformat(),
+              s['end'].isoformat(), seat_codec.empty(*s['layout']), *s['layout'], *s['prices'],
+              plan[s['row'] - 1]['template_id'])
+             for s in valid]
+        )
+        conn.executemany("UPDATE show_templates SET expanded_through = ? WHERE template_id = ?", marks)
+    skipped = [{'template_id': plan[v['row'] - 1]['template_id'], 'start_time': plan[v['row'] - 1]['start_time'],
+                'reasons': v['reasons']} for v in violations]
+    return {'inserted': len(valid), 'skipped': skipped}
+
+
+def ensure_expanded(through: str = None):
+    """Make sure template shows exist up to `through` (default: the horizon)
+    before a listing or booking query reads scheduled_screens. Cheap when
+    nothing changed since the last call: one change counter read."""
+    global _ensured
+    if db.in_transaction():
+        # expansion commits on its own; don't run it inside a caller's block
+        return None
+    key_day = through[:10] if through else None
+    version = db.change_version('templates')
+    today = date.today()
+    with _ensured_lock:
+        done = _ensured
+    if done is not None and done[0] == version and done[1] == today and (key_day is None or key_day <= done[2]):
+        return None
+    result = expand_templates(through)
+    horizon = max(key_day or '', (today + timedelta(days=HORIZON_DAYS)).isoformat())
+    with _ensured_lock:
+        _ensured = (db.change_version('templates'), today, horizon)
+    return result
+
+
+def list_templates():
+    """All templates with their showtimes decoded"""
+    rows = db.execute_query("SELECT * FROM show_templates ORDER BY template_id", fetch_all=True) or []
+    return [dict(r, times=json.loads(r['times_json'])) for r in rows]
@@ -0,0 +1,95 @@
+import threading
+from collections import OrderedDict
+
+from dbwrap import db
+
+# Page data cache for navigation.
+# Back, Forward and Refresh rebuild a page by calling its show_* function
+# again. The data such a page reads is kept here under (route, key), where
+# key holds whatever the queries depend on (user, filters, page token, day),
+# together with the change counters of the tables it came from (migration
+# 13: triggers bump a table's counter on every insert, update and delete,
+# from this process or any other). While none of those counters has moved,
+# revisiting the page reuses its data without running its queries; a booking
+# insert bumps 'bookings', so My Bookings, the history and the analytics
+# pages reload and the halls and employees pages do not.
+
+CACHE_SIZE = 128
+
+# Tables (change counters) each routed page reads. The page's cached data
+# is stamped with them, and main.py shows a page kept from an earlier visit
+# again only while none of them has changed (see frontend/page_manager.py),
+# so both agree on which writes make a page stale. Routes not listed are
+# rebuilt on every visit.
+PAGE_TABLES = {
+    'user_home': ('movies',),
+    'user_profile': ('users',),
+    'my_bookings': ('bookings', 'scheduled_screens', 'movies', 'events', 'theatres'),
+    'booking_history': ('bookings', 'scheduled_screens', 'movies', 'events', 'theatres'),
+    'watchlist': ('watchlist', 'movies'),
+    'wallet': ('users',),
+    'feedback': ('feedbacks',),
+    'events': ('events',),
+    'producer_dashboard': ('movies', 'events'),
+    'producer_analytics': ('movies', 'events', 'scheduled_screens', 'bookings'),
+    'admin_profile': ('users',),
+    'cinema_halls': ('theatres',),
+    'employees': ('employees',),
+    'screen_manager': ('scheduled_screens', 'theatres', 'movies', 'events', 'templates'),
+    'admin_feedback': ('feedbacks', 'users'),
+    'admin_analytics': ('bookings', 'scheduled_screens', 'movies'),
+    'manage_movies': ('movies', 'scheduled_screens', 'bookings'),
+}
+
+_cache = OrderedDict()  # (route, key) -> (table versions, value)
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def stamp(tables):
+    """The change counters of tables, as a comparable value; None if one of
+    them has no counter (database not migrated), which is never cached"""
+    versions = db.change_versions()
+    counters = tuple((t, versions.get(t)) for t in tables)
+    return None if any(v is None for _, v in counters) else counters
+
+
+def cached(route: str, key, tables, load):
+    """load() for (route, key), reused until a row of one of tables changes.
+    The value is shared between visits; treat it as read-only."""
+    current = stamp(tables)
+    entry = (route, key)
+    with _lock:
+        hit = _cache.get(entry)
+        if current is not None and hit is not None and hit[0] == current:
+            _cache.move_to_end(entry)
+            _stats['hits'] += 1
+            return hit[1]
+        _stats['misses'] += 1
+    value = load()
+    if current is not None:
+        # stamped before loading: a write in between only causes a reload
+        with _lock:
+            _cache[entry] = (current, value)
+            _cache.move_to_end(entry)
+            while len(_cache) > CACHE_SIZE:
+                _cache.popitem(last=False)
+    return value
+
+
+def paginate(route: str, tables, query, params=None, order_by=(), page_size=db.PAGE_SIZE, token=None):
+    """db.paginate() through the cache"""
+    key = (query, tuple(params or ()), tuple(order_by), page_size, token)
+    return cached(route, key, tables, lambda: db.paginate(query, params, order_by, page_size, token))
+
+
+def invalidate(route: str = None):
+    """Drop the cached data of one route, or of every route"""
+    with _lock:
+        for entry in [e for e in _cache if route is None or e[0] == route]:
+            del _cache[entry]
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, entries=len(_cache))
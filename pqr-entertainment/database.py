@@ -7,18 +7,234 @@ Can be extended to use Supabase or REST API by replacing query functions
 import sqlite3
 import json
 import os
+import threading
+import time
+import atexit
+import base64
+import itertools
+import re
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
+from backend import seats as seat_codec
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'tbms.db')
 
 
-def get_connection():
-    """Get database connection"""
-    conn = sqlite3.connect(DB_PATH)
+class CityMovieConflictError(sqlite3.IntegrityError):
+    """A movie was scheduled twice in one city on one day. Raised instead of
+    the plain IntegrityError from the idx_screens_city_movie_day unique index
+    (migration 8), so the rule holds even when two admins schedule at once."""
+
+
+_CITY_MOVIE_KEY = "scheduled_screens.city, scheduled_screens.movie_id, scheduled_screens.show_date"
+
+
+def _typed_error(exc):
+    """Map constraint failures we know about onto their typed exceptions"""
+    if isinstance(exc, sqlite3.IntegrityError) and not isinstance(exc, CityMovieConflictError) \
+            and _CITY_MOVIE_KEY in str(exc):
+        return CityMovieConflictError("This movie already has a show scheduled in this city on that date")
+    return exc
+
+# Storage profiles: pragmas applied to every pooled connection.
+# 'default' favours concurrency (WAL lets readers run alongside a writer);
+# 'safe' keeps WAL but fsyncs every commit; 'legacy' mirrors SQLite defaults.
+STORAGE_PROFILES = {
+    'default': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,        # KiB when negative (~16 MB)
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,        # ms to wait on a locked database
+    },
+    'safe': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+}
+_storage = dict(STORAGE_PROFILES.get(os.environ.get('TBMS_STORAGE_PROFILE', 'default'),
+                                     STORAGE_PROFILES['default']))
+
+# Connection pool: long-lived writer + read-only connection per thread, reused by execute_query
+_local = threading.local()
+_pool_lock = threading.Lock()
+_pool_connections = []  # (owner thread, connection)
+_pool_generation = 0    # bumped when the pool is closed so threads reconnect
+_pool_stats = {'hits': 0, 'misses': 0, 'reads': 0, 'commits': 0, 'queries': 0, 'query_time_ms': 0.0}
+
+
+def _apply_pragmas(conn, readonly=False):
+    """Apply the active storage profile to a connection"""
+    cursor = conn.cursor()
+    cursor.execute(f"PRAGMA busy_timeout = {int(_storage['busy_timeout'])}")
+    if not readonly:
+        # journal_mode is persistent in the file; only the writer sets it.
+        # Leaving WAL needs exclusive access, so keep the current mode if
+        # another connection still has the database open.
+        try:
+            cursor.execute(f"PRAGMA journal_mode = {_storage['journal_mode']}")
+        except sqlite3.OperationalError:
+            pass
+        cursor.execute(f"PRAGMA synchronous = {_storage['synchronous']}")
+    else:
+        cursor.execute("PRAGMA query_only = 1")
+    cursor.execute(f"PRAGMA cache_size = {int(_storage['cache_size'])}")
+    cursor.execute(f"PRAGMA mmap_size = {int(_storage['mmap_size'])}")
+    cursor.execute(f"PRAGMA temp_store = {_storage['temp_store']}")
+    cursor.close()
+
+
+def _open_connection(readonly=False):
+    """Open a new connection with the row factory used across the app"""
+    # check_same_thread=False only so close_all_connections() can close
+    # connections of finished threads; each connection is used by one thread.
+    if readonly:
+        conn = sqlite3.connect(f"file:{DB_PATH}?mode=ro", uri=True, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    _apply_pragmas(conn, readonly)
+    return conn
+
+
+def get_connection():
+    """Get a fresh, unpooled database connection (caller must close it)"""
+    return _open_connection()
+
+
+def configure_storage(profile=None, **overrides):
+    """Switch storage profile and/or override single pragmas, e.g.
+    configure_storage('safe') or configure_storage(mmap_size=0).
+    Pooled connections are closed so the next query uses the new settings.
+    """
+    global _storage
+    if profile is not None:
+        if profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile: {profile}")
+        _storage = dict(STORAGE_PROFILES[profile])
+    for key, value in overrides.items():
+        if key not in _storage:
+            raise ValueError(f"Unknown storage setting: {key}")
+        _storage[key] = value
+    close_all_connections()
+    return dict(_storage)
+
+
+def storage_settings():
+    """Return the pragmas currently applied to new connections"""
+    return dict(_storage)
+
+
+def _prune_dead_connections():
+    """Close pooled connections whose owning thread has exited (lock held)"""
+    alive = []
+    for owner, conn in _pool_connections:
+        if owner.is_alive():
+            alive.append((owner, conn))
+        else:
+            try:
+                conn.close()
+            except Exception:
+                pass
+    _pool_connections[:] = alive
+
+
+def _pooled(attr, readonly):
+    """Fetch (or lazily open) this thread's pooled connection stored under attr"""
+    if getattr(_local, 'generation', None) != _pool_generation:
+        _local.conn = None
+        _local.reader = None
+        _local.generation = _pool_generation
+    conn = getattr(_local, attr, None)
+    if conn is not None:
+        with _pool_lock:
+            _pool_stats['hits'] += 1
+        return conn
+    conn = _open_connection(readonly)
+    setattr(_local, attr, conn)
+    with _pool_lock:
+        _pool_stats['misses'] += 1
+        _prune_dead_connections()
+        _pool_connections.append((threading.current_thread(), conn))
     return conn
 
 
+def get_pooled_connection():
+    """Return this thread's long-lived read/write connection, opening it on first use"""
+    return _pooled('conn', readonly=False)
+
+
+def get_read_connection():
+    """Return this thread's read-only connection.
+    In WAL mode it reads a consistent snapshot without blocking (or being
+    blocked by) a writer; otherwise the read/write connection is returned.
+    """
+    if str(_storage['journal_mode']).upper() != 'WAL':
+        return get_pooled_connection()
+    # The writer creates the -wal/-shm files a read-only connection needs
+    get_pooled_connection()
+    try:
+        return _pooled('reader', readonly=True)
+    except sqlite3.OperationalError:
+        return get_pooled_connection()
+
+
+def _is_read_statement(query):
+    """True for plain SELECT statements that can go to the read-only connection"""
+    head = query.lstrip().upper()
+    if head.startswith('SELECT'):
+        return True
+    if head.startswith('WITH'):
+        return not any(k in head for k in ('INSERT', 'UPDATE', 'DELETE', 'REPLACE'))
+    return False
+
+
+def pool_stats():
+    """Return pool hit/miss counters and average query latency"""
+    with _pool_lock:
+        stats = dict(_pool_stats)
+        stats['open_connections'] = len(_pool_connections)
+    queries = stats['queries']
+    stats['avg_query_ms'] = (stats['query_time_ms'] / queries) if queries else 0.0
+    return stats
+
+
+def reset_pool_stats():
+    """Zero the pool counters (open connections are kept)"""
+    with _pool_lock:
+        _pool_stats.update({'hits': 0, 'misses': 0, 'reads': 0, 'commits': 0, 'queries': 0, 'query_time_ms': 0.0})
+
+
+def close_all_connections():
+    """Close every pooled connection; threads reconnect lazily on next query"""
+    global _pool_generation
+    with _pool_lock:
+        for _, conn in _pool_connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _pool_connections.clear()
+        _pool_generation += 1
+
+
+atexit.register(close_all_connections)
+
+
 def init_database():
     """Initialize database with all required tables"""
     conn = get_connection()
@@ -183,31 +399,742 @@ def init_database():
         conn.commit()
     
     conn.close()
+    migrate_database()
 
 
-def execute_query(query, params=None, fetch_one=False, fetch_all=False):
-    """Execute a query and return results"""
+def _migrate_seat_maps(conn):
+    """Convert every seat_map_json matrix into the seat_bits bitset"""
+    rows = conn.execute(
+        """SELECT ss.screen_id, ss.seat_map_json, t.seating_schema_json
+           FROM scheduled_screens ss LEFT JOIN theatres t ON ss.theatre_id = t.theatre_id"""
+    ).fetchall()
+    updates = []
+    for screen_id, seat_map_json, schema_json in rows:
+        hall_rows, hall_cols = seat_codec.layout_from_schema(schema_json)
+        bits, hall_rows, hall_cols = seat_codec.from_json(seat_map_json, hall_rows, hall_cols)
+        updates.append((bits, hall_rows, hall_cols, screen_id))
+    conn.executemany(
+        "UPDATE scheduled_screens SET seat_bits = ?, seat_rows = ?, seat_cols = ?, seat_map_json = NULL WHERE screen_id = ?",
+        updates
+    )
+
+
+def _backfill_seat_counts(conn):
+    """Fill seats_booked from each show's seat_bits"""
+    rows = conn.execute("SELECT screen_id, seat_bits FROM scheduled_screens").fetchall()
+    conn.executemany(
+        "UPDATE scheduled_screens SET seats_booked = ? WHERE screen_id = ?",
+        [(seat_codec.count_booked(bits), screen_id) for screen_id, bits in rows]
+    )
+
+
+def _json_words(column):
+    """SQL expression flattening a JSON array column to space-separated text
+    (invalid JSON is indexed as-is rather than failing the write)"""
+    return (f"CASE WHEN json_valid({column}) THEN (SELECT group_concat(value, ' ') FROM json_each({column})) "
+            f"ELSE {column} END")
+
+
+# prefix lengths catalog_fts keeps an index for, so "t*" or "ta*" typed into
+# the search box is a single doclist lookup instead of a scan of every term
+CATALOG_FTS_PREFIX = '1 2 3'
+
+
+def _create_catalog_fts(conn):
+    """Full-text index over movies and events (see backend/search.py).
+    rowid is movie_id * 2 for movies and event_id * 2 + 1 for events, so the
+    sync triggers address one row directly. Skipped when this SQLite build
+    has no FTS5; search then falls back to LIKE."""
+    try:
+        conn.execute(
+            f"""CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+                   title, description, people, genres, languages,
+                   tokenize = 'unicode61 remove_diacritics 2', prefix = '{CATALOG_FTS_PREFIX}')"""
+        )
+    except sqlite3.OperationalError:
+        return
+    # title matches count most, then cast/performers, then genres
+    conn.execute("INSERT INTO catalog_fts (catalog_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0, 4.0, 2.0, 1.0)')")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS catalog_vocab USING fts5vocab(catalog_fts, 'row')")
+    conn.execute("INSERT OR IGNORE INTO change_counters (name, version) VALUES ('catalog', 0)")
+    movie_row = (f"NEW.movie_id * 2, NEW.title, NEW.description, {_json_words('NEW.actors_json')}, "
+                 f"{_json_words('NEW.genres_json')}, {_json_words('NEW.languages_json')}")
+    event_row = (f"NEW.event_id * 2 + 1, NEW.title, NEW.description, {_json_words('NEW.performers_json')}, "
+                 f"{_json_words('NEW.genres_json')}, ''")
+    columns = "rowid, title, description, people, genres, languages"
+    bump = "UPDATE change_counters SET version = version + 1 WHERE name = 'catalog';"
+    for table, key, row in (('movies', 'movie_id * 2', movie_row), ('events', 'event_id * 2 + 1', event_row)):
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_insert AFTER INSERT ON {table}
+                         BEGIN INSERT INTO catalog_fts ({columns}) VALUES ({row}); {bump} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_update AFTER UPDATE ON {table}
+                         BEGIN DELETE FROM catalog_fts WHERE rowid = OLD.{key};
+                               INSERT INTO catalog_fts ({columns}) VALUES ({row}); {bump} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_fts_delete AFTER DELETE ON {table}
+                         BEGIN DELETE FROM catalog_fts WHERE rowid = OLD.{key}; {bump} END""")
+        conn.execute(f"INSERT INTO catalog_fts ({columns}) SELECT {row.replace('NEW.', '')} FROM {table}")
+
+
+def _rebuild_catalog_fts(conn):
+    """Recreate catalog_fts if it was built with other prefix options (an
+    FTS5 table can't be altered). The sync triggers refer to it by name and
+    keep working."""
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'catalog_fts'").fetchone()
+    if row is None or f"prefix = '{CATALOG_FTS_PREFIX}'" in row[0]:
+        return
+    conn.execute("DROP TABLE IF EXISTS catalog_vocab")
+    conn.execute("DROP TABLE catalog_fts")
+    _create_catalog_fts(conn)
+
+
+# Junction tables mirroring the JSON list columns, one row per (id, value):
+# (table, key column, value column, source table, JSON column)
+FACET_TABLES = (
+    ('movie_genres', 'movie_id', 'genre', 'movies', 'genres_json'),
+    ('movie_languages', 'movie_id', 'language', 'movies', 'languages_json'),
+    ('movie_actors', 'movie_id', 'actor', 'movies', 'actors_json'),
+    ('event_genres', 'event_id', 'genre', 'events', 'genres_json'),
+)
+
+
+def _json_items(column):
+    """SQL table-valued json_each() over a JSON array column (invalid JSON
+    yields no rows rather than failing the write)"""
+    return f"json_each(CASE WHEN json_valid({column}) THEN {column} ELSE '[]' END)"
+
+
+def _create_facet_tables(conn):
+    """Normalized genre/language/actor tables (see backend/catalog.py), filled
+    from the existing JSON columns and kept in sync by triggers on movies and
+    events, so filters and facet counts are indexed lookups instead of
+    parsing every row's JSON in Python."""
+    for table, key, value, source, column in FACET_TABLES:
+        conn.execute(f"""CREATE TABLE IF NOT EXISTS {table} (
+                             {key} INTEGER NOT NULL REFERENCES {source}({key}),
+                             {value} TEXT NOT NULL,
+                             PRIMARY KEY ({key}, {value})
+                         ) WITHOUT ROWID""")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{value} ON {table} ({value}, {key})")
+        items = "WHERE j.type = 'text' AND TRIM(j.value) <> ''"
+        fill = (f"INSERT OR IGNORE INTO {table} ({key}, {value}) "
+                f"SELECT NEW.{key}, TRIM(j.value) FROM {_json_items(f'NEW.{column}')} j {items};")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_insert AFTER INSERT ON {source}
+                         BEGIN {fill} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_update AFTER UPDATE OF {column} ON {source}
+                         BEGIN DELETE FROM {table} WHERE {key} = OLD.{key}; {fill} END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_delete AFTER DELETE ON {source}
+                         BEGIN DELETE FROM {table} WHERE {key} = OLD.{key}; END""")
+        conn.execute(f"""INSERT OR IGNORE INTO {table} ({key}, {value})
+                         SELECT s.{key}, TRIM(j.value) FROM {source} s, {_json_items(f's.{column}')} j {items}""")
+
+
+# Tables with a change counter of their own (migration 13), named after the
+# table; backend/view_cache.py compares them to reuse page data
+WATCHED_TABLES = ('users', 'producers', 'movies', 'events', 'theatres', 'scheduled_screens',
+                  'bookings', 'employees', 'feedbacks', 'watchlist')
+
+# schedule_log entries kept (migration 15)
+SCHEDULE_LOG_KEEP = 5000
+
+
+def _create_table_counters(conn):
+    for table in WATCHED_TABLES:
+        conn.execute("INSERT OR IGNORE INTO change_counters (name, version) VALUES (?, 0)", (table,))
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{op.lower()} AFTER {op} ON {table}
+                             BEGIN UPDATE change_counters SET version = version + 1 WHERE name = '{table}'; END""")
+
+
+# Schema migrations: (version, description, steps). A step is a SQL string or
+# a callable taking the connection. Pending migrations run in order, each in
+# its own transaction, and PRAGMA user_version records the last one applied,
+# so existing tbms.db files upgrade in place on the next start.
+MIGRATIONS = [
+    (1, "show_date column and indexes for hot query predicates", [
+        # Stored calendar date so "show on day X" filters can use an index
+        # instead of evaluating DATE(start_time) for every row
+        "ALTER TABLE scheduled_screens ADD COLUMN show_date TEXT",
+        "UPDATE scheduled_screens SET show_date = DATE(start_time)",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_show_date_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET show_date = DATE(NEW.start_time)
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_show_date_update
+           AFTER UPDATE OF start_time ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET show_date = DATE(NEW.start_time)
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        # Conflict checks: all shows on one physical screen (covering)
+        "CREATE INDEX IF NOT EXISTS idx_screens_theatre_screen ON scheduled_screens (theatre_id, screen_number, start_time, end_time)",
+        "CREATE INDEX IF NOT EXISTS idx_screens_movie_date ON scheduled_screens (movie_id, show_date)",
+        "CREATE INDEX IF NOT EXISTS idx_screens_event_date ON scheduled_screens (event_id, show_date)",
+        "CREATE INDEX IF NOT EXISTS idx_screens_date_theatre ON scheduled_screens (show_date, theatre_id)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_user ON bookings (user_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_screen ON bookings (screen_id, status)",
+        "CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings (booking_date)",
+        "CREATE INDEX IF NOT EXISTS idx_theatres_city ON theatres (city, hall_type)",
+        "CREATE INDEX IF NOT EXISTS idx_producers_user ON producers (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_watchlist_user ON watchlist (user_id)",
+    ]),
+    (2, "seat_bits bitset replaces seat_map_json", [
+        # see backend/seats.py for the layout; seat_map_json is left NULL
+        "ALTER TABLE scheduled_screens ADD COLUMN seat_bits BLOB",
+        "ALTER TABLE scheduled_screens ADD COLUMN seat_rows INTEGER NOT NULL DEFAULT 10",
+        "ALTER TABLE scheduled_screens ADD COLUMN seat_cols INTEGER NOT NULL DEFAULT 10",
+        _migrate_seat_maps,
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_seat_bits_insert
+           AFTER INSERT ON scheduled_screens
+           WHEN NEW.seat_bits IS NULL
+           BEGIN
+               UPDATE scheduled_screens SET seat_bits = zeroblob((NEW.seat_rows * NEW.seat_cols + 7) / 8)
+               WHERE screen_id = NEW.screen_id;
+           END""",
+    ]),
+    (3, "materialized seats_booked / seats_available counters", [
+        # seats_booked mirrors the popcount of seat_bits and is written in the
+        # same statement as seat_bits; seats_available follows by trigger
+        "ALTER TABLE scheduled_screens ADD COLUMN seats_booked INTEGER NOT NULL DEFAULT 0",
+        "ALTER TABLE scheduled_screens ADD COLUMN seats_available INTEGER NOT NULL DEFAULT 0",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_seats_available_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET seats_available = NEW.seat_rows * NEW.seat_cols - NEW.seats_booked
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_seats_available_update
+           AFTER UPDATE OF seats_booked, seat_rows, seat_cols ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET seats_available = NEW.seat_rows * NEW.seat_cols - NEW.seats_booked
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        _backfill_seat_counts,
+    ]),
+    (4, "seat_version for compare-and-swap seat reservations", [
+        # bumped on every seat_bits write; see backend/reservations.py
+        "ALTER TABLE scheduled_screens ADD COLUMN seat_version INTEGER NOT NULL DEFAULT 0",
+    ]),
+    (5, "seat_holds with TTL; held seats count as unavailable", [
+        """CREATE TABLE IF NOT EXISTS seat_holds (
+            hold_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            screen_id INTEGER NOT NULL,
+            seat TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            expires_at REAL NOT NULL,
+            UNIQUE (screen_id, seat),
+            FOREIGN KEY (screen_id) REFERENCES scheduled_screens(screen_id),
+            FOREIGN KEY (user_id) REFERENCES users(user_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_seat_holds_expiry ON seat_holds (expires_at)",
+        "ALTER TABLE scheduled_screens ADD COLUMN seats_held INTEGER NOT NULL DEFAULT 0",
+        """CREATE TRIGGER IF NOT EXISTS trg_seat_holds_insert
+           AFTER INSERT ON seat_holds
+           BEGIN
+               UPDATE scheduled_screens SET seats_held = seats_held + 1 WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_seat_holds_delete
+           AFTER DELETE ON seat_holds
+           BEGIN
+               UPDATE scheduled_screens SET seats_held = seats_held - 1 WHERE screen_id = OLD.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_delete_holds
+           AFTER DELETE ON scheduled_screens
+           BEGIN
+               DELETE FROM seat_holds WHERE screen_id = OLD.screen_id;
+           END""",
+        # seats_available now also excludes held seats
+        "DROP TRIGGER IF EXISTS trg_screens_seats_available_insert",
+        "DROP TRIGGER IF EXISTS trg_screens_seats_available_update",
+        """CREATE TRIGGER trg_screens_seats_available_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET seats_available = NEW.seat_rows * NEW.seat_cols - NEW.seats_booked - NEW.seats_held
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER trg_screens_seats_available_update
+           AFTER UPDATE OF seats_booked, seats_held, seat_rows, seat_cols ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET seats_available = NEW.seat_rows * NEW.seat_cols - NEW.seats_booked - NEW.seats_held
+               WHERE screen_id = NEW.screen_id;
+           END""",
+    ]),
+    (6, "change_counters bumped when the show schedule changes", [
+        # in-memory caches compare these counters to know when to reload;
+        # 'schedule' changes only when a show is added, removed or moved
+        """CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )""",
+        "INSERT OR IGNORE INTO change_counters (name, version) VALUES ('schedule', 0)",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_changed_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'schedule';
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_changed_update
+           AFTER UPDATE OF theatre_id, screen_number, start_time, end_time ON scheduled_screens
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'schedule';
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_changed_delete
+           AFTER DELETE ON scheduled_screens
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'schedule';
+           END""",
+    ]),
+    (7, "recurring show templates, expanded into scheduled_screens on demand", [
+        # see backend/show_templates.py; expanded_through is the last date
+        # whose shows have been written to scheduled_screens
+        """CREATE TABLE IF NOT EXISTS show_templates (
+            template_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            theatre_id INTEGER NOT NULL,
+            screen_number INTEGER NOT NULL,
+            movie_id INTEGER,
+            event_id INTEGER,
+            times_json TEXT NOT NULL,
+            weekdays INTEGER NOT NULL DEFAULT 127,
+            start_date TEXT NOT NULL,
+            end_date TEXT,
+            duration_seconds INTEGER,
+            price_economy REAL,
+            price_central REAL,
+            price_premium REAL,
+            expanded_through TEXT,
+            FOREIGN KEY (theatre_id) REFERENCES theatres(theatre_id),
+            FOREIGN KEY (movie_id) REFERENCES movies(movie_id),
+            FOREIGN KEY (event_id) REFERENCES events(event_id)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_templates_expanded ON show_templates (expanded_through)",
+        "ALTER TABLE scheduled_screens ADD COLUMN template_id INTEGER REFERENCES show_templates(template_id)",
+        "CREATE INDEX IF NOT EXISTS idx_screens_template ON scheduled_screens (template_id, show_date)",
+        "INSERT OR IGNORE INTO change_counters (name, version) VALUES ('templates', 0)",
+        """CREATE TRIGGER IF NOT EXISTS trg_templates_changed_insert
+           AFTER INSERT ON show_templates
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'templates';
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_templates_changed_update
+           AFTER UPDATE ON show_templates
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'templates';
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_templates_changed_delete
+           AFTER DELETE ON show_templates
+           BEGIN
+               UPDATE change_counters SET version = version + 1 WHERE name = 'templates';
+           END""",
+    ]),
+    (8, "city on scheduled_screens; one show per movie per city per day enforced by a unique index", [
+        # city is copied from theatres so the rule is a plain unique key
+        # instead of a join; legacy_dup marks older duplicates, which the
+        # partial index ignores until the show is moved
+        "ALTER TABLE scheduled_screens ADD COLUMN city TEXT",
+        "ALTER TABLE scheduled_screens ADD COLUMN legacy_dup INTEGER NOT NULL DEFAULT 0",
+        "UPDATE scheduled_screens SET city = (SELECT t.city FROM theatres t WHERE t.theatre_id = scheduled_screens.theatre_id)",
+        """UPDATE scheduled_screens SET legacy_dup = 1
+           WHERE movie_id IS NOT NULL AND screen_id NOT IN (
+               SELECT MIN(screen_id) FROM scheduled_screens WHERE movie_id IS NOT NULL
+               GROUP BY city, movie_id, show_date)""",
+        """CREATE UNIQUE INDEX IF NOT EXISTS idx_screens_city_movie_day
+           ON scheduled_screens (city, movie_id, show_date)
+           WHERE movie_id IS NOT NULL AND legacy_dup = 0""",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_city_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET city = (SELECT city FROM theatres WHERE theatre_id = NEW.theatre_id)
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_city_update
+           AFTER UPDATE OF theatre_id ON scheduled_screens
+           BEGIN
+               UPDATE scheduled_screens SET city = (SELECT city FROM theatres WHERE theatre_id = NEW.theatre_id)
+               WHERE screen_id = NEW.screen_id;
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_theatres_city_update
+           AFTER UPDATE OF city ON theatres
+           BEGIN
+               UPDATE scheduled_screens SET city = NEW.city WHERE theatre_id = NEW.theatre_id;
+           END""",
+        # a moved or re-titled legacy duplicate has to obey the rule again
+        """CREATE TRIGGER IF NOT EXISTS trg_screens_legacy_dup_clear
+           AFTER UPDATE OF theatre_id, movie_id, start_time ON scheduled_screens
+           WHEN NEW.legacy_dup = 1
+           BEGIN
+               UPDATE scheduled_screens SET legacy_dup = 0 WHERE screen_id = NEW.screen_id;
+           END""",
+    ]),
+    (9, "FTS5 full-text index over movies and events", [
+        _create_catalog_fts,
+    ]),
+    (10, "normalized genre/language/actor tables for filters and facets", [
+        _create_facet_tables,
+        "CREATE INDEX IF NOT EXISTS idx_movies_producer ON movies (producer_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_host ON events (host_id)",
+    ]),
+    (11, "one-letter prefix index for as-you-type search", [
+        _rebuild_catalog_fts,
+    ]),
+    (12, "indexes for the keyset-paginated list pages", [
+        # paginate() sort keys must not be NULL: older rows get 0 and '' (an
+        # unknown upload date sorts oldest); migration 14 rejects later NULLs
+        "UPDATE movies SET average_rating = 0 WHERE average_rating IS NULL",
+        "UPDATE events SET upload_date = '' WHERE upload_date IS NULL",
+        "CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (average_rating, movie_id)",
+        "CREATE INDEX IF NOT EXISTS idx_events_upload ON events (upload_date, event_id)",
+        "CREATE INDEX IF NOT EXISTS idx_employees_city_theatre ON employees (city, theatre, employee_id)",
+        "CREATE INDEX IF NOT EXISTS idx_theatres_city_name ON theatres (city, name, theatre_id)",
+        "CREATE INDEX IF NOT EXISTS idx_feedbacks_read_time ON feedbacks (read_flag, timestamp, feedback_id)",
+        "CREATE INDEX IF NOT EXISTS idx_feedbacks_time ON feedbacks (timestamp, feedback_id)",
+    ]),
+    (13, "a change counter per table, for the page data cache", [
+        _create_table_counters,
+    ]),
+    (14, "paginated sort keys are NOT NULL", [
+        # events.upload_date has no column default and an explicit NULL
+        # bypasses movies.average_rating's; SQLite cannot add NOT NULL to a
+        # column, so a NULL is rejected like the constraint would
+        "UPDATE movies SET average_rating = 0 WHERE average_rating IS NULL",
+        "UPDATE events SET upload_date = '' WHERE upload_date IS NULL",
+        *(f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_{column}_not_null_{op.lower()}
+               BEFORE {op} ON {table} WHEN NEW.{column} IS NULL
+               BEGIN
+                   SELECT RAISE(ABORT, 'NOT NULL constraint failed: {table}.{column}');
+               END"""
+          for table, column in (('movies', 'average_rating'), ('events', 'upload_date'))
+          for op in ('INSERT', 'UPDATE')),
+    ]),
+    (15, "schedule_log: shows added, moved and removed, for the conflict index", [
+        # backend/scheduling.py replays new entries into its per-screen
+        # interval trees instead of reloading them; old_* is the screen a
+        # show left, start/end are NULL when it was deleted
+        """CREATE TABLE IF NOT EXISTS schedule_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            screen_id INTEGER NOT NULL,
+            old_theatre_id INTEGER,
+            old_screen_number INTEGER,
+            theatre_id INTEGER,
+            screen_number INTEGER,
+            start_time TEXT,
+            end_time TEXT
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_log_insert
+           AFTER INSERT ON scheduled_screens
+           BEGIN
+               INSERT INTO schedule_log (screen_id, theatre_id, screen_number, start_time, end_time)
+               VALUES (NEW.screen_id, NEW.theatre_id, NEW.screen_number, NEW.start_time, NEW.end_time);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_log_update
+           AFTER UPDATE OF theatre_id, screen_number, start_time, end_time ON scheduled_screens
+           BEGIN
+               INSERT INTO schedule_log (screen_id, old_theatre_id, old_screen_number, theatre_id, screen_number, start_time, end_time)
+               VALUES (NEW.screen_id, OLD.theatre_id, OLD.screen_number, NEW.theatre_id, NEW.screen_number, NEW.start_time, NEW.end_time);
+           END""",
+        """CREATE TRIGGER IF NOT EXISTS trg_schedule_log_delete
+           AFTER DELETE ON scheduled_screens
+           BEGIN
+               INSERT INTO schedule_log (screen_id, old_theatre_id, old_screen_number)
+               VALUES (OLD.screen_id, OLD.theatre_id, OLD.screen_number);
+           END""",
+        # keep the last SCHEDULE_LOG_KEEP entries; a reader that fell
+        # further behind reloads its index
+        f"""CREATE TRIGGER IF NOT EXISTS trg_schedule_log_prune
+            AFTER INSERT ON schedule_log
+            BEGIN
+                DELETE FROM schedule_log WHERE seq <= NEW.seq - {SCHEDULE_LOG_KEEP};
+            END""",
+    ]),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn=None):
+    """Return the schema version recorded in the database (PRAGMA user_version)"""
+    own = conn is None
+    conn = conn or get_connection()
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        if own:
+            conn.close()
+
+
+def migrate_database():
+    """Apply pending MIGRATIONS and return the resulting schema version.
+    Does nothing until init_database() has created the base tables.
+    """
     conn = get_connection()
-    cursor = conn.cursor()
-    
-    if params:
-        cursor.execute(query, params)
-    else:
-        cursor.execute(query)
-    
-    if fetch_one:
-        result = cursor.fetchone()
+    conn.isolation_level = None  # transactions are managed explicitly below
+    try:
+        has_schema = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='scheduled_screens'"
+        ).fetchone()
+        if not has_schema:
+            return 0
+        applied = False
+        for version, description, steps in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # re-read under the write lock in case another process migrated
+                if schema_version(conn) >= version:
+                    conn.execute("ROLLBACK")
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+                applied = True
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        if applied:
+            conn.execute("PRAGMA optimize")
+        return schema_version(conn)
+    finally:
         conn.close()
-        return dict(result) if result else None
-    elif fetch_all:
-        results = cursor.fetchall()
-        conn.close()
-        return [dict(row) for row in results]
+
+
+def change_version(name):
+    """Current value of a change counter (see migration 6); -1 if unknown"""
+    row = execute_query("SELECT version FROM change_counters WHERE name = ?", (name,), fetch_one=True)
+    return row['version'] if row else -1
+
+
+def change_versions():
+    """{counter name: version} for every change counter, in one query; a
+    table in WATCHED_TABLES has a counter under its own name"""
+    rows = execute_query("SELECT name, version FROM change_counters", fetch_all=True)
+    return {r['name']: r['version'] for r in rows}
+
+
+def in_transaction():
+    """True while the current thread is inside a transaction() block"""
+    return getattr(_local, 'tx_depth', 0) > 0
+
+
+def _count_commit():
+    with _pool_lock:
+        _pool_stats['commits'] += 1
+
+
+@contextmanager
+def transaction():
+    """Unit of work: every execute_query() issued by this thread inside the
+    block runs on one connection and is committed once at the end.
+
+        with db.transaction():
+            db.execute_query("UPDATE users ...")
+            db.execute_query("INSERT INTO bookings ...")
+
+    Any exception rolls the whole block back. Nested blocks become
+    savepoints, so an inner failure only undoes the inner block.
+    """
+    conn = get_pooled_connection()
+    depth = getattr(_local, 'tx_depth', 0)
+    if depth:
+        savepoint = f"tx_{depth}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        _local.tx_depth = depth + 1
+        try:
+            yield conn
+        except BaseException as e:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            typed = _typed_error(e)
+            if typed is not e:
+                raise typed from e
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+        finally:
+            _local.tx_depth = depth
+        return
+    # IMMEDIATE takes the write lock up front so the block cannot fail
+    # half-way with "database is locked" when upgrading from a read
+    conn.execute("BEGIN IMMEDIATE")
+    _local.tx_depth = 1
+    try:
+        yield conn
+    except BaseException as e:
+        _local.tx_depth = 0
+        conn.rollback()
+        typed = _typed_error(e)
+        if typed is not e:
+            raise typed from e
+        raise
     else:
+        _local.tx_depth = 0
         conn.commit()
-        last_id = cursor.lastrowid
-        conn.close()
-        return last_id
+        _count_commit()
+
+
+def execute_query(query, params=None, fetch_one=False, fetch_all=False):
+    """Execute a query on this thread's pooled connection and return results.
+    SELECTs that fetch rows use the read-only connection when WAL is enabled;
+    inside transaction() everything runs on the writer and commits at the end.
+    """
+    in_tx = in_transaction()
+    readonly = (fetch_one or fetch_all) and not in_tx and _is_read_statement(query)
+    conn = get_read_connection() if readonly else get_pooled_connection()
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    try:
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        
+        if fetch_one:
+            result = cursor.fetchone()
+            return dict(result) if result else None
+        elif fetch_all:
+            results = cursor.fetchall()
+            return [dict(row) for row in results]
+        else:
+            if not in_tx:
+                conn.commit()
+                _count_commit()
+            return cursor.lastrowid
+    except Exception as e:
+        # Never leave a half-applied implicit transaction on a shared connection;
+        # inside transaction() the failed statement is already undone by SQLite
+        # and the block decides whether to roll back.
+        if not in_tx and conn.in_transaction:
+            conn.rollback()
+        typed = _typed_error(e)
+        if typed is not e:
+            raise typed from e
+        raise
+    finally:
+        cursor.close()
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        with _pool_lock:
+            _pool_stats['queries'] += 1
+            _pool_stats['reads'] += 1 if readonly else 0
+            _pool_stats['query_time_ms'] += elapsed_ms
+
+
+
+def _record_batch(started):
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    with _pool_lock:
+        _pool_stats['queries'] += 1
+        _pool_stats['query_time_ms'] += elapsed_ms
+
+
+def execute_many(query, rows):
+    """Run one INSERT/UPDATE/DELETE for every parameter tuple in rows using
+    cursor.executemany inside a single transaction. Returns the number of
+    rows affected. Inside an outer transaction() it becomes a savepoint.
+    """
+    started = time.perf_counter()
+    try:
+        with transaction() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(query, rows)
+                return cursor.rowcount
+            finally:
+                cursor.close()
+    finally:
+        _record_batch(started)
+
+
+def execute_many_iter(query, rows, batch_size=1000):
+    """Streaming execute_many: consumes rows lazily (any iterator or
+    generator) and commits every batch_size rows, so huge imports never hold
+    the full data set in memory or grow the WAL without bound. Called inside
+    transaction() the batches become savepoints of the outer block.
+    Returns the total number of rows affected.
+    """
+    rows = iter(rows)
+    total = 0
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return total
+        total += execute_many(query, batch)
+
+
+# Keyset pagination for list pages. A page is "the next page_size rows after
+# the last row already shown", found with an index seek on the sort key, so
+# page 500 costs the same as page 1; LIMIT/OFFSET reads and throws away every
+# skipped row. The position travels as an opaque token (the last row's key).
+PAGE_SIZE = 50
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _sort_keys(order_by):
+    keys = []
+    for item in order_by:
+        parts = item.split()
+        desc = len(parts) == 2 and parts[1].upper() == 'DESC'
+        if not parts or len(parts) > 2 or not _IDENTIFIER.match(parts[0]) or (
+                len(parts) == 2 and not desc and parts[1].upper() != 'ASC'):
+            raise ValueError(f"Bad sort key: {item!r}")
+        keys.append((parts[0], desc))
+    if not keys:
+        raise ValueError("paginate needs at least one sort key")
+    return keys
+
+
+def _after_key(keys):
+    """WHERE fragments, one per sort key, that together select the rows after
+    a key: equal on the leading keys and past it on the next. Each is a
+    plain index seek; SQLite only seeks on the first column of a row-value
+    comparison like (a, b) < (?, ?), and scans the rest of that group."""
+    branches = []
+    for i, (name, desc) in enumerate(keys):
+        equal = [f'"{n}" = ?' for n, _ in keys[:i]]
+        branches.append(' AND '.join(equal + [f'"{name}" {"<" if desc else ">"} ?']))
+    return branches
+
+
+def _token_check(query, params, keys):
+    return zlib.crc32(repr((query, params, keys)).encode('utf-8'))
+
+
+def paginate(query, params=None, order_by=(), page_size=PAGE_SIZE, token=None):
+    """One page of a SELECT, in keyset order: returns (rows, next_token).
+    query has no ORDER BY/LIMIT; order_by names its result columns, each
+    optionally with DESC, and must end with a unique one (e.g.
+    ['start_time DESC', 'booking_id DESC']). Sort columns must not be NULL.
+    Pass next_token back for the following page; it is None after the last.
+    """
+    keys = _sort_keys(order_by)
+    order = " ORDER BY " + ', '.join(f'"{name}" {"DESC" if desc else "ASC"}' for name, desc in keys) + " LIMIT ?"
+    limit = int(page_size) + 1
+    params = list(params or ())
+    check = _token_check(query, params, keys)
+    if not token:
+        sql, args = f"SELECT * FROM ({query}) AS page" + order, params + [limit]
+    else:
+        try:
+            token_check, values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+        except (ValueError, TypeError, UnicodeError):
+            raise ValueError("Malformed page token") from None
+        if token_check != check or len(values) != len(keys):
+            raise ValueError("Page token belongs to another listing")
+        # the rest of the current group first, then the following groups
+        parts, args = [], []
+        for i, where in reversed(list(enumerate(_after_key(keys)))):
+            parts.append(f"SELECT * FROM (SELECT * FROM ({query}) AS page WHERE {where}{order})")
+            args += params + values[:i + 1] + [limit]
+        sql = ' UNION ALL '.join(parts) + order
+        args.append(limit)
+    rows = execute_query(sql, tuple(args), fetch_all=True)
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = [rows[-1][name] for name, _ in keys]
+    if any(v is None for v in last):
+        raise ValueError("paginate sort columns must not be NULL")
+    next_token = base64.urlsafe_b64encode(json.dumps([check, last]).encode('utf-8')).decode('ascii')
+    return rows, next_token
 
 
 def insert_demo_data():
@@ -235,3 +1162,5 @@ def insert_demo_data():
 if not os.path.exists(DB_PATH):
     init_database()
     insert_demo_data()
+else:
+    migrate_database()
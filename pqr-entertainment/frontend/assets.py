@@ -1,26 +1,158 @@
+import hashlib
 import os
-try:
-    from PIL import Image, ImageTk
-except Exception:
-    Image = None
-    ImageTk = None
+import threading
+from collections import OrderedDict
 import tkinter as tk
 from tkinter import messagebox
 
+from frontend import lazy
+
+# Cover thumbnails. A resized cover is written once to THUMB_DIR as a PNG
+# named by a hash of (path, mtime, file size, target size), so an edited
+# cover simply gets a new entry; later renders load that PNG straight into
+# Tk, with no Pillow decode or resample. PhotoImages are also kept in an
+# in-memory LRU bounded by their pixel bytes. A widget showing one keeps its
+# own reference (label.image = photo), so eviction never blanks a card.
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+THUMB_DIR = os.environ.get('TBMS_THUMB_DIR') or os.path.join(BASE_DIR, '.thumbcache')
+THUMB_DIR_MAX_BYTES = int(os.environ.get('TBMS_THUMB_DIR_MAX_MB', 200)) * 1024 * 1024
+PHOTO_CACHE_MAX_BYTES = int(os.environ.get('TBMS_PHOTO_CACHE_MB', 64)) * 1024 * 1024
+
+_photos = OrderedDict()   # (abs path, mtime_ns, file size, (w, h)) -> PhotoImage
+_photo_bytes = 0
+_photos_lock = threading.Lock()
+_thumb_written = 0        # bytes written to THUMB_DIR since the last trim
+_thumb_lock = threading.Lock()
+
+
+def asset_path(rel_path: str):
+    """Absolute path of an asset, or None if the file does not exist"""
+    abs_path = os.path.abspath(os.path.join(BASE_DIR, rel_path))
+    return abs_path if os.path.isfile(abs_path) else None
+
+
+def _cache_key(abs_path: str, size):
+    st = os.stat(abs_path)
+    return (abs_path, st.st_mtime_ns, st.st_size, tuple(size))
+
+
+def _thumb_file(key) -> str:
+    digest = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+    return os.path.join(THUMB_DIR, digest + '.png')
+
+
+def _trim_thumb_dir():
+    """Delete the least recently used thumbnails until THUMB_DIR is back
+    under 80% of THUMB_DIR_MAX_BYTES"""
+    try:
+        entries = [e for e in os.scandir(THUMB_DIR) if e.name.endswith('.png')]
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in entries]
+    except OSError:
+        return
+    total = sum(size for _, size, _ in stats)
+    for _, size, path in sorted(stats):
+        if total <= THUMB_DIR_MAX_BYTES * 0.8:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _write_thumb(img, thumb: str):
+    """Save a resized cover atomically; the cache is best effort"""
+    global _thumb_written
+    try:
+        os.makedirs(THUMB_DIR, exist_ok=True)
+        tmp = f"{thumb}.{os.getpid()}.{threading.get_ident()}.tmp"
+        img.save(tmp, 'PNG', compress_level=1)
+        os.replace(tmp, thumb)
+        with _thumb_lock:
+            _thumb_written += os.path.getsize(thumb)
+            trim = _thumb_written > THUMB_DIR_MAX_BYTES // 10
+            if trim:
+                _thumb_written = 0
+        if trim:
+            _trim_thumb_dir()
+    except OSError:
+        pass
+
+
+def _remember_photo(key, photo):
+    global _photo_bytes
+    with _photos_lock:
+        if key in _photos:
+            return
+        _photos[key] = photo
+        _photo_bytes += photo.width() * photo.height() * 4
+        while _photo_bytes > PHOTO_CACHE_MAX_BYTES and len(_photos) > 1:
+            _, old = _photos.popitem(last=False)
+            _photo_bytes -= old.width() * old.height() * 4
+
+
+def cached_photo(rel_path: str, size: tuple[int, int]):
+    """PhotoImage for a cover from the in-memory LRU, or None (Tk thread)"""
+    abs_path = asset_path(rel_path) if rel_path else None
+    if abs_path is None:
+        return None
+    key = _cache_key(abs_path, size)
+    with _photos_lock:
+        photo = _photos.get(key)
+        if photo is not None:
+            _photos.move_to_end(key)
+    return photo
+
+
+def decode_cover(rel_path: str, size: tuple[int, int]):
+    """The slow, thread-safe half of loading a cover: (key, source), where
+    source is the thumbnail PNG path or a freshly resized Pillow image (the
+    thumbnail is written for next time); None if there is nothing to show."""
+    abs_path = asset_path(rel_path) if rel_path else None
+    if abs_path is None:
+        return None
+    key = _cache_key(abs_path, size)
+    thumb = _thumb_file(key)
+    if os.path.isfile(thumb):
+        # Tk reads PNG natively; touch it so trimming keeps it
+        try:
+            os.utime(thumb)
+        except OSError:
+            pass
+        return key, thumb
+    Image, _ = lazy.pil()   # first use imports Pillow (on a loader thread)
+    if not Image:
+        return None
+    img = Image.open(abs_path).convert('RGB')
+    img = img.resize(size, Image.LANCZOS)
+    _write_thumb(img, thumb)
+    return key, img
+
+
+def make_photo(key, source):
+    """The Tk-thread half: PhotoImage from decode_cover()'s result, kept in
+    the LRU"""
+    photo = tk.PhotoImage(file=source) if isinstance(source, str) else lazy.pil()[1].PhotoImage(source)
+    _remember_photo(key, photo)
+    return photo
+
+
 def load_asset_image(rel_path: str, size: tuple[int, int], cache_list: list | None = None):
-    """Load image from assets with Pillow, return PhotoImage or None.
-    cache_list prevents GC by retaining a reference in Tk.
+    """Load image from assets as a PhotoImage of the given size, or None.
+    Served from the in-memory LRU, else the on-disk thumbnail, else decoded
+    and resized with Pillow (and the thumbnail written for next time).
+    cache_list, if given, also retains a reference for Tk.
     """
-    if not rel_path or not Image or not ImageTk:
+    if not rel_path:
         return None
     try:
-        abs_path = os.path.join(os.path.dirname(__file__), '..', rel_path)
-        abs_path = os.path.abspath(abs_path)
-        if not os.path.isfile(abs_path):
-            return None
-        img = Image.open(abs_path).convert('RGB')
-        img = img.resize(size, Image.LANCZOS)
-        photo = ImageTk.PhotoImage(img)
+        photo = cached_photo(rel_path, size)
+        if photo is None:
+            decoded = decode_cover(rel_path, size)
+            if decoded is None:
+                return None
+            photo = make_photo(*decoded)
         if cache_list is not None:
             cache_list.append(photo)
         return photo
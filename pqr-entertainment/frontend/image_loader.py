@@ -0,0 +1,99 @@
+import queue
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+
+from frontend import assets
+
+# Background cover loading for the movie/event grids.
+# A card is drawn at once with its placeholder label; request() hands the
+# cover to a small thread pool, which decodes and resizes it with Pillow (or
+# finds its cached thumbnail). Finished covers go onto a queue that the Tk
+# thread drains from root.after, so widgets are only touched on the Tk
+# thread. cancel_within(frame) drops what is still pending for a page being
+# torn down; a page that is only hidden keeps loading.
+
+WORKERS = 4
+POLL_MS = 30
+PER_TICK = 8  # covers placed per poll, so a big grid never blocks a frame
+
+
+class ImageLoader:
+    def __init__(self, root, workers: int = WORKERS):
+        self.root = root
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tbms-covers')
+        self._done = queue.Queue()
+        self._pending = []       # (future, label) not yet done
+        self._generation = 0     # bumped by cancel_all(); stale results are dropped
+        self._polling = False
+
+    def request(self, label, rel_path: str, size: tuple[int, int]):
+        """Show the cover in label when it is ready; the label keeps its
+        placeholder until then, or for good if there is no image. A label
+        asked for another cover in the meantime (a recycled virtual grid
+        card) only ever gets the latest one."""
+        label.pending_cover = (rel_path, size)
+        photo = assets.cached_photo(rel_path, size) if rel_path else None
+        if photo is not None:
+            self._show(label, photo)
+            return
+        if not rel_path:
+            return
+        generation = self._generation
+
+        def work():
+            try:
+                decoded = assets.decode_cover(rel_path, size)
+            except Exception:
+                decoded = None
+            if decoded is not None:
+                self._done.put((generation, label, (rel_path, size), decoded))
+
+        self._pending.append((self._pool.submit(work), label))
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+
+    def cancel_all(self):
+        """Forget every pending load (all pages are going away)"""
+        self._generation += 1
+        for future, _ in self._pending:
+            future.cancel()
+        self._pending = []
+
+    def cancel_within(self, widget):
+        """Forget the pending loads for labels inside widget"""
+        prefix = str(widget) + '.'
+        keep = []
+        for future, label in self._pending:
+            if str(label).startswith(prefix):
+                future.cancel()
+            else:
+                keep.append((future, label))
+        self._pending = keep
+
+    def _poll(self):
+        for _ in range(PER_TICK):
+            try:
+                generation, label, cover, decoded = self._done.get_nowait()
+            except queue.Empty:
+                break
+            if generation != self._generation or getattr(label, 'pending_cover', cover) != cover:
+                continue
+            try:
+                self._show(label, assets.make_photo(*decoded))
+            except Exception:
+                pass
+        self._pending = [(f, l) for f, l in self._pending if not f.done()]
+        if self._pending or not self._done.empty():
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    @staticmethod
+    def _show(label, photo):
+        try:
+            if label.winfo_exists():
+                label.config(image=photo, text='')
+                label.image = photo
+        except tk.TclError:
+            pass
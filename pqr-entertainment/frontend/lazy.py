@@ -0,0 +1,130 @@
+import builtins
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Heavy optional modules, imported on first use.
+# matplotlib (only the analytics pages draw charts), Pillow (cover decoding)
+# and the page modules are not imported with main.py, so the login window
+# does not wait for them. matplotlib() and pil() return the names their
+# callers used to import at module level, or Nones when the package is
+# missing, like the try/except imports they replace. With TBMS_WARMUP=1,
+# warmup() imports them on a background thread after login, so the first
+# analytics page does not pay for them either. profile_imports() (main.py
+# --profile-startup) times every import until report() prints the table.
+
+WARMUP = os.environ.get('TBMS_WARMUP', '0') not in ('', '0')
+WARMUP_MODULES = (
+    'frontend.pages_user', 'frontend.pages_producer', 'frontend.pages_admin',
+    'PIL.Image', 'PIL.ImageTk',
+    'matplotlib.backends.backend_tkagg', 'matplotlib.pyplot',
+)
+REPORT_ROWS = 25
+
+_lock = threading.RLock()
+_loaded = {}        # module name -> module, or None if it cannot be imported
+_load_times = {}    # module name -> seconds its first load() took
+_import_times = None  # module name -> [cumulative, self] seconds (profile_imports)
+_import_stack = threading.local()
+
+
+def load(name: str):
+    """Module `name`, imported on the first call; None if it cannot be imported"""
+    module = _loaded.get(name)
+    if module is not None or name in _loaded:
+        return module
+    with _lock:
+        if name not in _loaded:
+            start = time.perf_counter()
+            try:
+                _loaded[name] = importlib.import_module(name)
+            except Exception:
+                _loaded[name] = None
+            _load_times[name] = time.perf_counter() - start
+        return _loaded[name]
+
+
+def matplotlib():
+    """(FigureCanvasTkAgg, pyplot), or (None, None) without matplotlib"""
+    backend = load('matplotlib.backends.backend_tkagg')
+    pyplot = load('matplotlib.pyplot') if backend else None
+    return (backend.FigureCanvasTkAgg, pyplot) if pyplot else (None, None)
+
+
+def pil():
+    """(Image, ImageTk) from Pillow, or (None, None) without it"""
+    image, image_tk = load('PIL.Image'), load('PIL.ImageTk')
+    return (image, image_tk) if image and image_tk else (None, None)
+
+
+def page(name: str):
+    """A page module of the frontend package ('pages_admin', ...), or None"""
+    return load('frontend.' + name)
+
+
+def warmup(modules=WARMUP_MODULES, force: bool = False):
+    """Import modules on a daemon thread; only with TBMS_WARMUP set, unless force"""
+    if not (WARMUP or force):
+        return None
+    thread = threading.Thread(target=lambda: [load(m) for m in modules], name='tbms-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def profile_imports():
+    """Time every import statement from now on, per module (see report)"""
+    global _import_times
+    if _import_times is not None:
+        return
+    _import_times = {}
+    original = builtins.__import__
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        label = name
+        if level:
+            package = (globals or {}).get('__package__') or ''
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            label = f"{base}.{name}" if name else base
+        if label in sys.modules:
+            # `from package import submodule` imports the submodule here
+            module = sys.modules[label]
+            missing = [f for f in fromlist or () if f != '*' and not hasattr(module, f)]
+            if not missing:
+                return original(name, globals, locals, fromlist, level)
+            label = f"{label}.{','.join(missing)}"
+        stack = _import_stack.__dict__.setdefault('frames', [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            times = _import_times.setdefault(label, [0.0, 0.0])
+            times[0] += elapsed
+            times[1] += elapsed - nested
+
+    builtins.__import__ = timed_import
+
+
+def report(window_seconds: float = None, rows: int = REPORT_ROWS) -> str:
+    """Import times recorded since profile_imports(), slowest first, and the
+    modules load() imported on demand"""
+    lines = []
+    if window_seconds is not None:
+        lines.append(f"Login window shown after {window_seconds * 1000:.1f} ms")
+    times = dict(_import_times or {})
+    lines.append(f"Imports: {sum(own for _, own in times.values()) * 1000:.1f} ms in {len(times)} modules")
+    lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, (cumulative, own) in sorted(times.items(), key=lambda t: -t[1][0])[:rows]:
+        lines.append(f"{cumulative * 1000:14.1f} {own * 1000:9.1f}  {name}")
+    if _load_times:
+        lines.append("Loaded on demand:")
+        for name, seconds in sorted(_load_times.items(), key=lambda t: -t[1]):
+            status = '' if _loaded.get(name) else '  (not installed)'
+            lines.append(f"{seconds * 1000:14.1f} {'':9}  {name}{status}")
+    return '\n'.join(lines)
@@ -0,0 +1,110 @@
+import tkinter as tk
+from collections import OrderedDict
+
+# Built pages kept alive between visits.
+# Every page reached through the menu (a route) is built into its own frame
+# under the page host. Leaving it only unpacks the frame, so Back and Forward
+# pack it again as it was (filters, scroll position, loaded rows) without
+# running its show_* function, as long as the data it was built from is
+# unchanged: the caller passes a stamp (the day plus the change counters of
+# the page's tables, see view_cache.stamp) and a page whose stamp moved is
+# rebuilt, or only re-reads its rows if it set a rebind callback. Pages
+# without a route (details, seat selection, search results) get a frame
+# that is destroyed as soon as another page is shown. At most MAX_PAGES
+# pages, holding about MAX_WIDGETS widgets between them, are kept; the least
+# recently shown go first.
+
+MAX_PAGES = 8
+MAX_WIDGETS = 6000
+
+
+class Page:
+    def __init__(self, frame, route=None, stamp=None):
+        self.frame = frame
+        self.route = route
+        self.stamp = stamp
+        self.chrome = []      # nav bar/header frames shown above the page
+        self.rebind = None    # re-reads the page's data in place, if set
+        self.widgets = 0      # widgets in frame, counted when it was hidden
+
+
+def count_widgets(widget) -> int:
+    count, todo = 0, [widget]
+    while todo:
+        w = todo.pop()
+        count += 1
+        todo.extend(w.winfo_children())
+    return count
+
+
+class PageManager:
+    def __init__(self, host, on_destroy=None, max_pages: int = MAX_PAGES, max_widgets: int = MAX_WIDGETS):
+        """on_destroy(frame) is called just before a page's frame is destroyed"""
+        self.host = host
+        self.on_destroy = on_destroy
+        self.max_pages, self.max_widgets = max_pages, max_widgets
+        self.current = None
+        self._pages = OrderedDict()   # route -> Page, least recently shown first
+
+    def revisit(self, route, stamp):
+        """Show the kept page of route again and return it; None when there
+        is none, or its data changed and it cannot rebind (build it anew)"""
+        page = self._pages.get(route)
+        if page is None or stamp is None or (page.stamp != stamp and page.rebind is None):
+            return None
+        self._switch(page)
+        self._pages.move_to_end(route)
+        self._evict()
+        if page.stamp != stamp:
+            page.stamp = stamp
+            page.rebind()
+        return page
+
+    def open(self, route=None, stamp=None) -> Page:
+        """Show a new, empty page. A route's page replaces the one kept for
+        it; route None makes a page that is not kept."""
+        page = Page(tk.Frame(self.host, bg=self.host.cget('bg')), route, stamp)
+        old = self._pages.pop(route, None) if route is not None else None
+        self._switch(page)
+        if old is not None:
+            self._destroy(old)
+        if route is not None:
+            self._pages[route] = page
+        self._evict()
+        return page
+
+    def clear(self):
+        """Destroy every page (logout)"""
+        pages = list(self._pages.values())
+        if self.current is not None and self.current.route is None:
+            pages.append(self.current)
+        self._pages.clear()
+        self.current = None
+        for page in pages:
+            self._destroy(page)
+
+    def stats(self) -> dict:
+        return {'kept': len(self._pages), 'widgets': sum(p.widgets for p in self._pages.values())}
+
+    def _switch(self, page):
+        previous, self.current = self.current, page
+        if previous is not None and previous is not page:
+            previous.frame.pack_forget()
+            if previous.route is None:
+                self._destroy(previous)
+            else:
+                previous.widgets = count_widgets(previous.frame)
+        page.frame.pack(fill=tk.BOTH, expand=True)
+
+    def _evict(self):
+        while True:
+            idle = [p for p in self._pages.values() if p is not self.current]
+            if not idle or (len(self._pages) <= self.max_pages
+                             and sum(p.widgets for p in idle) <= self.max_widgets):
+                return
+            self._destroy(self._pages.pop(idle[0].route))
+
+    def _destroy(self, page):
+        if self.on_destroy:
+            self.on_destroy(page.frame)
+        page.frame.destroy()
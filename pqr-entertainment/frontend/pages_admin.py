@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 from dbwrap import db
+from backend import scheduling as sched
+from backend import bulk_schedule
+from backend import show_templates
+from backend import view_cache
 
 def show_screen_manager(app):
     app.clear_container()
@@ -40,12 +44,16 @@ def show_screen_manager(app):
         canvas.create_window((0, 0), window=inner, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
 
+        try:
+            show_templates.ensure_expanded(date_var.get())
+        except ValueError:
+            pass
         query = """
             SELECT ss.*, t.name as theatre_name, t.city, m.title as movie_title
             FROM scheduled_screens ss
             JOIN theatres t ON ss.theatre_id = t.theatre_id
             JOIN movies m ON ss.movie_id = m.movie_id
-            WHERE t.city = ? AND DATE(ss.start_time) = DATE(?)
+            WHERE t.city = ? AND ss.show_date = DATE(?)
             ORDER BY ss.start_time
         """
         rows = db.execute_query(query, (city_var.get(), date_var.get()), fetch_all=True)
@@ -76,15 +84,47 @@ def show_screen_manager(app):
                 actions = tk.Frame(rowf, bg='#2a2a2a'); actions.grid(row=0, column=5, sticky='e', padx=8)
                 tk.Button(actions, text="Reschedule", bg='#2196F3', fg='white', command=lambda sid=r['screen_id']: app.reschedule_screen_popup(sid)).pack(side=tk.LEFT, padx=4)
                 tk.Button(actions, text="Delete Show", bg='#d32f2f', fg='white', command=lambda sid=r['screen_id']: app.admin_delete_show(sid)).pack(side=tk.LEFT, padx=4)
+                if r['template_id'] is not None:
+                    tk.Button(actions, text="Stop Repeating", bg='#FF9800', fg='white', command=lambda tid=r['template_id']: stop_repeating(tid)).pack(side=tk.LEFT, padx=4)
 
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
+    def stop_repeating(template_id):
+        if not messagebox.askyesno("Stop Repeating", "Remove the future unsold shows of this recurring schedule?"):
+            return
+        deleted = show_templates.delete_template(template_id)
+        app.show_toast(f"Recurring schedule stopped ({deleted} upcoming shows removed)")
+        load_list()
+
     tk.Button(controls, text="Apply", bg='#4CAF50', fg='white', command=load_list).pack(side=tk.LEFT, padx=10)
     tk.Button(controls, text="Schedule New Show", bg='#2196F3', fg='white',
               command=lambda: app.admin_schedule_screen_popup(city_default=city_var.get(),
                                                               date_default=date_var.get(),
                                                               on_success=load_list)).pack(side=tk.LEFT, padx=6)
+
+    def auto_plan():
+        try:
+            plan, report = sched.plan_week(date_var.get(), days=7, city=city_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Invalid date")
+            return
+        if not plan:
+            messagebox.showinfo("Auto-plan Week", "No free slots for any movie in this week")
+            return
+        summary = (f"Screen utilization: {report['utilization']:.0%} of free screen time\n"
+                   f"{report['shows']} shows in {city_var.get()} over 7 days from {date_var.get()}\n\n"
+                   f"Goal: {report['objective']}. That rule allows at most "
+                   f"{report['utilization_bound']:.0%}; this plan is within {report['optimality_gap']:.1%} of it"
+                   f"{' (optimal)' if report['optimal'] else ''}.\n\nSchedule these shows?")
+        if not messagebox.askyesno("Auto-plan Week", summary):
+            return
+        with db.transaction() as conn:
+            result = bulk_schedule.import_plan(conn, plan)
+        app.show_toast(f"Scheduled {result['inserted']} shows")
+        load_list()
+
+    tk.Button(controls, text="Auto-plan Week", bg='#FF9800', fg='white', command=auto_plan).pack(side=tk.LEFT, padx=6)
     load_list()
 
 
@@ -104,16 +144,24 @@ def show_admin_feedback(app):
     for label, val in [("Unread", 'unread'), ("Read", 'read'), ("All", 'all')]:
         ttk.Radiobutton(ctrl, text=label, variable=filter_var, value=val).pack(side=tk.LEFT, padx=6)
     tk.Button(ctrl, text="Mark All as Read", bg='#4CAF50', fg='white',
-             command=lambda: [db.execute_query("UPDATE feedbacks SET read_flag = 1 WHERE read_flag = 0"), load_page(0)]).pack(side=tk.RIGHT)
+             command=lambda: [db.execute_query("UPDATE feedbacks SET read_flag = 1 WHERE read_flag = 0"), load_first_page()]).pack(side=tk.RIGHT)
 
     list_holder = tk.Frame(content_frame, bg='#1a1a1a'); list_holder.pack(fill=tk.BOTH, expand=True)
     nav = tk.Frame(content_frame, bg='#1a1a1a'); nav.pack(fill=tk.X)
     page_var = tk.IntVar(value=0)
     page_size = 10
+    # keyset pages: page_tokens[n] fetches page n, next_token the one after
+    page_tokens = [None]
+    next_token = [None]
 
     def load_page(delta=0):
         newp = max(0, page_var.get() + delta)
+        if delta > 0 and next_token[0] is None:
+            newp = page_var.get()
         page_var.set(newp)
+        if newp >= len(page_tokens):
+            page_tokens.append(next_token[0])
+        del page_tokens[newp + 1:]
         for w in list_holder.winfo_children(): w.destroy()
         where = ""
         if filter_var.get() == 'unread':
@@ -125,10 +173,9 @@ def show_admin_feedback(app):
             FROM feedbacks f
             JOIN users u ON f.user_id = u.user_id
             {where}
-            ORDER BY f.timestamp DESC
-            LIMIT {page_size} OFFSET {newp * page_size}
         """
-        feedbacks = db.execute_query(query, None, fetch_all=True)
+        feedbacks, next_token[0] = view_cache.paginate('admin_feedback', view_cache.PAGE_TABLES['admin_feedback'], query, None,
+                                                       ('timestamp DESC', 'feedback_id DESC'), page_size, page_tokens[newp])
         if not feedbacks:
             tk.Label(list_holder, text="No feedback found", font=('Arial', 14), bg='#1a1a1a', fg='#888').pack(pady=50)
         else:
@@ -156,12 +203,15 @@ def show_admin_feedback(app):
         for w in nav.winfo_children(): w.destroy()
         tk.Button(nav, text="← Prev", bg='#555', fg='white', command=lambda: load_page(-1)).pack(side=tk.LEFT, padx=4)
         tk.Label(nav, text=f"Page {page_var.get()+1}", bg='#1a1a1a', fg='white').pack(side=tk.LEFT)
-        tk.Button(nav, text="Next →", bg='#555', fg='white', command=lambda: load_page(1)).pack(side=tk.LEFT, padx=4)
+        tk.Button(nav, text="Next →", bg='#555', fg='white', state=(tk.NORMAL if next_token[0] else tk.DISABLED),
+                  command=lambda: load_page(1)).pack(side=tk.LEFT, padx=4)
 
-    def on_filter_change(*args):
+    def load_first_page(*args):
+        # the tokens of later pages belong to the old filter or row set
         page_var.set(0)
+        del page_tokens[1:]
         load_page(0)
-    filter_var.trace_add('write', on_filter_change)
+    filter_var.trace_add('write', load_first_page)
     load_page(0)
 
 def show_manage_movies(app):
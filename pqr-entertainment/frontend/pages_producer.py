@@ -3,13 +3,9 @@ from tkinter import messagebox
 from datetime import datetime
 import json
 from dbwrap import db
-
-try:
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import matplotlib.pyplot as plt
-except Exception:
-    FigureCanvasTkAgg = None
-    plt = None
+from backend import catalog
+from backend import view_cache
+from frontend import lazy
 
 def show_producer_analytics(app):
     """Analytics for the logged-in producer (movies + events)"""
@@ -22,6 +18,7 @@ def show_producer_analytics(app):
         messagebox.showerror("Error", "Producer profile not found.")
         return
 
+    FigureCanvasTkAgg, plt = lazy.matplotlib()
     if not FigureCanvasTkAgg or not plt:
         frame = tk.Frame(app.main_container, bg='#1a1a1a')
         frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -32,35 +29,93 @@ def show_producer_analytics(app):
     content = tk.Frame(app.main_container, bg='#1a1a1a')
     content.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
-    # KPIs
-    movies_count = db.execute_query("SELECT COUNT(*) as c FROM movies WHERE producer_id = ?", (producer_id,), fetch_one=True)['c']
-    events_count = db.execute_query("SELECT COUNT(*) as c FROM events WHERE host_id = ?", (producer_id,), fetch_one=True)['c']
-    screens_count = db.execute_query(
-        """
-        SELECT COUNT(*) as c FROM scheduled_screens
-        WHERE (movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
-           OR (event_id IN (SELECT event_id FROM events WHERE host_id = ?))
-        """, (producer_id, producer_id), fetch_one=True)['c']
-    agg = db.execute_query(
-        """
-        SELECT SUM(b.amount) as revenue, COUNT(b.booking_id) as bookings
-        FROM bookings b
-        JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-        WHERE (ss.movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
-           OR (ss.event_id IN (SELECT event_id FROM events WHERE host_id = ?))
-        """, (producer_id, producer_id), fetch_one=True)
-    total_revenue = agg['revenue'] or 0
-    total_bookings = agg['bookings'] or 0
-
-    # Avg rating
-    m_avg = db.execute_query("SELECT AVG(average_rating) as a, COUNT(*) as c FROM movies WHERE producer_id = ?", (producer_id,), fetch_one=True)
-    e_avg = db.execute_query("SELECT AVG(average_rating) as a, COUNT(*) as c FROM events WHERE host_id = ?", (producer_id,), fetch_one=True)
-    avg_rating = 0
-    total_titles = (m_avg['c'] or 0) + (e_avg['c'] or 0)
-    if total_titles:
-        m_part = (m_avg['a'] or 0) * (m_avg['c'] or 0)
-        e_part = (e_avg['a'] or 0) * (e_avg['c'] or 0)
-        avg_rating = (m_part + e_part) / total_titles if total_titles else 0
+    # Figures for the KPIs and charts, reused on Back/Forward/Refresh until
+    # this producer's titles, shows or bookings change
+    def load():
+        # KPIs
+        movies_count = db.execute_query("SELECT COUNT(*) as c FROM movies WHERE producer_id = ?", (producer_id,), fetch_one=True)['c']
+        events_count = db.execute_query("SELECT COUNT(*) as c FROM events WHERE host_id = ?", (producer_id,), fetch_one=True)['c']
+        screens_count = db.execute_query(
+            """
+            SELECT COUNT(*) as c FROM scheduled_screens
+            WHERE (movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
+               OR (event_id IN (SELECT event_id FROM events WHERE host_id = ?))
+            """, (producer_id, producer_id), fetch_one=True)['c']
+        agg = db.execute_query(
+            """
+            SELECT SUM(b.amount) as revenue, COUNT(b.booking_id) as bookings
+            FROM bookings b
+            JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+            WHERE (ss.movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
+               OR (ss.event_id IN (SELECT event_id FROM events WHERE host_id = ?))
+            """, (producer_id, producer_id), fetch_one=True)
+        total_revenue = agg['revenue'] or 0
+        total_bookings = agg['bookings'] or 0
+
+        # Avg rating
+        m_avg = db.execute_query("SELECT AVG(average_rating) as a, COUNT(*) as c FROM movies WHERE producer_id = ?", (producer_id,), fetch_one=True)
+        e_avg = db.execute_query("SELECT AVG(average_rating) as a, COUNT(*) as c FROM events WHERE host_id = ?", (producer_id,), fetch_one=True)
+        avg_rating = 0
+        total_titles = (m_avg['c'] or 0) + (e_avg['c'] or 0)
+        if total_titles:
+            m_part = (m_avg['a'] or 0) * (m_avg['c'] or 0)
+            e_part = (e_avg['a'] or 0) * (e_avg['c'] or 0)
+            avg_rating = (m_part + e_part) / total_titles if total_titles else 0
+
+        # Data for charts
+        sales_movies = db.execute_query(
+            """
+            SELECT m.title as title, SUM(b.amount) AS total
+            FROM bookings b
+            JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+            JOIN movies m ON ss.movie_id = m.movie_id
+            WHERE m.producer_id = ?
+            GROUP BY m.title
+            """, (producer_id,), fetch_all=True)
+        sales_events = db.execute_query(
+            """
+            SELECT e.title as title, SUM(b.amount) AS total
+            FROM bookings b
+            JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+            JOIN events e ON ss.event_id = e.event_id
+            WHERE e.host_id = ?
+            GROUP BY e.title
+            """, (producer_id,), fetch_all=True)
+        sales = {}
+        for row in (sales_movies or []):
+            sales[row['title']] = sales.get(row['title'], 0) + (row['total'] or 0)
+        for row in (sales_events or []):
+            sales[row['title']] = sales.get(row['title'], 0) + (row['total'] or 0)
+
+        trends = db.execute_query(
+            """
+            SELECT DATE(b.booking_date) as d, COUNT(*) as c
+            FROM bookings b
+            JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+            WHERE b.booking_date >= DATE('now', '-14 day')
+              AND ((ss.movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
+                OR (ss.event_id IN (SELECT event_id FROM events WHERE host_id = ?)))
+            GROUP BY DATE(b.booking_date)
+            ORDER BY d
+            """, (producer_id, producer_id), fetch_all=True)
+
+        genre_counts = catalog.genre_counts(producer_id)
+
+        seat_totals = db.execute_query(
+            """
+            SELECT COALESCE(SUM(seats_booked), 0) AS booked,
+                   COALESCE(SUM(seat_rows * seat_cols), 0) AS total_seats
+            FROM scheduled_screens
+            WHERE show_date >= DATE('now') AND show_date <= DATE('now', '+3 day')
+              AND ((movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
+                OR (event_id IN (SELECT event_id FROM events WHERE host_id = ?)))
+            """, (producer_id, producer_id), fetch_one=True)
+        return (movies_count, events_count, screens_count, total_bookings, total_revenue, avg_rating,
+                sales, trends, genre_counts, seat_totals)
+    today = datetime.now().date().isoformat()
+    (movies_count, events_count, screens_count, total_bookings, total_revenue, avg_rating,
+     sales, trends, genre_counts, seat_totals) = view_cache.cached(
+        'producer_analytics', (producer_id, today), view_cache.PAGE_TABLES['producer_analytics'], load)
 
     kpi = tk.Frame(content, bg='#1a1a1a')
     kpi.pack(fill=tk.X)
@@ -79,72 +134,8 @@ def show_producer_analytics(app):
         tk.Label(card, text=label, bg='#2a2a2a', fg='#bbb', font=('Arial', 10)).pack()
         tk.Label(card, text=str(val), bg='#2a2a2a', fg='white', font=('Arial', 16, 'bold')).pack()
 
-    # Data for charts
-    sales_movies = db.execute_query(
-        """
-        SELECT m.title as title, SUM(b.amount) AS total
-        FROM bookings b
-        JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-        JOIN movies m ON ss.movie_id = m.movie_id
-        WHERE m.producer_id = ?
-        GROUP BY m.title
-        """, (producer_id,), fetch_all=True)
-    sales_events = db.execute_query(
-        """
-        SELECT e.title as title, SUM(b.amount) AS total
-        FROM bookings b
-        JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-        JOIN events e ON ss.event_id = e.event_id
-        WHERE e.host_id = ?
-        GROUP BY e.title
-        """, (producer_id,), fetch_all=True)
-    sales = {}
-    for row in (sales_movies or []):
-        sales[row['title']] = sales.get(row['title'], 0) + (row['total'] or 0)
-    for row in (sales_events or []):
-        sales[row['title']] = sales.get(row['title'], 0) + (row['total'] or 0)
-
-    trends = db.execute_query(
-        """
-        SELECT DATE(b.booking_date) as d, COUNT(*) as c
-        FROM bookings b
-        JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-        WHERE DATE(b.booking_date) >= DATE('now', '-14 day')
-          AND ((ss.movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
-            OR (ss.event_id IN (SELECT event_id FROM events WHERE host_id = ?)))
-        GROUP BY DATE(b.booking_date)
-        ORDER BY d
-        """, (producer_id, producer_id), fetch_all=True)
-
-    genre_counts = {}
-    for r in (db.execute_query("SELECT genres_json FROM movies WHERE producer_id = ?", (producer_id,), fetch_all=True) or []):
-        try:
-            for g in json.loads(r['genres_json'] or '[]'):
-                genre_counts[g] = genre_counts.get(g, 0) + 1
-        except Exception:
-            pass
-    for r in (db.execute_query("SELECT genres_json FROM events WHERE host_id = ?", (producer_id,), fetch_all=True) or []):
-        try:
-            for g in json.loads(r['genres_json'] or '[]'):
-                genre_counts[g] = genre_counts.get(g, 0) + 1
-        except Exception:
-            pass
-
-    screens = db.execute_query(
-        """
-        SELECT seat_map_json FROM scheduled_screens
-        WHERE DATE(start_time) >= DATE('now') AND DATE(start_time) <= DATE('now', '+3 day')
-          AND ((movie_id IN (SELECT movie_id FROM movies WHERE producer_id = ?))
-            OR (event_id IN (SELECT event_id FROM events WHERE host_id = ?)))
-        """, (producer_id, producer_id), fetch_all=True)
-    total_seats = len(screens) * 100
-    booked = 0
-    for s in (screens or []):
-        try:
-            seat_map = json.loads(s['seat_map_json'])
-            booked += sum(row.count(1) for row in seat_map)
-        except Exception:
-            pass
+    total_seats = seat_totals['total_seats']
+    booked = seat_totals['booked']
     occupancy = (booked / total_seats) * 100 if total_seats else 0
 
     top = tk.Frame(content, bg='#1a1a1a')
@@ -225,9 +216,9 @@ def show_producer_dashboard(app):
     tk.Label(filter_row, text="Title:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT)
     title_var = tk.StringVar(); tk.Entry(filter_row, textvariable=title_var, width=25).pack(side=tk.LEFT, padx=5)
     tk.Label(filter_row, text="Genre:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT, padx=(15,0))
-    genre_var = tk.StringVar(value='All'); ttk.Combobox(filter_row, textvariable=genre_var, values=['All'] + app.get_all_genres(), width=18, state='readonly').pack(side=tk.LEFT, padx=5)
+    genre_var = tk.StringVar(value='All'); ttk.Combobox(filter_row, textvariable=genre_var, values=['All'] + catalog.facet_values('movie_genre', producer_id), width=18, state='readonly').pack(side=tk.LEFT, padx=5)
     tk.Label(filter_row, text="Language:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT, padx=(15,0))
-    lang_var = tk.StringVar(value='All'); ttk.Combobox(filter_row, textvariable=lang_var, values=['All'] + app.get_all_languages(), width=18, state='readonly').pack(side=tk.LEFT, padx=5)
+    lang_var = tk.StringVar(value='All'); ttk.Combobox(filter_row, textvariable=lang_var, values=['All'] + catalog.facet_values('movie_language', producer_id), width=18, state='readonly').pack(side=tk.LEFT, padx=5)
 
     # Scrollable container for Movies grid
     movies_canvas = tk.Canvas(content_frame, bg='#1a1a1a', highlightthickness=0)
@@ -243,32 +234,13 @@ def show_producer_dashboard(app):
         params = [producer_id]
         if title_var.get():
             query += " AND title LIKE ?"; params.append(f"%{title_var.get()}%")
-        movies = db.execute_query(query, tuple(params), fetch_all=True)
-        sel_genre = genre_var.get(); sel_lang = lang_var.get(); filtered = []
-        for m in (movies or []):
-            try:
-                genres = json.loads(m.get('genres_json') or '[]')
-            except Exception:
-                genres = []
-            try:
-                languages = json.loads(m.get('languages_json') or '[]')
-            except Exception:
-                languages = []
-            if sel_genre != 'All' and sel_genre not in genres: continue
-            if sel_lang != 'All' and sel_lang not in languages: continue
-            filtered.append(m)
-
-        # Deduplicate by movie_id (fallback to title)
-        movies_unique = []
-        seen = set()
-        for m in filtered:
-            key = m.get('movie_id') if isinstance(m, dict) else m.get('title')
-            if key in seen:
-                continue
-            seen.add(key)
-            movies_unique.append(m)
+        if genre_var.get() != 'All':
+            query += " AND " + catalog.filter_sql('movie_genre'); params.append(genre_var.get())
+        if lang_var.get() != 'All':
+            query += " AND " + catalog.filter_sql('movie_language'); params.append(lang_var.get())
+
         grid = tk.Frame(grid_container, bg='#1a1a1a'); grid.pack(fill=tk.BOTH, expand=True)
-        for idx, movie in enumerate(movies_unique):
+        def render(movie, idx):
             r, c = divmod(idx, 3)
             card = tk.Frame(grid, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
             card.grid(row=r, column=c, padx=10, pady=10, sticky='nsew')
@@ -286,6 +258,7 @@ def show_producer_dashboard(app):
             btns = tk.Frame(card, bg='#2a2a2a'); btns.pack(pady=8)
             tk.Button(btns, text="Edit", bg='#2196F3', fg='white', width=8, command=lambda m=movie: app.open_movie_form(edit=True, movie=m)).pack(side=tk.LEFT, padx=5)
             tk.Button(btns, text="Delete", bg='#d32f2f', fg='white', width=8, command=lambda mid=movie['movie_id']: app.delete_movie(mid)).pack(side=tk.LEFT, padx=5)
+        app.show_paged(grid_container, lambda token: view_cache.paginate('producer_movies', view_cache.PAGE_TABLES['producer_dashboard'], query, params, ('movie_id',), token=token), render)
         for i in range(3): grid.grid_columnconfigure(i, weight=1)
 
     # Pack movies scrollable after filters
@@ -307,10 +280,7 @@ def show_producer_dashboard(app):
     evt_title_var = tk.StringVar(); tk.Entry(evt_filter, textvariable=evt_title_var, width=25).pack(side=tk.LEFT, padx=5)
     # Event genre filter
     tk.Label(evt_filter, text="Genre:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT, padx=(15,0))
-    try:
-        all_evt_genres = sorted({g for row in db.execute_query("SELECT genres_json FROM events", fetch_all=True) for g in json.loads((row.get('genres_json') or '[]'))})
-    except Exception:
-        all_evt_genres = []
+    all_evt_genres = catalog.facet_values('event_genre', producer_id)
     evt_genre_var = tk.StringVar(value='All'); ttk.Combobox(evt_filter, textvariable=evt_genre_var, values=['All'] + all_evt_genres, width=18, state='readonly').pack(side=tk.LEFT, padx=5)
 
     # Scrollable container for Events grid
@@ -324,30 +294,10 @@ def show_producer_dashboard(app):
         for w in evt_grid_container.winfo_children(): w.destroy()
         q = "SELECT * FROM events WHERE host_id = ?"; ps = [producer_id]
         if evt_title_var.get(): q += " AND title LIKE ?"; ps.append(f"%{evt_title_var.get()}%")
-        events = db.execute_query(q, tuple(ps), fetch_all=True)
-        # Apply genre filter
-        filtered_events = []
-        for ev in (events or []):
-            try:
-                g = json.loads(ev.get('genres_json') or '[]')
-            except Exception:
-                g = []
-            if evt_genre_var.get() != 'All' and evt_genre_var.get() not in g:
-                continue
-            filtered_events.append(ev)
-
-        # Deduplicate by event_id (fallback to title)
-        events_unique = []
-        seen_e = set()
-        for ev in filtered_events:
-            key = ev.get('event_id') if isinstance(ev, dict) else ev.get('title')
-            if key in seen_e:
-                continue
-            seen_e.add(key)
-            events_unique.append(ev)
+        if evt_genre_var.get() != 'All': q += " AND " + catalog.filter_sql('event_genre'); ps.append(evt_genre_var.get())
 
         grid = tk.Frame(evt_grid_container, bg='#1a1a1a'); grid.pack(fill=tk.BOTH, expand=True)
-        for idx, ev in enumerate(events_unique):
+        def render(ev, idx):
             r, c = divmod(idx, 3)
             card = tk.Frame(grid, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
             card.grid(row=r, column=c, padx=10, pady=10, sticky='nsew')
@@ -365,6 +315,7 @@ def show_producer_dashboard(app):
             btns = tk.Frame(card, bg='#2a2a2a'); btns.pack(pady=8)
             tk.Button(btns, text="Edit", bg='#2196F3', fg='white', width=8, command=lambda e=ev: app.open_event_form(edit=True, event=e)).pack(side=tk.LEFT, padx=5)
             tk.Button(btns, text="Delete", bg='#d32f2f', fg='white', width=8, command=lambda eid=ev['event_id']: app.delete_event(eid)).pack(side=tk.LEFT, padx=5)
+        app.show_paged(evt_grid_container, lambda token: view_cache.paginate('producer_events', view_cache.PAGE_TABLES['producer_dashboard'], q, ps, ('event_id',), token=token), render)
         for i in range(3): grid.grid_columnconfigure(i, weight=1)
 
     tk.Button(evt_filter, text="Apply", bg='#4CAF50', fg='white', command=load_events).pack(side=tk.LEFT, padx=8)
@@ -374,6 +325,8 @@ def show_producer_dashboard(app):
     # Pack events scrollable
     evt_canvas.pack(side="left", fill="both", expand=True)
     evt_scrollbar.pack(side="right", fill="y")
+    # kept for Back/Forward: a changed title re-reads both grids, filters kept
+    app.pages.current.rebind = lambda: (load_grid(), load_events())
 
 def open_movie_form(app, edit=False, movie=None):
     return app.open_movie_form(edit=edit, movie=movie)
@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import ttk
 from dbwrap import db
+from backend import seats as seat_codec
+from backend import reservations
+from backend import show_templates
+from backend import catalog
+from backend import view_cache
 import json
 from datetime import datetime
 
@@ -18,47 +23,32 @@ def show_events_page(app):
     tk.Label(filter_row, text="Title:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT)
     title_var = tk.StringVar(); tk.Entry(filter_row, textvariable=title_var, width=30).pack(side=tk.LEFT, padx=6)
     tk.Label(filter_row, text="Genre:", bg='#1a1a1a', fg='white').pack(side=tk.LEFT, padx=(12,0))
-    try:
-        all_evt_genres = sorted({g for row in db.execute_query("SELECT genres_json FROM events", fetch_all=True) for g in json.loads((row.get('genres_json') or '[]'))})
-    except Exception:
-        all_evt_genres = []
+    all_evt_genres = catalog.facet_values('event_genre')
     genre_var = tk.StringVar(value='All'); ttk.Combobox(filter_row, textvariable=genre_var, values=['All'] + all_evt_genres, width=18, state='readonly').pack(side=tk.LEFT, padx=6)
 
-    # Scrollable grid
-    canvas = tk.Canvas(content_frame, bg='#1a1a1a', highlightthickness=0)
-    scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=canvas.yview)
-    scrollable = tk.Frame(canvas, bg='#1a1a1a')
-    scrollable.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-    canvas.create_window((0, 0), window=scrollable, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
+    # Scrollable grid (only the cards on screen are built)
+    grid = app.create_virtual_grid(content_frame, 'event')
 
     def load_events():
-        for w in scrollable.winfo_children(): w.destroy()
-        q = "SELECT * FROM events"
+        where = " WHERE 1 = 1"
         ps = []
         if title_var.get():
-            q += " WHERE title LIKE ?"; ps.append(f"%{title_var.get()}%")
-        q += " ORDER BY upload_date DESC"
-        events = db.execute_query(q, tuple(ps) if ps else None, fetch_all=True)
-        # apply genre filter
-        filtered = []
-        for e in (events or []):
-            try:
-                genres = json.loads(e.get('genres_json') or '[]')
-            except Exception:
-                genres = []
-            if genre_var.get() != 'All' and genre_var.get() not in genres:
-                continue
-            filtered.append(e)
-        app.create_event_grid(scrollable, filtered)
+            where += " AND title LIKE ?"; ps.append(f"%{title_var.get()}%")
+        if genre_var.get() != 'All':
+            where += " AND " + catalog.filter_sql('event_genre'); ps.append(genre_var.get())
+        total = view_cache.cached('events', ('count', where, tuple(ps)), view_cache.PAGE_TABLES['events'], lambda: db.execute_query(
+            "SELECT COUNT(*) AS n FROM events" + where, tuple(ps), fetch_one=True))
+        grid.set_source(total['n'] if total else 0, lambda token, limit: view_cache.paginate(
+            'events', view_cache.PAGE_TABLES['events'], "SELECT * FROM events" + where, ps, ('upload_date DESC', 'event_id DESC'), limit, token))
 
     action_row = tk.Frame(content_frame, bg='#1a1a1a'); action_row.pack(fill=tk.X, padx=20, pady=(0,10))
     tk.Button(action_row, text="Apply", bg='#4CAF50', fg='white', command=load_events).pack(side=tk.LEFT)
     tk.Button(action_row, text="Clear", bg='#555', fg='white', command=lambda: [title_var.set(''), genre_var.set('All'), load_events()]).pack(side=tk.LEFT, padx=8)
 
     load_events()
-    canvas.pack(side="left", fill="both", expand=True, padx=20)
-    scrollbar.pack(side="right", fill="y")
+    grid.pack(fill="both", expand=True, padx=20)
+    # kept for Back/Forward: a changed event re-reads the grid, filters kept
+    app.pages.current.rebind = load_events
 
 def show_user_home(app):
     """User homepage with featured banner, movies grid, testimonials, footer"""
@@ -67,18 +57,23 @@ def show_user_home(app):
     app.add_navigation_bar()
     app.add_header(show_menu=True, show_search=True, show_username=True)
 
-    canvas = tk.Canvas(app.main_container, bg='#1a1a1a', highlightthickness=0)
-    scrollbar = ttk.Scrollbar(app.main_container, orient="vertical", command=canvas.yview)
-    scrollable_frame = tk.Frame(canvas, bg='#1a1a1a')
-    scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-    canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-    canvas.configure(yscrollcommand=scrollbar.set)
+    # only the movie cards on screen exist; the banner scrolls above them and
+    # the testimonials and footer below
+    grid = app.create_virtual_grid(app.main_container, 'movie')
 
-    banner_frame = tk.Frame(scrollable_frame, bg='#2a2a2a')
+    banner_frame = tk.Frame(grid.header, bg='#2a2a2a')
     banner_frame.pack(fill=tk.X, padx=20, pady=20)
     tk.Label(banner_frame, text="🎬 Browse Movies & Events", font=('Arial', 24, 'bold'), bg='#2a2a2a', fg='white').pack(pady=10)
     cards_frame = tk.Frame(banner_frame, bg='#2a2a2a'); cards_frame.pack(fill=tk.X, padx=10, pady=10)
-    featured = db.execute_query("SELECT * FROM movies ORDER BY average_rating DESC LIMIT 6", fetch_all=True)
+    featured = []
+    def load_movies():
+        featured[:] = view_cache.cached('user_home', 'featured', view_cache.PAGE_TABLES['user_home'], lambda: db.execute_query(
+            "SELECT * FROM movies ORDER BY average_rating DESC LIMIT 6", fetch_all=True)) or []
+        total = view_cache.cached('user_home', 'count', view_cache.PAGE_TABLES['user_home'], lambda: db.execute_query(
+            "SELECT COUNT(*) AS n FROM movies", fetch_one=True))
+        grid.set_source(total['n'] if total else 0, lambda token, limit: view_cache.paginate(
+            'user_home', view_cache.PAGE_TABLES['user_home'], "SELECT * FROM movies", None, ('average_rating DESC', 'movie_id DESC'), limit, token))
+    load_movies()
     app._featured_idx_left = 0; app._featured_idx_right = 1
     def render_featured_card(parent, movie):
         card = tk.Frame(parent, bg='#333', width=260, height=160); card.pack_propagate(False)
@@ -119,10 +114,7 @@ def show_user_home(app):
             return
     rotate_left(); app.root.after(10000, rotate_right)
 
-    movies = db.execute_query("SELECT * FROM movies ORDER BY average_rating DESC", fetch_all=True)
-    app.create_movie_grid(scrollable_frame, movies)
-
-    testimonials_frame = tk.Frame(scrollable_frame, bg='#2a2a2a'); testimonials_frame.pack(fill=tk.X, padx=20, pady=20)
+    testimonials_frame = tk.Frame(grid.footer, bg='#2a2a2a'); testimonials_frame.pack(fill=tk.X, padx=20, pady=20)
     tk.Label(testimonials_frame, text="What our users say", font=('Arial', 16, 'bold'), bg='#2a2a2a', fg='white').pack(pady=10)
     carousel = tk.Frame(testimonials_frame, bg='#2a2a2a'); carousel.pack(fill=tk.X)
     testimonials = [
@@ -156,9 +148,11 @@ def show_user_home(app):
             return
     render_testimonials()
 
-    footer_frame = tk.Frame(scrollable_frame, bg='#2a2a2a'); footer_frame.pack(fill=tk.X, padx=20, pady=20)
+    footer_frame = tk.Frame(grid.footer, bg='#2a2a2a'); footer_frame.pack(fill=tk.X, padx=20, pady=20)
     tk.Label(footer_frame, text="Contact Us: contact@pqrentertainment.com", font=('Arial', 10), bg='#2a2a2a', fg='#888').pack(pady=10)
-    canvas.pack(side="left", fill="both", expand=True, padx=20); scrollbar.pack(side="right", fill="y")
+    grid.pack(fill="both", expand=True, padx=20)
+    # kept for Back/Forward: a changed movie re-reads the banner and the grid
+    app.pages.current.rebind = load_movies
 
 def show_wallet(app):
     app.clear_container()
@@ -188,11 +182,13 @@ def show_watchlist(app):
     app.add_header(show_menu=True, show_username=True)
     content_frame = tk.Frame(app.main_container, bg='#1a1a1a'); content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
     tk.Label(content_frame, text="⭐ My Watchlist", font=('Arial', 24, 'bold'), bg='#1a1a1a', fg='white').pack(pady=20)
-    watchlist = db.execute_query(
-        """SELECT w.*, m.title, m.average_rating, m.languages_json, m.genres_json
+    user_id = app.get_current_user()['user_id']
+    # whole movie rows, so Visit needs no query per item
+    watchlist = view_cache.cached('watchlist', user_id, view_cache.PAGE_TABLES['watchlist'], lambda: db.execute_query(
+        """SELECT m.*, w.watchlist_id
                FROM watchlist w JOIN movies m ON w.movie_id = m.movie_id
                WHERE w.user_id = ?""",
-        (app.get_current_user()['user_id'],), fetch_all=True)
+        (user_id,), fetch_all=True))
     if not watchlist:
         tk.Label(content_frame, text="Your watchlist is empty", font=('Arial', 14), bg='#1a1a1a', fg='#888').pack(pady=50)
         tk.Label(content_frame, text="Add movies from the homepage!", font=('Arial', 12), bg='#1a1a1a', fg='#888').pack()
@@ -221,26 +217,27 @@ def show_watchlist(app):
         except Exception:
             pass
         btn_frame = tk.Frame(item_frame, bg='#2a2a2a'); btn_frame.pack(side=tk.RIGHT, padx=20)
-        movie = db.execute_query("SELECT * FROM movies WHERE movie_id = ?", (item['movie_id'],), fetch_one=True)
-        tk.Button(btn_frame, text="Visit", bg='#4CAF50', fg='white', font=('Arial', 11), width=10, command=lambda m=movie: app.show_movie_detail(m)).pack(pady=5)
+        tk.Button(btn_frame, text="Visit", bg='#4CAF50', fg='white', font=('Arial', 11), width=10, command=lambda m=item: app.show_movie_detail(m)).pack(pady=5)
         tk.Button(btn_frame, text="Remove", bg='#f44336', fg='white', font=('Arial', 11), width=10, command=lambda mid=item['movie_id']: app.remove_from_watchlist_page(mid)).pack(pady=5)
 
     canvas.pack(side="left", fill="both", expand=True)
     scrollbar.pack(side="right", fill="y")
 
 def show_my_bookings(app):
-    from datetime import datetime
+    from datetime import datetime, timezone
     app.clear_container()
     app.add_navigation_bar()
     app.add_header(show_menu=True, show_username=True)
     content_frame = tk.Frame(app.main_container, bg='#1a1a1a'); content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
     tk.Label(content_frame, text="🎫 My Bookings", font=('Arial', 24, 'bold'), bg='#1a1a1a', fg='white').pack(pady=20)
-    bookings = db.execute_query(
+    user_id = app.get_current_user()['user_id']
+    today = datetime.now(timezone.utc).date().isoformat()  # DATE('now') is UTC
+    bookings = view_cache.cached('my_bookings', (user_id, today), view_cache.PAGE_TABLES['my_bookings'], lambda: db.execute_query(
         """SELECT b.*, m.title, ss.start_time, t.name as theatre_name, t.city, ss.screen_number
                FROM bookings b JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
                JOIN movies m ON ss.movie_id = m.movie_id JOIN theatres t ON ss.theatre_id = t.theatre_id
-               WHERE b.user_id = ? AND DATE(ss.start_time) >= DATE('now') ORDER BY ss.start_time""",
-        (app.get_current_user()['user_id'],), fetch_all=True)
+               WHERE b.user_id = ? AND ss.show_date >= DATE('now') ORDER BY ss.start_time""",
+        (user_id,), fetch_all=True))
     if not bookings:
         tk.Label(content_frame, text="No upcoming bookings", font=('Arial', 14), bg='#1a1a1a', fg='#888').pack(pady=50)
         return
@@ -271,21 +268,25 @@ def show_booking_history(app):
     app.add_header(show_menu=True, show_username=True)
     content_frame = tk.Frame(app.main_container, bg='#1a1a1a'); content_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
     tk.Label(content_frame, text="📜 Booking History", font=('Arial', 24, 'bold'), bg='#1a1a1a', fg='white').pack(pady=20)
-    bookings = db.execute_query(
-        """SELECT b.*, m.title, ss.start_time, t.name as theatre_name, t.city, ss.screen_number
-               FROM bookings b JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-               JOIN movies m ON ss.movie_id = m.movie_id JOIN theatres t ON ss.theatre_id = t.theatre_id
-               WHERE b.user_id = ? ORDER BY ss.start_time DESC""",
-        (app.get_current_user()['user_id'],), fetch_all=True)
-    if not bookings:
+    def fetch(token):
+        return view_cache.paginate(
+            'booking_history', view_cache.PAGE_TABLES['booking_history'],
+            """SELECT b.*, m.title, ss.start_time, t.name as theatre_name, t.city, ss.screen_number
+                   FROM bookings b JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+                   JOIN movies m ON ss.movie_id = m.movie_id JOIN theatres t ON ss.theatre_id = t.theatre_id
+                   WHERE b.user_id = ?""",
+            (app.get_current_user()['user_id'],), ('start_time DESC', 'booking_id DESC'), token=token)
+    first_page = fetch(None)
+    if not first_page[0]:
         tk.Label(content_frame, text="No bookings yet", font=('Arial', 14), bg='#1a1a1a', fg='#888').pack(pady=50)
         return
     canvas = tk.Canvas(content_frame, bg='#1a1a1a', highlightthickness=0); scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=canvas.yview)
     scrollable_frame = tk.Frame(canvas, bg='#1a1a1a'); scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
     canvas.create_window((0, 0), window=scrollable_frame, anchor="nw"); canvas.configure(yscrollcommand=scrollbar.set)
-    for booking in bookings:
+    def render(booking, index):
         show_time = datetime.fromisoformat(booking['start_time']); time_str = show_time.strftime("%d %b %Y, %I:%M %p")
         tk.Label(scrollable_frame, text=f"{booking['title']} | {time_str} | {booking['theatre_name']}, {booking['city']} | Seat: {booking['seat']} | ₹{booking['amount']}", font=('Arial', 10), bg='#1a1a1a', fg='#ccc', anchor='w').pack(fill=tk.X, padx=10, pady=5)
+    app.show_paged(scrollable_frame, fetch, render, first_page)
     canvas.pack(side="left", fill="both", expand=True); scrollbar.pack(side="right", fill="y")
 
 def show_event_detail(app, event):
@@ -305,7 +306,7 @@ def show_event_detail(app, event):
     cover = event.get('cover_image_path') or f"assets/{event['title'].lower().replace(' ', '_').replace(':','')}.jpg"
     photo = app._load_asset_image(cover, (400, 250))
     if photo:
-        tk.Label(img_holder, image=photo, bg='#1a1a1a').pack()
+        img_lbl = tk.Label(img_holder, image=photo, bg='#1a1a1a'); img_lbl.image = photo; img_lbl.pack()
     tk.Label(detail_frame, text=f"⭐ {event.get('average_rating', 0)}/5.0", font=('Arial', 14), bg='#1a1a1a', fg='#FFD700').pack()
     if event.get('description'):
         desc = tk.Frame(detail_frame, bg='#2a2a2a'); desc.pack(fill=tk.X, padx=20, pady=10)
@@ -352,7 +353,7 @@ def show_movie_detail(app, movie):
     cover = movie.get('cover_image_path') or f"assets/{movie['title'].lower().replace(' ', '_').replace(':','')}.jpg"
     photo = app._load_asset_image(cover, (400, 250))
     if photo:
-        tk.Label(img_holder, image=photo, bg='#1a1a1a').pack()
+        img_lbl = tk.Label(img_holder, image=photo, bg='#1a1a1a'); img_lbl.image = photo; img_lbl.pack()
     tk.Label(detail_frame, text=f"⭐ {movie['average_rating']}/5.0", font=('Arial', 14), bg='#1a1a1a', fg='#FFD700').pack()
     if movie['description']:
         desc_frame = tk.Frame(detail_frame, bg='#2a2a2a'); desc_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -398,6 +399,7 @@ def show_city_selection_for_event(app):
         tk.Button(popup, text=city, font=('Arial', 14), bg='#2196F3', fg='white', width=20, command=lambda c=city: [popup.destroy(), app.show_theatre_listing_for_event(c)]).pack(pady=10)
 
 def show_theatre_listing_for_event(app, city):
+    show_templates.ensure_expanded()
     query = (
         """
         SELECT ss.*, t.name as theatre_name, t.seating_schema_json, t.hall_type as hall_type, e.title as event_title
@@ -405,8 +407,8 @@ def show_theatre_listing_for_event(app, city):
         JOIN theatres t ON ss.theatre_id = t.theatre_id
         JOIN events e ON ss.event_id = e.event_id
         WHERE t.city = ? AND ss.event_id = ?
-        AND DATE(ss.start_time) >= DATE('now')
-        AND DATE(ss.start_time) <= DATE('now', '+3 days')
+        AND ss.show_date >= DATE('now')
+        AND ss.show_date <= DATE('now', '+3 days')
         ORDER BY ss.start_time
         """
     )
@@ -429,10 +431,7 @@ def show_theatre_listing_for_event(app, city):
         tk.Label(theatre_card, text=theatre_name, font=('Arial', 14, 'bold'), bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=5)
         for show in shows:
             show_time = datetime.fromisoformat(show['start_time']); time_str = show_time.strftime("%d %b, %I:%M %p")
-            try:
-                seat_map = json.loads(show['seat_map_json']); booked = sum(row.count(1) for row in seat_map); available = 100 - booked
-            except Exception:
-                available = 100
+            available = show['seats_available']
             show_frame = tk.Frame(theatre_card, bg='#333'); show_frame.pack(fill=tk.X, padx=10, pady=5)
             tk.Label(show_frame, text=f"{time_str} | Screen {show['screen_number']}", font=('Arial', 11), bg='#333', fg='white').pack(side=tk.LEFT, padx=10)
             tk.Label(show_frame, text=f"{available} seats", font=('Arial', 10), bg='#333', fg='#4CAF50').pack(side=tk.LEFT, padx=10)
@@ -446,6 +445,7 @@ def show_city_selection(app):
         tk.Button(popup, text=city, font=('Arial', 14), bg='#2196F3', fg='white', width=20, command=lambda c=city: [popup.destroy(), app.show_theatre_listing(c)]).pack(pady=10)
 
 def show_theatre_listing(app, city):
+    show_templates.ensure_expanded()
     query = (
         """
         SELECT ss.*, t.name as theatre_name, t.seating_schema_json, t.hall_type as hall_type, m.title as movie_title
@@ -453,8 +453,8 @@ def show_theatre_listing(app, city):
         JOIN theatres t ON ss.theatre_id = t.theatre_id
         JOIN movies m ON ss.movie_id = m.movie_id
         WHERE t.city = ? AND ss.movie_id = ?
-        AND DATE(ss.start_time) >= DATE('now')
-        AND DATE(ss.start_time) <= DATE('now', '+3 days')
+        AND ss.show_date >= DATE('now')
+        AND ss.show_date <= DATE('now', '+3 days')
         ORDER BY ss.start_time
         """
     )
@@ -477,10 +477,7 @@ def show_theatre_listing(app, city):
         tk.Label(theatre_card, text=theatre_name, font=('Arial', 14, 'bold'), bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=5)
         for show in shows:
             show_time = datetime.fromisoformat(show['start_time']); time_str = show_time.strftime("%d %b, %I:%M %p")
-            try:
-                seat_map = json.loads(show['seat_map_json']); booked = sum(row.count(1) for row in seat_map); available = 100 - booked
-            except Exception:
-                available = 100
+            available = show['seats_available']
             show_frame = tk.Frame(theatre_card, bg='#333'); show_frame.pack(fill=tk.X, padx=10, pady=5)
             tk.Label(show_frame, text=f"{time_str} | Screen {show['screen_number']}", font=('Arial', 11), bg='#333', fg='white').pack(side=tk.LEFT, padx=10)
             tk.Label(show_frame, text=f"{available} seats", font=('Arial', 10), bg='#333', fg='#4CAF50').pack(side=tk.LEFT, padx=10)
@@ -499,35 +496,45 @@ def show_seat_selection(app, screen_data):
     screen_label_frame = tk.Frame(popup, bg='#1a1a1a'); screen_label_frame.pack(pady=20)
     tk.Label(screen_label_frame, text="═══════════ SCREEN ═══════════", font=('Arial', 14, 'bold'), bg='#1a1a1a', fg='white').pack()
     seat_frame = tk.Frame(popup, bg='#1a1a1a'); seat_frame.pack(pady=20)
-    try:
-        seat_map = json.loads(screen_data['seat_map_json'])
-    except Exception:
-        seat_map = [[0 for _ in range(10)] for _ in range(10)]
-    price_economy = screen_data['price_economy']; price_central = screen_data['price_central']; price_premium = screen_data['price_premium']
+    user_id = app.get_current_user()['user_id']
+    # fresh seat state: screen_data may be minutes old
+    live = db.execute_query("SELECT seat_bits FROM scheduled_screens WHERE screen_id = ?", (screen_data['screen_id'],), fetch_one=True)
+    seat_bits = live['seat_bits'] if live else screen_data.get('seat_bits')
+    held_by_others = reservations.held_seats(screen_data['screen_id'], exclude_user_id=user_id)
+    hall_rows = screen_data.get('seat_rows') or seat_codec.DEFAULT_ROWS
+    hall_cols = screen_data.get('seat_cols') or seat_codec.DEFAULT_COLS
     hall_type = (screen_data.get('hall_type') or 'cinema').lower()
-    rows = ['J', 'I', 'H', 'G', 'F', 'E', 'D', 'C', 'B', 'A']
-    for row_idx, row_label in enumerate(rows):
+    for row_idx in range(hall_rows):
+        row_label = seat_codec.row_label(row_idx, hall_rows)
         tk.Label(seat_frame, text=row_label, font=('Arial', 12, 'bold'), bg='#1a1a1a', fg='white').grid(row=row_idx, column=0, padx=5)
-        for col in range(10):
-            seat_num = f"{row_label}{col+1}"; is_booked = seat_map[row_idx][col] == 1
-            if hall_type == 'stage':
-                if row_idx < 3: price = price_economy
-                elif row_idx < 7: price = price_central
-                else: price = price_premium
-            else:
-                if row_idx < 3: price = price_premium
-                elif row_idx < 7: price = price_central
-                else: price = price_economy
-            btn = tk.Button(seat_frame, text=seat_num, width=6, height=2, bg='#666' if is_booked else '#fff', fg='white' if is_booked else 'black', state=tk.DISABLED if is_booked else tk.NORMAL)
+        for col in range(hall_cols):
+            seat_num = f"{row_label}{col+1}"; is_booked = seat_codec.is_booked(seat_bits, hall_cols, row_idx, col)
+            is_held = not is_booked and seat_num in held_by_others
+            price = screen_data[seat_codec.price_band(row_idx, hall_rows, hall_type)]
+            btn = tk.Button(seat_frame, text=seat_num, width=6, height=2, bg='#666' if is_booked else '#b8860b' if is_held else '#fff', fg='white' if (is_booked or is_held) else 'black', state=tk.DISABLED if (is_booked or is_held) else tk.NORMAL)
             btn.grid(row=row_idx, column=col+1, padx=2, pady=2)
-            if not is_booked:
+            if not (is_booked or is_held):
                 btn.config(command=lambda b=btn, s=seat_num, p=price: app.toggle_seat(b, s, p))
     legend_frame = tk.Frame(popup, bg='#1a1a1a'); legend_frame.pack(pady=10)
     tk.Label(legend_frame, text="■ Available", bg='#1a1a1a', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=10)
     tk.Label(legend_frame, text="■ Selected", bg='#4CAF50', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=10)
     tk.Label(legend_frame, text="■ Booked", bg='#666', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=10)
+    tk.Label(legend_frame, text="■ Held", bg='#b8860b', fg='white', font=('Arial', 10)).pack(side=tk.LEFT, padx=10)
     price_frame = tk.Frame(popup, bg='#2a2a2a'); price_frame.pack(fill=tk.X, pady=10)
-    tk.Label(price_frame, text=f"Economy (A-C): ₹{price_economy}  |  Central (D-G): ₹{price_central}  |  Recliner (H-J): ₹{price_premium}", font=('Arial', 11), bg='#2a2a2a', fg='white').pack(pady=5)
+    # legend from the front row back, as the rows are lettered
+    bands = [("Economy", 'price_economy'), ("Central", 'price_central'), ("Recliner", 'price_premium')]
+    if hall_type == 'stage':
+        bands = [("Premium", 'price_premium'), ("Central", 'price_central'), ("Economy", 'price_economy')]
+    price_text = "  |  ".join(f"{name} ({rows_text}): ₹{screen_data[band]}" for name, band in bands
+                              for rows_text in [seat_codec.band_labels(band, hall_rows, hall_type)] if rows_text)
+    tk.Label(price_frame, text=price_text, font=('Arial', 11), bg='#2a2a2a', fg='white').pack(pady=5)
     bottom_frame = tk.Frame(popup, bg='#1a1a1a'); bottom_frame.pack(fill=tk.X, pady=20)
     app.total_label = tk.Label(bottom_frame, text="Total: ₹0", font=('Arial', 16, 'bold'), bg='#1a1a1a', fg='white'); app.total_label.pack(side=tk.LEFT, padx=20)
     tk.Button(bottom_frame, text="Proceed to Payment", bg='#4CAF50', fg='white', font=('Arial', 14, 'bold'), command=lambda: [popup.destroy(), app.process_payment(screen_data)]).pack(side=tk.RIGHT, padx=20)
+
+    def on_close():
+        # seats picked but not paid for go back on sale
+        reservations.release_holds(screen_data['screen_id'], user_id)
+        app.selected_seats = []
+        popup.destroy()
+    popup.protocol("WM_DELETE_WINDOW", on_close)
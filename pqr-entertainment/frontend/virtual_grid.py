@@ -0,0 +1,160 @@
+import math
+import tkinter as tk
+from collections import OrderedDict
+from tkinter import ttk
+
+# Canvas-based grid that only has widgets for the rows on screen.
+# Cards sit in canvas windows at computed positions; scrolling moves the
+# cards that left the viewport to the rows coming into it and refills them
+# (fill_card), so the number of widgets depends on the window size, not on
+# the catalog. Items are fetched from SQLite a page at a time with keyset
+# pagination (fetch(token, limit) -> (rows, next_token), as db.paginate)
+# when their row first comes near the viewport; the continuation token of
+# every page seen is remembered, but only the last few pages of rows.
+# `header` and `footer` are frames on the same canvas, above and below the
+# cards, for the rest of the page.
+
+PAGE_SIZE = 48
+CACHED_PAGES = 8
+OVERSCAN_ROWS = 1   # rows built above and below the viewport
+
+
+class VirtualGrid(tk.Frame):
+    def __init__(self, parent, build_card, fill_card, card_size, gap: int = 20, bg: str = '#1a1a1a'):
+        """build_card(parent) makes an empty card; fill_card(card, item) shows
+        one item in it (and may be called again with another item)."""
+        super().__init__(parent, bg=bg)
+        self.build_card, self.fill_card = build_card, fill_card
+        self.card_width, self.card_height = card_size
+        self.gap = gap
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.header = tk.Frame(self.canvas, bg=bg)
+        self.footer = tk.Frame(self.canvas, bg=bg)
+        self._header_item = self.canvas.create_window((0, 0), window=self.header, anchor="nw")
+        self._footer_item = self.canvas.create_window((0, 0), window=self.footer, anchor="nw")
+        for w in (self.canvas, self.header, self.footer):
+            w.bind("<Configure>", lambda e: self.schedule_refresh(), add='+')
+        self._bind_wheel(self.canvas)
+
+        self.total = 0
+        self._fetch = None
+        self._pages = OrderedDict()   # page number -> rows
+        self._tokens = {0: None}      # page number -> token that fetches it
+        self._shown = {}              # item index -> card
+        self._free = []               # cards not showing anything
+        self._items = {}              # card -> canvas window item
+        self._columns = 0
+        self._refresh_pending = False
+
+    def set_source(self, total: int, fetch):
+        """Show `total` items, fetched with fetch(token, limit) -> (rows,
+        next_token); scrolls to the top. Call again after the filters change."""
+        self.total = max(0, int(total or 0))
+        self._fetch = fetch
+        self._pages.clear()
+        self._tokens = {0: None}
+        self._release_all()
+        self.canvas.yview_moveto(0)
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            self.after_idle(self._refresh)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_refresh()
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.canvas.yview_scroll(int(-e.delta / 120) or (-1 if e.delta > 0 else 1), "units"))
+        widget.bind("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+        widget.bind("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _load_page(self, page):
+        """Rows of a page, reading forward from the nearest page whose token
+        is known (a scrollbar drag can jump past pages never shown)"""
+        start = max(p for p in self._tokens if p <= page)
+        rows = []
+        for p in range(start, page + 1):
+            if p not in self._tokens:
+                return []
+            rows, next_token = self._fetch(self._tokens[p], PAGE_SIZE) if self._fetch else ([], None)
+            if next_token is not None:
+                self._tokens[p + 1] = next_token
+            self._pages[p] = rows
+            while len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        return rows
+
+    def _item(self, index):
+        page, pos = divmod(index, PAGE_SIZE)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._load_page(page)
+        else:
+            self._pages.move_to_end(page)
+        return rows[pos] if pos < len(rows) else None
+
+    def _park(self, card):
+        self.canvas.coords(self._items[card], -2 * self.card_width, -2 * self.card_height)
+
+    def _release_all(self):
+        for card in self._shown.values():
+            self._park(card)
+            self._free.append(card)
+        self._shown.clear()
+
+    def _new_card(self):
+        card = self.build_card(self.canvas)
+        self._items[card] = self.canvas.create_window(
+            (0, 0), window=card, anchor="nw", width=self.card_width, height=self.card_height)
+        self._bind_wheel(card)
+        return card
+
+    def _refresh(self):
+        self._refresh_pending = False
+        if not self.winfo_exists():
+            return
+        width = max(self.canvas.winfo_width(), self.card_width + 2 * self.gap)
+        step_x, step_y = self.card_width + self.gap, self.card_height + self.gap
+        columns = max(1, (width - self.gap) // step_x)
+        if columns != self._columns:
+            self._columns = columns
+            self._release_all()
+        rows = math.ceil(self.total / columns)
+        top = self.header.winfo_reqheight() + self.gap
+        grid_height = rows * step_y
+        bottom = top + grid_height + self.footer.winfo_reqheight()
+        self.canvas.itemconfigure(self._header_item, width=width)
+        self.canvas.itemconfigure(self._footer_item, width=width)
+        self.canvas.coords(self._footer_item, 0, top + grid_height)
+        self.canvas.configure(scrollregion=(0, 0, width, bottom))
+
+        view_top = self.canvas.canvasy(0)
+        view_bottom = view_top + self.canvas.winfo_height()
+        first_row = max(0, int((view_top - top) // step_y) - OVERSCAN_ROWS)
+        last_row = min(rows - 1, int((view_bottom - top) // step_y) + OVERSCAN_ROWS)
+        wanted = range(first_row * columns, min(self.total, (last_row + 1) * columns))
+        for index in [i for i in self._shown if i not in wanted]:
+            card = self._shown.pop(index)
+            self._park(card)
+            self._free.append(card)
+        left = (width - (columns * step_x - self.gap)) // 2
+        for index in wanted:
+            if index in self._shown:
+                continue
+            item = self._item(index)
+            if item is None:
+                continue
+            card = self._free.pop() if self._free else self._new_card()
+            row, col = divmod(index, columns)
+            self.canvas.coords(self._items[card], left + col * step_x, top + row * step_y)
+            self.fill_card(card, item)
+            self._shown[index] = card
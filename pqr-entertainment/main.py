@@ -4,8 +4,17 @@ PQR Entertainment PaaS Desktop Application
 
 Entry point: main.py
 Packaging: pyinstaller --onefile --noconsole main.py
+Startup import report: python main.py --profile-startup
 """
 
+import sys
+import time
+STARTED_AT = time.perf_counter()
+# before the other imports, so --profile-startup sees all of them
+from frontend import lazy
+if '--profile-startup' in sys.argv:
+    lazy.profile_imports()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from dbwrap import db
@@ -15,29 +24,28 @@ import os
 import math
 import threading
 import re
-try:
-    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-    import matplotlib.pyplot as plt
-except Exception:
-    FigureCanvasTkAgg = None
-    plt = None
+from backend import seats as seat_codec
+from backend import reservations
+from backend import show_templates
+from backend import search as catalog_search
+from backend import catalog
+from backend import view_cache
+from frontend.virtual_grid import VirtualGrid
+from frontend.page_manager import PageManager
+# matplotlib, Pillow and the page modules are imported on first use
+# (frontend/lazy.py)
 try:
     from backend import scheduling as sched
 except Exception:
     sched = None
-try:
-    from PIL import Image, ImageTk
-except Exception:
-    Image = None
-    ImageTk = None
 try:
     from frontend import assets as ui_assets
 except Exception:
     ui_assets = None
 try:
-    from frontend import pages_admin
+    from frontend.image_loader import ImageLoader
 except Exception:
-    pages_admin = None
+    ImageLoader = None
 
 # Global state
 current_user = None
@@ -50,6 +58,15 @@ producer_forward_stack = []
 user_forward_stack = []
 menu_visible = False
 
+# Pause in typing before the header search runs
+SEARCH_DEBOUNCE_MS = 200
+
+# Movie/event cards: cover size and the cell the virtual grid gives a card
+MOVIE_COVER_SIZE = (180, 240)
+EVENT_COVER_SIZE = (180, 180)
+MOVIE_CARD_SIZE = (210, 430)
+EVENT_CARD_SIZE = (210, 350)
+
 
 class theatre_booking_app:
     """Main application class"""
@@ -60,9 +77,19 @@ class theatre_booking_app:
         self.root.geometry("1200x800")
         self.root.configure(bg='#1a1a1a')
         
-        # Main container
-        self.main_container = tk.Frame(root, bg='#1a1a1a')
-        self.main_container.pack(fill=tk.BOTH, expand=True)
+        # Nav bar and header, built once and shown above the pages
+        self.chrome = tk.Frame(root, bg='#2a2a2a')
+        self.chrome_shown = []
+        self.nav_bar = None
+        self.headers = {}
+        
+        # Main container: the current page's frame under page_host; routed
+        # pages are kept for the next visit (frontend/page_manager.py)
+        self.page_host = tk.Frame(root, bg='#1a1a1a')
+        self.page_host.pack(fill=tk.BOTH, expand=True)
+        self.pages = PageManager(self.page_host, on_destroy=self.page_destroyed)
+        self.main_container = self.page_host
+        self.building_route = None
         
         # Menu overlay (initially hidden)
         self.menu_overlay = None
@@ -72,7 +99,14 @@ class theatre_booking_app:
         self.current_screen_id = None
         self.selected_seats = []
         self.current_event_id = None
-        self.image_cache = []  # keep references to PhotoImage
+        
+        # Grid covers are decoded off the Tk thread (frontend/image_loader.py)
+        self.image_loader = ImageLoader(root) if ImageLoader else None
+        
+        # As-you-type search state (see incremental_search)
+        self.search_after_id = None
+        self.search_results_frame = None
+        self.shown_search = None
         
         # Ensure default admin user exists (auto seeding/sync disabled)
         try:
@@ -80,16 +114,32 @@ class theatre_booking_app:
         except Exception:
             pass
         
+        # Release expired seat holds in the background
+        reservations.start_hold_sweeper()
+        
         # Start with login page
         self.show_login_page()
     
     def clear_container(self):
-        """Clear all widgets from main container"""
-        for widget in self.main_container.winfo_children():
-            widget.destroy()
+        """Start a new, empty main container: the page of the route being
+        built (see route_to), or one that is dropped when the next page shows"""
+        route, stamp = self.building_route or (None, None)
+        self.building_route = None
+        self.main_container = self.pages.open(route, stamp).frame
+        self.hide_chrome()
         global menu_visible
         menu_visible = False
 
+    def page_destroyed(self, frame):
+        if self.image_loader:
+            self.image_loader.cancel_within(frame)
+
+    def page_stamp(self, page_name):
+        """What a kept page's data must still match to be shown again"""
+        tables = view_cache.PAGE_TABLES.get(page_name)
+        stamp = view_cache.stamp(tables) if tables else None
+        return None if stamp is None else (datetime.now().date(), stamp)
+
     def show_toast(self, message, duration_ms=2000, bg="#323232", fg="white"):
         """Show a transient toast message overlay (delegates to frontend.assets)"""
         if ui_assets:
@@ -282,81 +332,84 @@ class theatre_booking_app:
         """
         roles = self._parse_demo_credentials()
         allowed = roles['admin'] | roles['producer'] | roles['user']
-        # 1) Delete users not listed
-        all_users = db.execute_query("SELECT * FROM users", fetch_all=True) or []
-        for u in all_users:
-            uname = u['username']
-            if uname not in allowed:
-                # clean dependents
-                try:
-                    db.execute_query("DELETE FROM bookings WHERE user_id=?", (u['user_id'],))
-                    db.execute_query("DELETE FROM feedbacks WHERE user_id=?", (u['user_id'],))
-                    db.execute_query("DELETE FROM watchlist WHERE user_id=?", (u['user_id'],))
-                    db.execute_query("DELETE FROM producers WHERE user_id=?", (u['user_id'],))
-                except Exception:
-                    pass
-                db.execute_query("DELETE FROM users WHERE user_id=?", (u['user_id'],))
-
-        # 2) Ensure listed users exist with correct role and password
-        for uname in roles['admin']:
-            existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
-            if not existing:
-                self._create_user(uname, 'admin', 'pass123')
-            else:
-                db.execute_query("UPDATE users SET role='admin', password='pass123' WHERE user_id=?", (existing['user_id'],))
-        for uname in roles['producer']:
-            existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
-            if not existing:
-                uid = self._create_user(uname, 'producer', 'pass123')
-            else:
-                uid = existing['user_id']
-                db.execute_query("UPDATE users SET role='producer', password='pass123' WHERE user_id=?", (uid,))
-            self._ensure_producer_profile(uid)
-        for uname in roles['user']:
-            existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
-            if not existing:
-                self._create_user(uname, 'user', 'pass123')
-            else:
-                db.execute_query("UPDATE users SET role='user', password='pass123' WHERE user_id=?", (existing['user_id'],))
-
-        # 3) Fix movies: ensure producer exists
-        movies = db.execute_query("SELECT movie_id, producer_id FROM movies", fetch_all=True) or []
-        for m in movies:
-            prod = None
-            if m['producer_id']:
-                prod = db.execute_query("SELECT * FROM producers WHERE producer_id=?", (m['producer_id'],), fetch_one=True)
-            if not prod:
-                # Create a new producer owner specific to this movie
-                pname = f"Producer Movie {m['movie_id']}"
-                new_pid = self._ensure_owner_user_for_producer_name(pname)
-                db.execute_query("UPDATE movies SET producer_id=? WHERE movie_id=?", (new_pid, m['movie_id']))
-            else:
-                # ensure producer has a backing user
-                u = db.execute_query("SELECT * FROM users WHERE user_id=?", (prod['user_id'],), fetch_one=True)
-                if not u:
-                    pname = prod.get('name') or f"Producer Movie {m['movie_id']}"
+        # Steps 1-4 commit as one unit instead of one commit per statement
+        with db.transaction():
+            # 1) Delete users not listed
+            all_users = db.execute_query("SELECT * FROM users", fetch_all=True) or []
+            for u in all_users:
+                uname = u['username']
+                if uname not in allowed:
+                    # clean dependents
+                    try:
+                        db.execute_query("DELETE FROM bookings WHERE user_id=?", (u['user_id'],))
+                        db.execute_query("DELETE FROM feedbacks WHERE user_id=?", (u['user_id'],))
+                        db.execute_query("DELETE FROM watchlist WHERE user_id=?", (u['user_id'],))
+                        db.execute_query("DELETE FROM producers WHERE user_id=?", (u['user_id'],))
+                    except Exception:
+                        pass
+                    db.execute_query("DELETE FROM users WHERE user_id=?", (u['user_id'],))
+
+            # 2) Ensure listed users exist with correct role and password
+            for uname in roles['admin']:
+                existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
+                if not existing:
+                    self._create_user(uname, 'admin', 'pass123')
+                else:
+                    db.execute_query("UPDATE users SET role='admin', password='pass123' WHERE user_id=?", (existing['user_id'],))
+            for uname in roles['producer']:
+                existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
+                if not existing:
+                    uid = self._create_user(uname, 'producer', 'pass123')
+                else:
+                    uid = existing['user_id']
+                    db.execute_query("UPDATE users SET role='producer', password='pass123' WHERE user_id=?", (uid,))
+                self._ensure_producer_profile(uid)
+            for uname in roles['user']:
+                existing = db.execute_query("SELECT * FROM users WHERE username=?", (uname,), fetch_one=True)
+                if not existing:
+                    self._create_user(uname, 'user', 'pass123')
+                else:
+                    db.execute_query("UPDATE users SET role='user', password='pass123' WHERE user_id=?", (existing['user_id'],))
+
+            # 3) Fix movies: ensure producer exists
+            movies = db.execute_query("SELECT movie_id, producer_id FROM movies", fetch_all=True) or []
+            for m in movies:
+                prod = None
+                if m['producer_id']:
+                    prod = db.execute_query("SELECT * FROM producers WHERE producer_id=?", (m['producer_id'],), fetch_one=True)
+                if not prod:
+                    # Create a new producer owner specific to this movie
+                    pname = f"Producer Movie {m['movie_id']}"
                     new_pid = self._ensure_owner_user_for_producer_name(pname)
                     db.execute_query("UPDATE movies SET producer_id=? WHERE movie_id=?", (new_pid, m['movie_id']))
-
-        # 4) Fix events: ensure host exists (producers table is reused as hosts)
-        try:
-            events = db.execute_query("SELECT event_id, host_id FROM events", fetch_all=True) or []
-            for e in events:
-                host = None
-                if e['host_id']:
-                    host = db.execute_query("SELECT * FROM producers WHERE producer_id=?", (e['host_id'],), fetch_one=True)
-                if not host:
-                    hname = f"Host Event {e['event_id']}"
-                    new_pid = self._ensure_owner_user_for_producer_name(hname)
-                    db.execute_query("UPDATE events SET host_id=? WHERE event_id=?", (new_pid, e['event_id']))
                 else:
-                    u = db.execute_query("SELECT * FROM users WHERE user_id=?", (host['user_id'],), fetch_one=True)
+                    # ensure producer has a backing user
+                    u = db.execute_query("SELECT * FROM users WHERE user_id=?", (prod['user_id'],), fetch_one=True)
                     if not u:
-                        hname = host.get('name') or f"Host Event {e['event_id']}"
-                        new_pid = self._ensure_owner_user_for_producer_name(hname)
-                        db.execute_query("UPDATE events SET host_id=? WHERE event_id=?", (new_pid, e['event_id']))
-        except Exception:
-            pass
+                        pname = prod.get('name') or f"Producer Movie {m['movie_id']}"
+                        new_pid = self._ensure_owner_user_for_producer_name(pname)
+                        db.execute_query("UPDATE movies SET producer_id=? WHERE movie_id=?", (new_pid, m['movie_id']))
+
+            # 4) Fix events: ensure host exists (producers table is reused as hosts)
+            try:
+                with db.transaction():
+                    events = db.execute_query("SELECT event_id, host_id FROM events", fetch_all=True) or []
+                    for e in events:
+                        host = None
+                        if e['host_id']:
+                            host = db.execute_query("SELECT * FROM producers WHERE producer_id=?", (e['host_id'],), fetch_one=True)
+                        if not host:
+                            hname = f"Host Event {e['event_id']}"
+                            new_pid = self._ensure_owner_user_for_producer_name(hname)
+                            db.execute_query("UPDATE events SET host_id=? WHERE event_id=?", (new_pid, e['event_id']))
+                        else:
+                            u = db.execute_query("SELECT * FROM users WHERE user_id=?", (host['user_id'],), fetch_one=True)
+                            if not u:
+                                hname = host.get('name') or f"Host Event {e['event_id']}"
+                                new_pid = self._ensure_owner_user_for_producer_name(hname)
+                                db.execute_query("UPDATE events SET host_id=? WHERE event_id=?", (new_pid, e['event_id']))
+            except Exception:
+                pass
 
         # 5) Update credentials file to reflect current users
         try:
@@ -414,6 +467,8 @@ class theatre_booking_app:
             else:
                 self.add_navigation_bar(); self.add_header(show_menu=True, show_username=True)
                 self.navigate_to('user_home')
+            # opt-in (TBMS_WARMUP=1): import matplotlib, Pillow and the pages now
+            lazy.warmup()
 
         tk.Button(center, text="Login", bg='#4CAF50', fg='white', font=('Arial', 12, 'bold'), command=do_login).pack(pady=10)
         btns = tk.Frame(center, bg='#1a1a1a'); btns.pack()
@@ -427,24 +482,46 @@ class theatre_booking_app:
         current_role = None
         admin_stack = []; producer_stack = []; user_stack = []
         admin_forward_stack = []; producer_forward_stack = []; user_forward_stack = []
+        view_cache.invalidate()
+        if self.image_loader:
+            self.image_loader.cancel_all()
+        self.pages.clear()
+        self.hide_chrome()
+        for part in [self.nav_bar] + list(self.headers.values()):
+            if part is not None:
+                part.destroy()
+        self.nav_bar = None
+        self.headers = {}
         self.show_login_page()
 
     def add_navigation_bar(self):
-        """Add navigation bar with forward/backward/refresh buttons"""
-        nav_frame = tk.Frame(self.main_container, bg='#2a2a2a', height=40)
-        nav_frame.pack(fill=tk.X, side=tk.TOP)
-        
-        btn_style = {'bg': '#444', 'fg': 'white', 'font': ('Arial', 10), 
-                     'borderwidth': 0, 'padx': 10, 'pady': 5}
-        
-        tk.Button(nav_frame, text="← Back", command=self.go_back, **btn_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(nav_frame, text="→ Forward", command=self.go_forward, **btn_style).pack(side=tk.LEFT, padx=5)
-        tk.Button(nav_frame, text="↻ Refresh", command=self.refresh_page, **btn_style).pack(side=tk.LEFT, padx=5)
+        """Show the navigation bar with forward/backward/refresh buttons"""
+        if self.nav_bar is None:
+            nav_frame = tk.Frame(self.chrome, bg='#2a2a2a', height=40)
+            
+            btn_style = {'bg': '#444', 'fg': 'white', 'font': ('Arial', 10), 
+                         'borderwidth': 0, 'padx': 10, 'pady': 5}
+            
+            tk.Button(nav_frame, text="← Back", command=self.go_back, **btn_style).pack(side=tk.LEFT, padx=5)
+            tk.Button(nav_frame, text="→ Forward", command=self.go_forward, **btn_style).pack(side=tk.LEFT, padx=5)
+            tk.Button(nav_frame, text="↻ Refresh", command=self.refresh_page, **btn_style).pack(side=tk.LEFT, padx=5)
+            self.nav_bar = nav_frame
+        self.pack_chrome(self.nav_bar)
     
     def add_header(self, show_menu=True, show_search=False, show_username=True):
-        """Add header with hamburger menu, search, and username"""
-        header_frame = tk.Frame(self.main_container, bg='#2a2a2a', height=60)
-        header_frame.pack(fill=tk.X, side=tk.TOP)
+        """Show the header with hamburger menu, search, and username; each
+        combination is built once per login and reused by every page"""
+        show_username = bool(show_username and current_user)
+        key = (show_menu, show_search, show_username, current_user['name'] if show_username else None)
+        header_frame = self.headers.get(key)
+        if header_frame is None:
+            header_frame = self.build_header(show_menu, show_search, show_username)
+            self.headers[key] = header_frame
+        self.pack_chrome(header_frame)
+    
+    def build_header(self, show_menu, show_search, show_username):
+        header_frame = tk.Frame(self.chrome, bg='#2a2a2a', height=60)
+        header_frame.options = (show_menu, show_search, show_username)
         
         if show_menu:
             menu_btn = tk.Button(header_frame, text="☰", font=('Arial', 20), 
@@ -460,20 +537,27 @@ class theatre_booking_app:
             search_frame = tk.Frame(header_frame, bg='#2a2a2a')
             search_frame.pack(side=tk.LEFT, padx=20, expand=True)
             
-            self.search_var = tk.StringVar()
-            search_entry = tk.Entry(search_frame, textvariable=self.search_var, 
+            header_frame.search_var = tk.StringVar()
+            search_entry = tk.Entry(search_frame, textvariable=header_frame.search_var, 
                                    font=('Arial', 12), width=30)
             search_entry.pack(side=tk.LEFT, padx=5)
+            # Results follow the text as you type; Enter searches at once
+            search_entry.bind('<KeyRelease>', lambda e: self.schedule_search())
+            search_entry.bind('<Return>', lambda e: self.perform_search())
+            header_frame.search_entry = search_entry
             
-            # Genre filter dropdown
-            genres = self.get_all_genres()
-            self.genre_var = tk.StringVar(value='All')
-            ttk.Combobox(search_frame, textvariable=self.genre_var, values=['All'] + genres, width=18, state='readonly').pack(side=tk.LEFT, padx=10)
+            # Genre filter dropdown (values refreshed in pack_chrome)
+            header_frame.genre_var = tk.StringVar(value='All')
+            genre_box = ttk.Combobox(search_frame, textvariable=header_frame.genre_var, width=18, state='readonly')
+            genre_box.pack(side=tk.LEFT, padx=10)
+            genre_box.bind('<<ComboboxSelected>>', lambda e: self.schedule_search())
+            header_frame.genre_box = genre_box
+            header_frame.catalog_version = None
             
             tk.Button(search_frame, text="Search", bg='#4CAF50', fg='white',
                      font=('Arial', 10), command=self.perform_search).pack(side=tk.LEFT)
         
-        if show_username and current_user:
+        if show_username:
             user_label = tk.Label(header_frame, text=f"Welcome, {current_user['name']}", 
                                  font=('Arial', 12), bg='#2a2a2a', fg='white')
             user_label.pack(side=tk.RIGHT, padx=20)
@@ -481,6 +565,32 @@ class theatre_booking_app:
             logout_btn = tk.Button(header_frame, text="Logout", bg='#d32f2f', fg='white',
                                   font=('Arial', 10), command=self.logout)
             logout_btn.pack(side=tk.RIGHT, padx=10)
+        return header_frame
+    
+    def pack_chrome(self, part):
+        """Show a nav bar/header frame below the ones already shown"""
+        if part in self.chrome_shown:
+            return
+        part.pack(fill=tk.X, side=tk.TOP)
+        self.chrome_shown.append(part)
+        if not self.chrome.winfo_manager():
+            self.chrome.pack(fill=tk.X, side=tk.TOP, before=self.page_host)
+        if hasattr(part, 'search_entry'):
+            # a page starts with an empty search box, as when it was built anew
+            self.cancel_scheduled_search()
+            self.search_var, self.genre_var, self.search_entry = part.search_var, part.genre_var, part.search_entry
+            self.search_var.set('')
+            self.genre_var.set('All')
+            version = db.change_version('catalog')
+            if part.catalog_version != version:
+                part.genre_box.configure(values=['All'] + self.get_all_genres())
+                part.catalog_version = version
+    
+    def hide_chrome(self):
+        for part in self.chrome_shown:
+            part.pack_forget()
+        self.chrome_shown = []
+        self.chrome.pack_forget()
     
     def toggle_menu(self):
         """Toggle hamburger menu overlay"""
@@ -583,8 +693,9 @@ class theatre_booking_app:
         # Route to appropriate page
         self.route_to(page_name)
 
-    def route_to(self, page_name):
-        """Route to page without altering history stacks"""
+    def route_to(self, page_name, rebuild=False):
+        """Route to page without altering history stacks. The page kept from
+        the last visit is shown again if its data is unchanged, unless rebuild."""
         routes = {
             'user_home': self.show_user_home,
             'user_profile': self.show_user_profile,
@@ -605,8 +716,29 @@ class theatre_booking_app:
             'admin_analytics': self.show_admin_analytics,
             'manage_movies': self.show_manage_movies,
         }
-        if page_name in routes:
+        if page_name not in routes:
+            return
+        stamp = self.page_stamp(page_name)
+        if not rebuild:
+            page = self.pages.revisit(page_name, stamp)
+            if page is not None:
+                self.main_container = page.frame
+                self.hide_chrome()
+                # by options, so a renamed user gets the header with the new name
+                for part in page.chrome:
+                    if part is self.nav_bar:
+                        self.add_navigation_bar()
+                    else:
+                        self.add_header(*part.options)
+                return
+        # the show_* function's clear_container() opens the page to keep
+        self.building_route = (page_name, stamp)
+        try:
             routes[page_name]()
+        finally:
+            self.building_route = None
+        if self.pages.current is not None and self.pages.current.route == page_name:
+            self.pages.current.chrome = list(self.chrome_shown)
     
     def get_stacks(self):
         """Return (history_stack, forward_stack) based on current role"""
@@ -632,7 +764,7 @@ class theatre_booking_app:
         stack, _ = self.get_stacks()
         if stack:
             page = stack[-1]
-            self.route_to(page)
+            self.route_to(page, rebuild=True)
 
     def go_forward(self):
         """Navigate forward"""
@@ -644,39 +776,68 @@ class theatre_booking_app:
     
     def perform_search(self):
         """Perform search"""
+        self.cancel_scheduled_search()
         query = self.search_var.get()
         if not query:
             query = ''
         
-        # Search movies
+        # Ranked full-text search over movies and events
         genre = getattr(self, 'genre_var', tk.StringVar(value='All')).get()
-        if genre and genre != 'All':
-            movies = db.execute_query(
-                "SELECT * FROM movies WHERE title LIKE ? AND genres_json LIKE ?",
-                (f"%{query}%", f"%{genre}%"), fetch_all=True
-            )
-        else:
-            movies = db.execute_query(
-                "SELECT * FROM movies WHERE title LIKE ?",
-                (f"%{query}%",), fetch_all=True
-            )
+        movies, events = catalog_search.search(query, genre)
         
-        if movies:
-            self.show_search_results(movies)
+        if movies or events:
+            self.show_search_results(movies, events, query=query, genre=genre)
+        else:
+            messagebox.showinfo("No Results", f"No movies or events found for '{query}'")
+    
+    def schedule_search(self):
+        """Run the header search once typing pauses for SEARCH_DEBOUNCE_MS"""
+        self.cancel_scheduled_search()
+        self.search_after_id = self.root.after(SEARCH_DEBOUNCE_MS, self.incremental_search)
+    
+    def cancel_scheduled_search(self):
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+    
+    def incremental_search(self):
+        """As-you-type search: open the results page on the first word, then
+        refresh only its results (the header entry keeps focus)"""
+        self.search_after_id = None
+        entry = getattr(self, 'search_entry', None)
+        if entry is None or not entry.winfo_exists():
+            return
+        query, genre = self.search_var.get(), self.genre_var.get()
+        results = self.search_results_frame
+        on_results = results is not None and results.winfo_exists()
+        if on_results and (query, genre) == self.shown_search:
+            return
+        if not on_results and not query.strip():
+            return
+        movies, events = catalog_search.search(query, genre)
+        if on_results:
+            self.fill_search_results(movies, events)
         else:
-            messagebox.showinfo("No Results", f"No movies found for '{query}'")
+            self.show_search_results(movies, events, query=query, genre=genre)
+        self.shown_search = (query, genre)
     
-    def show_search_results(self, movies):
-        """Show search results"""
+    def show_search_results(self, movies, events=None, query=None, genre=None):
+        """Show search results; events are the matching events, or None to
+        suggest the latest ones. query/genre refill the header search box."""
         self.clear_container()
         self.add_navigation_bar()
-        self.add_header(show_menu=True, show_username=True)
+        self.add_header(show_menu=True, show_search=True, show_username=True)
+        if query is not None:
+            self.search_var.set(query)
+            self.genre_var.set(genre or 'All')
+            self.search_entry.focus_set()
+            self.search_entry.icursor(tk.END)
         
         # Title
         title_frame = tk.Frame(self.main_container, bg='#1a1a1a')
         title_frame.pack(fill=tk.X, padx=20, pady=10)
-        tk.Label(title_frame, text=f"Search Results ({len(movies)} found)", 
-                font=('Arial', 20, 'bold'), bg='#1a1a1a', fg='white').pack(anchor='w')
+        self.search_title_label = tk.Label(title_frame, font=('Arial', 20, 'bold'), bg='#1a1a1a', fg='white')
+        self.search_title_label.pack(anchor='w')
         
         # Create scrollable frame
         canvas = tk.Canvas(self.main_container, bg='#1a1a1a', highlightthickness=0)
@@ -690,20 +851,39 @@ class theatre_booking_app:
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
+        self.search_results_frame = scrollable_frame
+        self.search_results_canvas = canvas
+        self.shown_search = (query, genre) if query is not None else None
+        self.fill_search_results(movies, events)
+        
+        canvas.pack(side="left", fill="both", expand=True, padx=20)
+        scrollbar.pack(side="right", fill="y")
+
+    def fill_search_results(self, movies, events=None):
+        """(Re)draw the results of the search results page in place"""
+        if self.image_loader:
+            self.image_loader.cancel_within(self.search_results_frame)
+        for w in self.search_results_frame.winfo_children():
+            w.destroy()
+        self.search_results_canvas.yview_moveto(0)
+        self.search_title_label.config(text=f"Search Results ({len(movies) + len(events or [])} found)")
         
         # Display movies
-        self.create_movie_grid(scrollable_frame, movies)
+        self.create_movie_grid(self.search_results_frame, movies)
         
         # Events section
-        events = db.execute_query("SELECT * FROM events ORDER BY upload_date DESC", fetch_all=True)
         if events:
-            section = tk.Frame(scrollable_frame, bg='#1a1a1a')
+            section = tk.Frame(self.search_results_frame, bg='#1a1a1a')
             section.pack(fill=tk.BOTH, expand=True)
-            tk.Label(section, text="Discover Events", font=('Arial', 20, 'bold'), bg='#1a1a1a', fg='white').pack(anchor='w', padx=20, pady=(10,0))
-            self.create_event_grid(section, events[:8])
-        
-        canvas.pack(side="left", fill="both", expand=True, padx=20)
-        scrollbar.pack(side="right", fill="y")
+            tk.Label(section, text="Matching Events", font=('Arial', 20, 'bold'), bg='#1a1a1a', fg='white').pack(anchor='w', padx=20, pady=(10,0))
+            self.create_event_grid(section, events)
+        elif events is None:
+            events = db.execute_query("SELECT * FROM events ORDER BY upload_date DESC LIMIT 8", fetch_all=True)
+            if events:
+                section = tk.Frame(self.search_results_frame, bg='#1a1a1a')
+                section.pack(fill=tk.BOTH, expand=True)
+                tk.Label(section, text="Discover Events", font=('Arial', 20, 'bold'), bg='#1a1a1a', fg='white').pack(anchor='w', padx=20, pady=(10,0))
+                self.create_event_grid(section, events)
 
     def edit_employee_popup(self, emp):
         popup = tk.Toplevel(self.root)
@@ -792,27 +972,11 @@ class theatre_booking_app:
 
     def get_all_genres(self):
         """Return sorted list of unique genres from movies"""
-        genres_set = set()
-        rows = db.execute_query("SELECT genres_json FROM movies", fetch_all=True)
-        for r in rows:
-            try:
-                for g in json.loads(r['genres_json']):
-                    genres_set.add(g)
-            except:
-                continue
-        return sorted(genres_set)
+        return catalog.facet_values('movie_genre')
     
     def get_all_languages(self):
         """Return sorted list of unique languages from movies"""
-        langs_set = set()
-        rows = db.execute_query("SELECT languages_json FROM movies", fetch_all=True)
-        for r in rows:
-            try:
-                for l in json.loads(r['languages_json']):
-                    langs_set.add(l)
-            except:
-                continue
-        return sorted(langs_set)
+        return catalog.facet_values('movie_language')
     
     def show_register_page(self, role):
         """Show registration page"""
@@ -924,14 +1088,122 @@ class theatre_booking_app:
             messagebox.showerror("Error", "User module not available")
     
     def _load_asset_image(self, rel_path, size):
-        """Delegates image loading to frontend.assets with GC-safe cache"""
+        """Delegates image loading to frontend.assets (cached thumbnails);
+        keep the result on the widget that shows it (label.image = photo)"""
         if ui_assets:
             try:
-                return ui_assets.load_asset_image(rel_path, size, self.image_cache)
+                return ui_assets.load_asset_image(rel_path, size)
             except Exception:
                 return None
         return None
 
+    def load_image_async(self, label, rel_path, size):
+        """Put a cover into a placeholder label once it is decoded (in the
+        background when the loader is available)"""
+        if self.image_loader:
+            self.image_loader.request(label, rel_path, size)
+            return
+        photo = self._load_asset_image(rel_path, size)
+        if photo:
+            label.config(image=photo, text='')
+            label.image = photo
+
+    def build_title_card(self, parent, kind):
+        """Empty movie ('movie') or event ('event') card; fill_title_card()
+        shows a title in it, again whenever the virtual grid reuses it"""
+        cover_size = MOVIE_COVER_SIZE if kind == 'movie' else EVENT_COVER_SIZE
+        card = tk.Frame(parent, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
+        card.kind = kind
+        card.item = None
+
+        # Image
+        img_frame = tk.Frame(card, bg='#444', width=cover_size[0], height=cover_size[1])
+        img_frame.pack(pady=10)
+        img_frame.pack_propagate(False)
+        card.img_lbl = tk.Label(img_frame, font=('Arial', 40), bg='#444', fg='white')
+        card.img_lbl.pack(expand=True)
+
+        # Title, rating, genres (and languages for movies)
+        card.title_lbl = tk.Label(card, font=('Arial', 12, 'bold'), bg='#2a2a2a', fg='white', wraplength=180)
+        card.title_lbl.pack(pady=5)
+        card.rating_lbl = tk.Label(card, font=('Arial', 10), bg='#2a2a2a', fg='#FFD700')
+        card.rating_lbl.pack()
+        card.genres_lbl = tk.Label(card, font=('Arial', 9), bg='#2a2a2a', fg='#bbb' if kind == 'movie' else '#888')
+        card.genres_lbl.pack()
+        card.languages_lbl = None
+        if kind == 'movie':
+            card.languages_lbl = tk.Label(card, font=('Arial', 9), bg='#2a2a2a', fg='#888')
+            card.languages_lbl.pack()
+
+        # Click handlers
+        def open_item():
+            if card.item is None:
+                return
+            if card.kind == 'movie':
+                self.show_movie_detail(card.item)
+            else:
+                self.show_event_detail(card.item)
+        for w in (card, img_frame, card.img_lbl, card.title_lbl):
+            w.bind("<Button-1>", lambda e: open_item())
+            try:
+                w.config(cursor="hand2")
+            except Exception:
+                pass
+        tk.Button(card, text="Book Tickets", bg='#4CAF50', fg='white',
+                  font=('Arial', 10, 'bold'), command=open_item).pack(pady=10)
+        return card
+
+    def fill_title_card(self, card, item):
+        """Show a movie or event row in a card from build_title_card()"""
+        card.item = item
+        movie = card.kind == 'movie'
+        cover = item.get('cover_image_path') or f"assets/{item['title'].lower().replace(' ', '_').replace(':','')}.jpg"
+        card.img_lbl.config(image='', text="🎬" if movie else "🎭")
+        card.img_lbl.image = None
+        self.load_image_async(card.img_lbl, cover, MOVIE_COVER_SIZE if movie else EVENT_COVER_SIZE)
+        card.title_lbl.config(text=item['title'])
+        card.rating_lbl.config(text=f"⭐ {item.get('average_rating', 0)}/5.0")
+        try:
+            genres = json.loads(item.get('genres_json') or '[]')
+        except Exception:
+            genres = []
+        card.genres_lbl.config(text=', '.join(genres[:2]))
+        if card.languages_lbl is not None:
+            try:
+                languages = json.loads(item.get('languages_json') or '[]')
+            except Exception:
+                languages = []
+            card.languages_lbl.config(text=', '.join(languages[:2]))
+
+    def create_virtual_grid(self, parent, kind):
+        """Scrolling grid of movie or event cards that only builds the cards
+        on screen (frontend/virtual_grid.py); give it its rows with
+        set_source(total, fetch)"""
+        card_size = MOVIE_CARD_SIZE if kind == 'movie' else EVENT_CARD_SIZE
+        return VirtualGrid(parent, lambda p: self.build_title_card(p, kind), self.fill_title_card, card_size)
+
+    def show_paged(self, parent, fetch, render, first_page=None):
+        """List rows a page at a time: fetch(token) -> (rows, next_token) as
+        from db.paginate, render(row, index) draws one row into parent, and a
+        "Load more" button at the end fetches the next page while one is left.
+        first_page is an already fetched (rows, next_token)."""
+        state = {'count': 0, 'button': None}
+
+        def add(page):
+            rows, token = page
+            if state['button'] is not None:
+                state['button'].destroy()
+                state['button'] = None
+            for row in rows:
+                render(row, state['count'])
+                state['count'] += 1
+            if token:
+                state['button'] = tk.Button(parent, text="Load more", bg='#555', fg='white',
+                                            command=lambda: add(fetch(token)))
+                state['button'].pack(pady=10)
+
+        add(first_page if first_page is not None else fetch(None))
+
     def create_movie_grid(self, parent, movies):
         """Create grid of movie cards"""
         grid_frame = tk.Frame(parent, bg='#1a1a1a')
@@ -954,65 +1226,9 @@ class theatre_booking_app:
             movies_unique.append(m)
 
         for idx, movie in enumerate(movies_unique):
-            row = idx // 4
-            col = idx % 4
-            
-            # Movie card
-            card = tk.Frame(grid_frame, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
-            card.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-            
-            # Image
-            img_frame = tk.Frame(card, bg='#444', width=180, height=240)
-            img_frame.pack(pady=10)
-            img_frame.pack_propagate(False)
-            cover = movie.get('cover_image_path') or f"assets/{movie['title'].lower().replace(' ', '_').replace(':','')}.jpg"
-            photo = self._load_asset_image(cover, (180, 240))
-            if photo:
-                img_lbl = tk.Label(img_frame, image=photo, bg='#444')
-                img_lbl.pack(expand=True)
-            else:
-                img_lbl = tk.Label(img_frame, text="🎬", font=('Arial', 40), bg='#444', fg='white')
-                img_lbl.pack(expand=True)
-            
-            # Movie info
-            title_lbl = tk.Label(card, text=movie['title'], font=('Arial', 12, 'bold'), 
-                    bg='#2a2a2a', fg='white', wraplength=180)
-            title_lbl.pack(pady=5)
-            
-            # Rating
-            rating_text = f"⭐ {movie['average_rating']}/5.0"
-            tk.Label(card, text=rating_text, font=('Arial', 10), 
-                    bg='#2a2a2a', fg='#FFD700').pack()
-            
-            # Genres
-            try:
-                genres = json.loads(movie.get('genres_json') or '[]')
-                if genres:
-                    tk.Label(card, text=', '.join(genres[:2]), font=('Arial', 9), 
-                            bg='#2a2a2a', fg='#bbb').pack()
-            except Exception:
-                pass
-
-            # Languages
-            try:
-                languages = json.loads(movie['languages_json'])
-                lang_text = ', '.join(languages[:2])
-                tk.Label(card, text=lang_text, font=('Arial', 9), 
-                        bg='#2a2a2a', fg='#888').pack()
-            except:
-                pass
-            
-            # Click handlers
-            def open_movie(m=movie):
-                self.show_movie_detail(m)
-            for w in (card, img_frame, img_lbl, title_lbl):
-                w.bind("<Button-1>", lambda e, mm=movie: open_movie(mm))
-                try:
-                    w.config(cursor="hand2")
-                except Exception:
-                    pass
-            tk.Button(card, text="Book Tickets", bg='#4CAF50', fg='white', 
-                     font=('Arial', 10, 'bold'), command=lambda m=movie: self.show_movie_detail(m)).pack(pady=10)
+            card = self.build_title_card(grid_frame, 'movie')
+            card.grid(row=idx // 4, column=idx % 4, padx=10, pady=10, sticky='nsew')
+            self.fill_title_card(card, movie)
         
         # Configure grid columns
         for i in range(4):
@@ -1040,39 +1256,9 @@ class theatre_booking_app:
             events_unique.append(e)
 
         for idx, event in enumerate(events_unique):
-            row = idx // 4
-            col = idx % 4
-            card = tk.Frame(grid_frame, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
-            card.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
-            img_frame = tk.Frame(card, bg='#444', width=180, height=180)
-            img_frame.pack(pady=10)
-            img_frame.pack_propagate(False)
-            cover = event.get('cover_image_path') or f"assets/{event['title'].lower().replace(' ', '_').replace(':','')}.jpg"
-            photo = self._load_asset_image(cover, (180, 180))
-            if photo:
-                img_lbl = tk.Label(img_frame, image=photo, bg='#444')
-                img_lbl.pack(expand=True)
-            else:
-                img_lbl = tk.Label(img_frame, text="🎭", font=('Arial', 40), bg='#444', fg='white')
-                img_lbl.pack(expand=True)
-            title_lbl = tk.Label(card, text=event['title'], font=('Arial', 12, 'bold'), bg='#2a2a2a', fg='white', wraplength=180)
-            title_lbl.pack(pady=5)
-            rating_text = f"⭐ {event.get('average_rating', 0)}/5.0"
-            tk.Label(card, text=rating_text, font=('Arial', 10), bg='#2a2a2a', fg='#FFD700').pack()
-            try:
-                genres = json.loads(event.get('genres_json') or '[]')
-                tk.Label(card, text=', '.join(genres[:2]), font=('Arial', 9), bg='#2a2a2a', fg='#888').pack()
-            except:
-                pass
-            def open_event(e=event):
-                self.show_event_detail(e)
-            for w in (card, img_frame, img_lbl, title_lbl):
-                w.bind("<Button-1>", lambda ev, ee=event: open_event(ee))
-                try:
-                    w.config(cursor="hand2")
-                except Exception:
-                    pass
-            tk.Button(card, text="Book Tickets", bg='#4CAF50', fg='white', font=('Arial', 10, 'bold'), command=lambda e=event: self.show_event_detail(e)).pack(pady=10)
+            card = self.build_title_card(grid_frame, 'event')
+            card.grid(row=idx // 4, column=idx % 4, padx=10, pady=10, sticky='nsew')
+            self.fill_title_card(card, event)
         for i in range(4):
             grid_frame.grid_columnconfigure(i, weight=1)
     
@@ -1155,36 +1341,35 @@ class theatre_booking_app:
         except Exception:
             messagebox.showerror("Error", "User module not available")
     
+    def get_show_prices(self, screen_id):
+        """Prices, hall size and hall type of a show (for seat_codec.seat_price)"""
+        return db.execute_query(
+            """
+            SELECT ss.price_economy, ss.price_central, ss.price_premium, ss.seat_rows, t.hall_type
+            FROM scheduled_screens ss JOIN theatres t ON ss.theatre_id = t.theatre_id
+            WHERE ss.screen_id = ?
+            """, (screen_id,), fetch_one=True)
+    
     def toggle_seat(self, button, seat_num, price):
         """Toggle seat selection"""
         if seat_num in self.selected_seats:
-            # Deselect
+            # Deselect and give the seat back
             self.selected_seats.remove(seat_num)
             button.config(bg='white', fg='black')
+            reservations.release_holds(self.current_screen_id, current_user['user_id'], [seat_num])
         else:
-            # Select
+            # Select: hold the seat so nobody else can buy it before payment
+            held, _ = reservations.hold_seats(self.current_screen_id, current_user['user_id'], [seat_num])
+            if not held:
+                button.config(bg='#666', fg='white', state=tk.DISABLED)
+                self.show_toast(f"Seat {seat_num} was just taken")
+                return
             self.selected_seats.append(seat_num)
             button.config(bg='#4CAF50', fg='white')
         
         # Update total
-        total = sum(price for _, price in [(s, p) for s, p in zip(self.selected_seats, [price] * len(self.selected_seats))])
-        
-        # Recalculate properly
-        query = """
-            SELECT price_economy, price_central, price_premium 
-            FROM scheduled_screens WHERE screen_id = ?
-        """
-        screen = db.execute_query(query, (self.current_screen_id,), fetch_one=True)
-        
-        total = 0
-        for seat in self.selected_seats:
-            row = seat[0]
-            if row in ['J', 'I', 'H']:
-                total += screen['price_premium']
-            elif row in ['G', 'F', 'E', 'D']:
-                total += screen['price_central']
-            else:
-                total += screen['price_economy']
+        screen = self.get_show_prices(self.current_screen_id)
+        total = sum(seat_codec.seat_price(screen, seat) for seat in self.selected_seats)
         
         self.total_label.config(text=f"Total: ₹{total}")
     
@@ -1195,80 +1380,58 @@ class theatre_booking_app:
             return
         
         # Calculate total
-        query = """
-            SELECT price_economy, price_central, price_premium 
-            FROM scheduled_screens WHERE screen_id = ?
-        """
-        screen = db.execute_query(query, (self.current_screen_id,), fetch_one=True)
-        
-        total = 0
-        for seat in self.selected_seats:
-            row = seat[0]
-            if row in ['J', 'I', 'H']:
-                total += screen['price_premium']
-            elif row in ['G', 'F', 'E', 'D']:
-                total += screen['price_central']
-            else:
-                total += screen['price_economy']
+        screen = self.get_show_prices(self.current_screen_id)
+        total = sum(seat_codec.seat_price(screen, seat) for seat in self.selected_seats)
         
-        # Check balance
-        user = db.execute_query(
-            "SELECT balance FROM users WHERE user_id = ?",
-            (current_user['user_id'],), fetch_one=True
-        )
+        # Seat reservation, balance deduction and bookings commit as one unit
+        lost = []
+        with db.transaction():
+            user = db.execute_query(
+                "SELECT balance FROM users WHERE user_id = ?",
+                (current_user['user_id'],), fetch_one=True
+            )
+            
+            can_pay = user['balance'] >= total
+            if can_pay:
+                # Claim the seats first; fails without writing if any was taken meanwhile
+                reserved, lost = reservations.reserve_seats(self.current_screen_id, self.selected_seats,
+                                                            user_id=current_user['user_id'])
+            if can_pay and not lost:
+                # Deduct balance
+                new_balance = user['balance'] - total
+                db.execute_query(
+                    "UPDATE users SET balance = ? WHERE user_id = ?",
+                    (new_balance, current_user['user_id'])
+                )
+                
+                # Create bookings
+                booked_at = datetime.now().isoformat()
+                booking_rows = []
+                for seat in reserved:
+                    amount = seat_codec.seat_price(screen, seat)
+                    booking_rows.append((current_user['user_id'], self.current_screen_id, seat, float(amount), booked_at))
+                
+                db.execute_many(
+                    """INSERT INTO bookings (user_id, screen_id, seat, amount, status, booking_date)
+                       VALUES (?, ?, ?, ?, 'confirmed', ?)""",
+                    booking_rows
+                )
         
-        if user['balance'] < total:
+        if not can_pay or lost:
+            # booking abandoned: free the seats this user was holding
+            reservations.release_holds(self.current_screen_id, current_user['user_id'])
+        if not can_pay:
             messagebox.showerror("Insufficient Balance", 
                                "Can't book, you're broke.\n\nPlease add balance to your wallet.")
             return
+        if lost:
+            messagebox.showerror("Seats Unavailable",
+                               f"These seats were just booked by someone else: {', '.join(lost)}\n\nPlease choose other seats.")
+            self.selected_seats = []
+            return
         
-        # Deduct balance
-        new_balance = user['balance'] - total
-        db.execute_query(
-            "UPDATE users SET balance = ? WHERE user_id = ?",
-            (new_balance, current_user['user_id'])
-        )
-        
-        # Update global user
+        # Update global user once the booking is committed
         current_user['balance'] = new_balance
-        
-        # Create bookings and update seat map
-        screen_query = "SELECT seat_map_json FROM scheduled_screens WHERE screen_id = ?"
-        screen_rec = db.execute_query(screen_query, (self.current_screen_id,), fetch_one=True)
-        
-        try:
-            seat_map = json.loads(screen_rec['seat_map_json'])
-        except:
-            seat_map = [[0 for _ in range(10)] for _ in range(10)]
-        
-        rows = ['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H', 'I', 'J']
-        
-        for seat in self.selected_seats:
-            row_letter = seat[0]
-            col_num = int(seat[1:])
-            row_idx = 9 - rows.index(row_letter)  # Reverse for display
-            col_idx = col_num - 1
-            
-            # Mark as booked
-            seat_map[row_idx][col_idx] = 1
-            
-            # Determine price
-            if row_letter in ['J', 'I', 'H']:
-                amount = screen['price_premium']
-            elif row_letter in ['G', 'F', 'E', 'D']:
-                amount = screen['price_central']
-            else:
-                amount = screen['price_economy']
-            
-            # Create booking
-            db.execute_query(
-                """INSERT INTO bookings (user_id, screen_id, seat, amount, status, booking_date)
-                   VALUES (?, ?, ?, ?, 'confirmed', ?)""",
-                (current_user['user_id'], self.current_screen_id, seat, float(amount), datetime.now().isoformat())
-            )
-        
-        # Update seat map in DB
-        db.execute_query("UPDATE scheduled_screens SET seat_map_json = ? WHERE screen_id = ?", (json.dumps(seat_map), self.current_screen_id))
         try:
             messagebox.showinfo("Success", "Booking confirmed!")
         except Exception:
@@ -1817,6 +1980,7 @@ class theatre_booking_app:
         self.add_navigation_bar()
         self.add_header(show_menu=True, show_username=True)
 
+        FigureCanvasTkAgg, plt = lazy.matplotlib()
         if not FigureCanvasTkAgg or not plt:
             frame = tk.Frame(self.main_container, bg='#1a1a1a')
             frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -1827,51 +1991,45 @@ class theatre_booking_app:
         content = tk.Frame(self.main_container, bg='#1a1a1a')
         content.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
 
-        # Fetch data
-        sales = db.execute_query(
-            """
-            SELECT m.title, SUM(b.amount) AS total, COUNT(b.booking_id) AS cnt
-            FROM bookings b
-            JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
-            JOIN movies m ON ss.movie_id = m.movie_id
-            GROUP BY m.title
-            ORDER BY total DESC
-            """, fetch_all=True)
-
-        # Daily trends for last 14 days
-        trends = db.execute_query(
-            """
-            SELECT DATE(booking_date) as d, COUNT(*) as c
-            FROM bookings
-            WHERE DATE(booking_date) >= DATE('now', '-14 day')
-            GROUP BY DATE(booking_date)
-            ORDER BY d
-            """, fetch_all=True)
-
-        # Genre distribution
-        genres_rows = db.execute_query("SELECT genres_json FROM movies", fetch_all=True)
-        genre_counts = {}
-        for r in genres_rows:
-            try:
-                for g in json.loads(r['genres_json']):
-                    genre_counts[g] = genre_counts.get(g, 0) + 1
-            except:
-                pass
-
-        # Occupancy percentage (booked seats / total seats in next 3 days)
-        screens = db.execute_query(
-            """
-            SELECT seat_map_json FROM scheduled_screens
-            WHERE DATE(start_time) >= DATE('now') AND DATE(start_time) <= DATE('now', '+3 day')
-            """, fetch_all=True)
-        total_seats = len(screens) * 100
-        booked = 0
-        for s in screens:
-            try:
-                seat_map = json.loads(s['seat_map_json'])
-                booked += sum(row.count(1) for row in seat_map)
-            except:
-                pass
+        # Fetch data (reused on Back/Forward/Refresh until bookings, shows or movies change)
+        def load():
+            sales = db.execute_query(
+                """
+                SELECT m.title, SUM(b.amount) AS total, COUNT(b.booking_id) AS cnt
+                FROM bookings b
+                JOIN scheduled_screens ss ON b.screen_id = ss.screen_id
+                JOIN movies m ON ss.movie_id = m.movie_id
+                GROUP BY m.title
+                ORDER BY total DESC
+                """, fetch_all=True)
+
+            # Daily trends for last 14 days
+            trends = db.execute_query(
+                """
+                SELECT DATE(booking_date) as d, COUNT(*) as c
+                FROM bookings
+                WHERE booking_date >= DATE('now', '-14 day')
+                GROUP BY DATE(booking_date)
+                ORDER BY d
+                """, fetch_all=True)
+
+            # Genre distribution
+            genre_counts = dict(catalog.facet_counts('movie_genre'))
+
+            # Occupancy percentage (booked seats / total seats in next 3 days)
+            seat_totals = db.execute_query(
+                """
+                SELECT COALESCE(SUM(seats_booked), 0) AS booked,
+                       COALESCE(SUM(seat_rows * seat_cols), 0) AS total_seats
+                FROM scheduled_screens
+                WHERE show_date >= DATE('now') AND show_date <= DATE('now', '+3 day')
+                """, fetch_one=True)
+            return sales, trends, genre_counts, seat_totals
+        today = datetime.now().date().isoformat()
+        sales, trends, genre_counts, seat_totals = view_cache.cached(
+            'admin_analytics', today, view_cache.PAGE_TABLES['admin_analytics'], load)
+        total_seats = seat_totals['total_seats']
+        booked = seat_totals['booked']
         occupancy = (booked / total_seats) * 100 if total_seats else 0
 
         # Layout frames
@@ -1945,13 +2103,15 @@ class theatre_booking_app:
         self.refresh_page()
 
     def _refund_and_delete_screen(self, screen_id):
-        bookings = db.execute_query("SELECT * FROM bookings WHERE screen_id = ? AND status = 'confirmed'", (screen_id,), fetch_all=True)
-        for b in (bookings or []):
-            user = db.execute_query("SELECT balance FROM users WHERE user_id = ?", (b['user_id'],), fetch_one=True)
-            new_bal = (user['balance'] or 0) + (b['amount'] or 0)
-            db.execute_query("UPDATE users SET balance = ? WHERE user_id = ?", (new_bal, b['user_id']))
-            db.execute_query("UPDATE bookings SET status = 'cancelled', refunded_flag = 1 WHERE booking_id = ?", (b['booking_id'],))
-        db.execute_query("DELETE FROM scheduled_screens WHERE screen_id = ?", (screen_id,))
+        """Refund all confirmed bookings of a show and delete it, atomically"""
+        with db.transaction():
+            bookings = db.execute_query("SELECT * FROM bookings WHERE screen_id = ? AND status = 'confirmed'", (screen_id,), fetch_all=True)
+            for b in (bookings or []):
+                user = db.execute_query("SELECT balance FROM users WHERE user_id = ?", (b['user_id'],), fetch_one=True)
+                new_bal = (user['balance'] or 0) + (b['amount'] or 0)
+                db.execute_query("UPDATE users SET balance = ? WHERE user_id = ?", (new_bal, b['user_id']))
+                db.execute_query("UPDATE bookings SET status = 'cancelled', refunded_flag = 1 WHERE booking_id = ?", (b['booking_id'],))
+            db.execute_query("DELETE FROM scheduled_screens WHERE screen_id = ?", (screen_id,))
 
     def admin_delete_show(self, screen_id):
         if not messagebox.askyesno("Confirm", "Delete this show and refund all bookings? This cannot be undone."):
@@ -1980,10 +2140,11 @@ class theatre_booking_app:
         Only performs DB operations. No Tk calls here.
         """
         try:
-            screens = db.execute_query("SELECT screen_id FROM scheduled_screens WHERE movie_id = ?", (movie_id,), fetch_all=True)
-            for s in (screens or []):
-                self._refund_and_delete_screen(s['screen_id'])
-            db.execute_query("DELETE FROM movies WHERE movie_id = ?", (movie_id,))
+            with db.transaction():
+                screens = db.execute_query("SELECT screen_id FROM scheduled_screens WHERE movie_id = ?", (movie_id,), fetch_all=True)
+                for s in (screens or []):
+                    self._refund_and_delete_screen(s['screen_id'])
+                db.execute_query("DELETE FROM movies WHERE movie_id = ?", (movie_id,))
             # signal success back on main thread
             self.root.after(0, lambda: self._on_admin_delete_movie_done(success=True))
         except Exception:
@@ -2005,10 +2166,11 @@ class theatre_booking_app:
     def admin_delete_event(self, event_id):
         if not messagebox.askyesno("Confirm", "Delete this event, unschedule all its shows, and refund all bookings? This cannot be undone."):
             return
-        screens = db.execute_query("SELECT screen_id FROM scheduled_screens WHERE event_id = ?", (event_id,), fetch_all=True)
-        for s in (screens or []):
-            self._refund_and_delete_screen(s['screen_id'])
-        db.execute_query("DELETE FROM events WHERE event_id = ?", (event_id,))
+        with db.transaction():
+            screens = db.execute_query("SELECT screen_id FROM scheduled_screens WHERE event_id = ?", (event_id,), fetch_all=True)
+            for s in (screens or []):
+                self._refund_and_delete_screen(s['screen_id'])
+            db.execute_query("DELETE FROM events WHERE event_id = ?", (event_id,))
         self.show_toast("Event deleted, shows unscheduled, bookings refunded")
         self.refresh_page()
 
@@ -2126,9 +2288,6 @@ class theatre_booking_app:
         actions.pack(fill=tk.X)
         tk.Button(actions, text="➕ Add Theatre", bg='#4CAF50', fg='white', command=lambda: self.open_theatre_form()).pack(side=tk.LEFT)
         
-        # Get all theatres
-        theatres = db.execute_query("SELECT * FROM theatres ORDER BY city, name", fetch_all=True)
-        
         # Create scrollable frame
         canvas = tk.Canvas(content_frame, bg='#1a1a1a', highlightthickness=0)
         scrollbar = ttk.Scrollbar(content_frame, orient="vertical", command=canvas.yview)
@@ -2142,15 +2301,13 @@ class theatre_booking_app:
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
         
-        # Group by city
-        cities = {}
-        for theatre in theatres:
-            if theatre['city'] not in cities:
-                cities[theatre['city']] = []
-            cities[theatre['city']].append(theatre)
-        
-        # Display by city (each city has its own horizontally scrollable table)
-        for city, city_theatres in cities.items():
+        # Theatres a page at a time, in city order; a city's table continues
+        # when its theatres span two pages
+        cols = ["City", "Theatre", "Hall Type", "3D", "IMAX", "Screens", "Seats/Screen", "Actions"]
+        current = {'city': None, 'table': None, 'rows': 0}
+
+        def city_table(city):
+            """Each city has its own horizontally scrollable table"""
             city_frame = tk.Frame(scrollable_frame, bg='#2a2a2a', relief=tk.RAISED, borderwidth=2)
             city_frame.pack(fill=tk.X, padx=10, pady=10)
             tk.Label(city_frame, text=city, font=('Arial', 16, 'bold'), bg='#2a2a2a', fg='white').pack(anchor='w', padx=10, pady=10)
@@ -2166,42 +2323,48 @@ class theatre_booking_app:
 
             # Build table
             header_bg = '#333'
-            cols = ["City", "Theatre", "Hall Type", "3D", "IMAX", "Screens", "Seats/Screen", "Actions"]
             header = tk.Frame(table_inner, bg=header_bg)
             header.grid(row=0, column=0, columnspan=len(cols), sticky='ew')
             for i, col_name in enumerate(cols):
                 tk.Label(header, text=col_name, font=('Arial', 11, 'bold'), bg=header_bg, fg='white', padx=12, pady=8).grid(row=0, column=i, sticky='w')
                 header.grid_columnconfigure(i, weight=1)
 
-            for r, theatre in enumerate(city_theatres, start=1):
-                rowf = tk.Frame(table_inner, bg='#333')
-                rowf.grid(row=r, column=0, sticky='ew', pady=2)
-                for i in range(len(cols)):
-                    rowf.grid_columnconfigure(i, weight=1)
-
-                # Parse schema
-                try:
-                    schema = json.loads(theatre.get('seating_schema_json') or '{}')
-                except Exception:
-                    schema = {}
-                three_d = 'Yes' if schema.get('3d') else 'No'
-                imax = 'Yes' if schema.get('imax') else 'No'
-                screens = schema.get('screens', '')
-                seats = schema.get('seats_per_screen', '')
-
-                tk.Label(rowf, text=theatre.get('city',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=0, sticky='ew')
-                tk.Label(rowf, text=theatre.get('name',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=1, sticky='ew')
-                tk.Label(rowf, text=theatre.get('hall_type',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=2, sticky='ew')
-                tk.Label(rowf, text=three_d, font=('Arial', 10, 'bold'), bg='#333', fg=('#8BC34A' if three_d=='Yes' else '#FF9800'), padx=12, pady=6, anchor='w').grid(row=0, column=3, sticky='ew')
-                tk.Label(rowf, text=imax, font=('Arial', 10, 'bold'), bg='#333', fg=('#8BC34A' if imax=='Yes' else '#FF9800'), padx=12, pady=6, anchor='w').grid(row=0, column=4, sticky='ew')
-                tk.Label(rowf, text=str(screens), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=5, sticky='ew')
-                tk.Label(rowf, text=str(seats), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=6, sticky='ew')
-                actions = tk.Frame(rowf, bg='#333'); actions.grid(row=0, column=7, sticky='e', padx=8)
-                tk.Button(actions, text="Edit", bg='#2196F3', fg='white', width=8, command=lambda th=theatre: self.open_theatre_form(edit=True, theatre=th)).pack(side=tk.LEFT, padx=4)
-                tk.Button(actions, text="Delete", bg='#d32f2f', fg='white', width=8, command=lambda tid=theatre['theatre_id']: self.delete_theatre(tid)).pack(side=tk.LEFT, padx=4)
-
             h_canvas.pack(side='top', fill='both', expand=True)
             x_scroll.pack(side='bottom', fill='x')
+            return table_inner
+
+        def render(theatre, index):
+            if theatre['city'] != current['city']:
+                current.update(city=theatre['city'], table=city_table(theatre['city']), rows=0)
+            current['rows'] += 1
+            rowf = tk.Frame(current['table'], bg='#333')
+            rowf.grid(row=current['rows'], column=0, sticky='ew', pady=2)
+            for i in range(len(cols)):
+                rowf.grid_columnconfigure(i, weight=1)
+
+            # Parse schema
+            try:
+                schema = json.loads(theatre.get('seating_schema_json') or '{}')
+            except Exception:
+                schema = {}
+            three_d = 'Yes' if schema.get('3d') else 'No'
+            imax = 'Yes' if schema.get('imax') else 'No'
+            screens = schema.get('screens', '')
+            seats = schema.get('seats_per_screen', '')
+
+            tk.Label(rowf, text=theatre.get('city',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=0, sticky='ew')
+            tk.Label(rowf, text=theatre.get('name',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=1, sticky='ew')
+            tk.Label(rowf, text=theatre.get('hall_type',''), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=2, sticky='ew')
+            tk.Label(rowf, text=three_d, font=('Arial', 10, 'bold'), bg='#333', fg=('#8BC34A' if three_d=='Yes' else '#FF9800'), padx=12, pady=6, anchor='w').grid(row=0, column=3, sticky='ew')
+            tk.Label(rowf, text=imax, font=('Arial', 10, 'bold'), bg='#333', fg=('#8BC34A' if imax=='Yes' else '#FF9800'), padx=12, pady=6, anchor='w').grid(row=0, column=4, sticky='ew')
+            tk.Label(rowf, text=str(screens), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=5, sticky='ew')
+            tk.Label(rowf, text=str(seats), font=('Arial', 10), bg='#333', fg='white', padx=12, pady=6, anchor='w').grid(row=0, column=6, sticky='ew')
+            actions = tk.Frame(rowf, bg='#333'); actions.grid(row=0, column=7, sticky='e', padx=8)
+            tk.Button(actions, text="Edit", bg='#2196F3', fg='white', width=8, command=lambda th=theatre: self.open_theatre_form(edit=True, theatre=th)).pack(side=tk.LEFT, padx=4)
+            tk.Button(actions, text="Delete", bg='#d32f2f', fg='white', width=8, command=lambda tid=theatre['theatre_id']: self.delete_theatre(tid)).pack(side=tk.LEFT, padx=4)
+
+        self.show_paged(scrollable_frame, lambda token: view_cache.paginate(
+            'cinema_halls', view_cache.PAGE_TABLES['cinema_halls'], "SELECT * FROM theatres", None, ('city', 'name', 'theatre_id'), token=token), render)
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
@@ -2278,10 +2441,13 @@ class theatre_booking_app:
         tk.Label(content_frame, text="👥 Employee Management", font=('Arial', 24, 'bold'),
                 bg='#1a1a1a', fg='white').pack(pady=(10,12))
         
-        # Get all employees
-        employees = db.execute_query("SELECT * FROM employees ORDER BY city, theatre", fetch_all=True)
+        # Employees a page at a time
+        def fetch(token):
+            return view_cache.paginate('employees', view_cache.PAGE_TABLES['employees'], "SELECT * FROM employees", None,
+                                       ('city', 'theatre', 'employee_id'), token=token)
+        first_page = fetch(None)
         
-        if not employees:
+        if not first_page[0]:
             tk.Label(content_frame, text="No employees found", font=('Arial', 14), 
                     bg='#1a1a1a', fg='#888').pack(pady=50)
             return
@@ -2313,9 +2479,9 @@ class theatre_booking_app:
             header.grid_columnconfigure(i, weight=1)
 
         # Rows
-        for r, emp in enumerate(employees, start=1):
+        def render(emp, index):
             row = tk.Frame(table, bg='#2a2a2a')
-            row.grid(row=r, column=0, sticky='ew', pady=2)
+            row.grid(row=index + 1, column=0, sticky='ew', pady=2)
             for i in range(6):
                 row.grid_columnconfigure(i, weight=1)
             tk.Label(row, text=emp.get('name',''), font=('Arial', 10), bg='#2a2a2a', fg='white', padx=10, pady=6, anchor='w').grid(row=0, column=0, sticky='ew')
@@ -2327,12 +2493,14 @@ class theatre_booking_app:
             actions.grid(row=0, column=5, sticky='e', padx=8)
             tk.Button(actions, text="Edit", bg='#2196F3', fg='white', command=lambda e=emp: self.edit_employee_popup(e)).pack(side=tk.LEFT, padx=4)
             tk.Button(actions, text="Remove", bg='#d32f2f', fg='white', command=lambda eid=emp.get('employee_id'): self.delete_employee(eid)).pack(side=tk.LEFT, padx=4)
+        self.show_paged(scrollable_frame, fetch, render, first_page)
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
     
     def show_screen_manager(self):
         """Show screen manager (delegated)"""
+        pages_admin = lazy.page('pages_admin')
         if pages_admin:
             return pages_admin.show_screen_manager(self)
         # Fallback if import failed
@@ -2340,6 +2508,7 @@ class theatre_booking_app:
 
     def show_manage_movies(self):
         """Show movie management (delegated)"""
+        pages_admin = lazy.page('pages_admin')
         if pages_admin and hasattr(pages_admin, 'show_manage_movies'):
             return pages_admin.show_manage_movies(self)
         messagebox.showerror("Error", "Admin module not available")
@@ -2396,7 +2565,11 @@ class theatre_booking_app:
                         return
                 except Exception:
                     pass
-            db.execute_query("UPDATE scheduled_screens SET start_time = ?, end_time = ? WHERE screen_id = ?", (new_start.isoformat(), new_end.isoformat(), screen_id))
+            try:
+                db.execute_query("UPDATE scheduled_screens SET start_time = ?, end_time = ? WHERE screen_id = ?", (new_start.isoformat(), new_end.isoformat(), screen_id))
+            except db.CityMovieConflictError:
+                messagebox.showerror("Rule", "This movie already has a show scheduled in this city on the selected date")
+                return
             self.show_toast("Schedule updated")
             popup.destroy()
             self.refresh_page()
@@ -2406,20 +2579,14 @@ class theatre_booking_app:
     def unschedule_screen(self, screen_id):
         if not messagebox.askyesno("Confirm", "Unschedule this show and refund all bookings?"):
             return
-        bookings = db.execute_query("SELECT * FROM bookings WHERE screen_id = ? AND status = 'confirmed'", (screen_id,), fetch_all=True)
-        for b in bookings:
-            user = db.execute_query("SELECT balance FROM users WHERE user_id = ?", (b['user_id'],), fetch_one=True)
-            new_bal = (user['balance'] or 0) + (b['amount'] or 0)
-            db.execute_query("UPDATE users SET balance = ? WHERE user_id = ?", (new_bal, b['user_id']))
-            db.execute_query("UPDATE bookings SET status = 'cancelled', refunded_flag = 1 WHERE booking_id = ?", (b['booking_id'],))
-        db.execute_query("DELETE FROM scheduled_screens WHERE screen_id = ?", (screen_id,))
+        self._refund_and_delete_screen(screen_id)
         self.show_toast("Show unscheduled and refunded")
         self.refresh_page()
 
     def admin_schedule_screen_popup(self, city_default=None, date_default=None, on_success=None):
         popup = tk.Toplevel(self.root)
         popup.title("Schedule New Show")
-        popup.geometry("520x520")
+        popup.geometry("520x580")
         popup.configure(bg='#1a1a1a')
 
         # Inputs
@@ -2482,6 +2649,10 @@ class theatre_booking_app:
         tk.Entry(f_prices, textvariable=pc_var, width=8).pack(side=tk.LEFT, padx=4)
         tk.Entry(f_prices, textvariable=pp_var, width=8).pack(side=tk.LEFT, padx=4)
 
+        tk.Label(popup, text="Repeat daily until (YYYY-MM-DD, optional)", bg='#1a1a1a', fg='white').pack(pady=(10,2))
+        repeat_var = tk.StringVar(value='')
+        tk.Entry(popup, textvariable=repeat_var).pack()
+
         def save_new():
             if not theatre_var.get() or not movie_var.get():
                 messagebox.showerror("Error", "Select theatre and movie")
@@ -2493,27 +2664,64 @@ class theatre_booking_app:
                 start_dt = datetime.fromisoformat(f"{date_var.get()}T{st_var.get()}:00")
                 end_dt = datetime.fromisoformat(f"{date_var.get()}T{et_var.get()}:00")
                 pe = float(pe_var.get()); pc = float(pc_var.get()); pp = float(pp_var.get())
+                repeat_until = repeat_var.get().strip() or None
+                if repeat_until:
+                    datetime.strptime(repeat_until, '%Y-%m-%d')
             except Exception:
                 messagebox.showerror("Error", "Invalid input values")
                 return
             if end_dt <= start_dt:
                 messagebox.showerror("Error", "End time must be after start time")
                 return
+            if repeat_until:
+                # recurring: store a template; its shows are written lazily up to
+                # the horizon, each day checked against the rules as it is written
+                try:
+                    _, skipped = show_templates.create_template(
+                        theatre_id, screen_number, [st_var.get()], date_var.get(), repeat_until,
+                        movie_id=movie_id, duration_seconds=int((end_dt - start_dt).total_seconds()),
+                        prices=(pe, pc, pp))
+                except (ValueError, db.CityMovieConflictError) as e:
+                    messagebox.showerror("Error", str(e))
+                    return
+                if skipped:
+                    lines = [f"{v['start_time'][:16].replace('T', ' ')}: {'; '.join(v['reasons'])}" for v in skipped[:10]]
+                    if len(skipped) > 10:
+                        lines.append(f"... and {len(skipped) - 10} more")
+                    messagebox.showwarning("Recurring show scheduled",
+                                           f"{len(skipped)} show(s) were not scheduled and will be retried:\n\n" + "\n".join(lines))
+                else:
+                    self.show_toast("Recurring show scheduled")
+                popup.destroy()
+                if callable(on_success):
+                    on_success()
+                return
             # 1) Same theatre+screen conflict check
             if sched is not None and sched.has_conflict(theatre_id, screen_number, start_dt.isoformat(), end_dt.isoformat()):
-                messagebox.showerror("Conflict", "Overlaps with another show on the same screen")
+                duration_minutes = int((end_dt - start_dt).total_seconds() // 60)
+                suggestion = sched.suggest_next_slot(theatre_id, screen_number, start_dt.isoformat(), duration_minutes)
+                if suggestion:
+                    messagebox.showerror("Conflict", f"Overlaps with another show on the same screen. Next free slot: {suggestion[:16].replace('T',' ')}")
+                else:
+                    messagebox.showerror("Conflict", "Overlaps with another show on the same screen")
                 return
             # 2) City+movie per-day uniqueness
             if sched is not None and sched.has_city_movie_for_date(city_var.get(), movie_id, start_dt.isoformat()):
                 messagebox.showerror("Rule", "This movie already has a show scheduled in this city on the selected date")
                 return
-            # Insert with default 10x10 seat map of zeros
-            seat_map = [[0 for _ in range(10)] for _ in range(10)]
-            db.execute_query(
-                """INSERT INTO scheduled_screens (theatre_id, movie_id, screen_number, start_time, end_time, seat_map_json, price_economy, price_central, price_premium)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (theatre_id, movie_id, screen_number, start_dt.isoformat(), end_dt.isoformat(), json.dumps(seat_map), pe, pc, pp)
-            )
+            # Insert with an empty seat bitset sized from the theatre's seating schema
+            theatre = db.execute_query("SELECT seating_schema_json FROM theatres WHERE theatre_id = ?", (theatre_id,), fetch_one=True)
+            hall_rows, hall_cols = seat_codec.layout_from_schema(theatre['seating_schema_json'] if theatre else None)
+            try:
+                db.execute_query(
+                    """INSERT INTO scheduled_screens (theatre_id, movie_id, screen_number, start_time, end_time, seat_bits, seat_rows, seat_cols, price_economy, price_central, price_premium)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (theatre_id, movie_id, screen_number, start_dt.isoformat(), end_dt.isoformat(), seat_codec.empty(hall_rows, hall_cols), hall_rows, hall_cols, pe, pc, pp)
+                )
+            except db.CityMovieConflictError:
+                # another admin scheduled it between our check and the insert
+                messagebox.showerror("Rule", "This movie already has a show scheduled in this city on the selected date")
+                return
             self.show_toast("Show scheduled")
             popup.destroy()
             if callable(on_success):
@@ -2523,6 +2731,7 @@ class theatre_booking_app:
     
     def show_admin_feedback(self):
         """Show admin feedback page (delegated)"""
+        pages_admin = lazy.page('pages_admin')
         if pages_admin:
             return pages_admin.show_admin_feedback(self)
         messagebox.showerror("Error", "Admin module not available")
@@ -2550,4 +2759,7 @@ class theatre_booking_app:
 if __name__ == "__main__":
     root = tk.Tk()
     app = theatre_booking_app(root)
+    if '--profile-startup' in sys.argv:
+        # runs once the login window has been drawn
+        root.after_idle(lambda: print(lazy.report(time.perf_counter() - STARTED_AT), flush=True))
     root.mainloop()
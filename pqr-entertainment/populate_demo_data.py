@@ -4,6 +4,7 @@ Run this script to add sample movies, events, theatres, and schedules
 """
 
 from dbwrap import db
+from backend import seats as seat_codec
 import json
 from datetime import datetime, timedelta
 import os
@@ -37,6 +38,7 @@ def populate_theatres():
         ("Pune",    "Tilak Smarak Mandir"),
         ("Bangalore","Rangashankara"),
     ]
+    rows = []
     for city, name in stage_halls:
         schema = {
             'screens': 5,
@@ -44,10 +46,7 @@ def populate_theatres():
             '3d': False,
             'imax': False,
         }
-        db.execute_query(
-            "INSERT INTO theatres (city, name, hall_type, seating_schema_json) VALUES (?, ?, ?, ?)",
-            (city, name, 'stage', json.dumps(schema))
-        )
+        rows.append((city, name, 'stage', json.dumps(schema)))
     
     for theatre in theatres_data:
         schema = {
@@ -56,10 +55,11 @@ def populate_theatres():
             '3d': theatre['3d'],
             'imax': theatre['imax']
         }
-        db.execute_query(
-            "INSERT INTO theatres (city, name, hall_type, seating_schema_json) VALUES (?, ?, ?, ?)",
-            (theatre['city'], theatre['theatre_name'], 'cinema', json.dumps(schema))
-        )
+        rows.append((theatre['city'], theatre['theatre_name'], 'cinema', json.dumps(schema)))
+    db.execute_many(
+        "INSERT INTO theatres (city, name, hall_type, seating_schema_json) VALUES (?, ?, ?, ?)",
+        rows
+    )
     
     print("✓ Theatres populated")
 
@@ -273,16 +273,16 @@ def populate_demo_producer_and_movies():
         },
     ]
     
-    for movie in movies:
-        db.execute_query(
-            """INSERT INTO movies (producer_id, title, description, actors_json, languages_json, 
-               duration_seconds, viewer_rating, cover_image_path, genres_json, average_rating, upload_date)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (producer_id, movie['title'], movie['description'], json.dumps(movie['actors']),
-             json.dumps(movie['languages']), movie['duration_seconds'], movie['viewer_rating'],
-             f"assets/{movie['title'].lower().replace(' ', '_').replace(':', '')}.jpg",
-             json.dumps(movie['genres']), movie['average_rating'], datetime.now().isoformat())
-        )
+    db.execute_many(
+        """INSERT INTO movies (producer_id, title, description, actors_json, languages_json, 
+           duration_seconds, viewer_rating, cover_image_path, genres_json, average_rating, upload_date)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [(producer_id, movie['title'], movie['description'], json.dumps(movie['actors']),
+          json.dumps(movie['languages']), movie['duration_seconds'], movie['viewer_rating'],
+          f"assets/{movie['title'].lower().replace(' ', '_').replace(':', '')}.jpg",
+          json.dumps(movie['genres']), movie['average_rating'], datetime.now().isoformat())
+         for movie in movies]
+    )
     
     # Update provide-these.txt with image requirements (inside pqr-entertainment)
     assets_req_path = os.path.join(os.path.dirname(__file__), 'provide-these.txt')
@@ -342,16 +342,16 @@ def populate_demo_events():
         },
     ]
     
-    for event in events:
-        db.execute_query(
-            """INSERT INTO events (host_id, title, description, performers_json, venue,
-               duration_seconds, date, time, cover_image_path, genres_json, average_rating, upload_date)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (host_id, event['title'], event['description'], json.dumps(event['performers']),
-             event['venue'], event['duration_seconds'], event['date'], event['time'],
-             f"assets/{event['title'].lower().replace(' ', '_')}.jpg",
-             json.dumps(event['genres']), event['average_rating'], datetime.now().isoformat())
-        )
+    db.execute_many(
+        """INSERT INTO events (host_id, title, description, performers_json, venue,
+           duration_seconds, date, time, cover_image_path, genres_json, average_rating, upload_date)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [(host_id, event['title'], event['description'], json.dumps(event['performers']),
+          event['venue'], event['duration_seconds'], event['date'], event['time'],
+          f"assets/{event['title'].lower().replace(' ', '_')}.jpg",
+          json.dumps(event['genres']), event['average_rating'], datetime.now().isoformat())
+         for event in events]
+    )
     
     # Update provide-these.txt (inside pqr-entertainment)
     assets_req_path = os.path.join(os.path.dirname(__file__), 'provide-these.txt')
@@ -365,7 +365,8 @@ def populate_demo_events():
 
 
 def populate_scheduled_screens():
-    """Create scheduled screens for next 3 days"""
+    """Create scheduled screens for today + next 3 days: every movie once per
+    city per day (the one-show-per-movie-per-city-per-day rule)"""
     # Get all movies
     movies = db.execute_query("SELECT movie_id FROM movies", fetch_all=True)
     
@@ -375,66 +376,49 @@ def populate_scheduled_screens():
         fetch_all=True
     )
     
-    # Create base schedules for next 3 days (existing logic)
-    for day_offset in range(4):  # Today + next 3 days
-        date = datetime.now() + timedelta(days=day_offset)
-        for theatre in theatres:
-            for screen_num in range(1, 5+1):  # 5 screens
-                movie_idx = (screen_num + day_offset) % len(movies)
-                movie_id = movies[movie_idx]['movie_id']
-                # Morning/Afternoon/Evening
-                seat_map = [[0 for _ in range(10)] for _ in range(10)]
-                for st, et, pe, pc, pp in [
-                    ((10,0,0), (13,0,0), 150.0, 200.0, 300.0),
-                    ((14,30,0), (17,30,0), 150.0, 200.0, 300.0),
-                    ((19,0,0), (22,0,0), 200.0, 250.0, 350.0),
-                ]:
-                    start_time = date.replace(hour=st[0], minute=st[1], second=st[2]).isoformat()
-                    end_time = date.replace(hour=et[0], minute=et[1], second=et[2]).isoformat()
-                    db.execute_query(
-                        """INSERT INTO scheduled_screens (theatre_id, movie_id, screen_number,
-                           start_time, end_time, seat_map_json, price_economy, price_central, price_premium)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                        (theatre['theatre_id'], movie_id, screen_num, start_time, end_time,
-                         json.dumps(seat_map), pe, pc, pp)
-                    )
-
-    # Coverage step: ensure every movie appears in every city each day (at least one show)
+    # Rows are collected in memory and written with one executemany;
+    # covered tracks (city, movie_id, date) so a rerun adds nothing twice
+    rows = []
+    covered = set()
+    existing = db.execute_query(
+        """SELECT DISTINCT city, movie_id, show_date FROM scheduled_screens
+           WHERE movie_id IS NOT NULL""",
+        fetch_all=True
+    ) or []
+    for e in existing:
+        covered.add((e['city'], e['movie_id'], datetime.fromisoformat(e['show_date']).date()))
+    
+    # Morning/Afternoon/Evening
+    slots = [
+        ((10,0,0), (13,0,0), 150.0, 200.0, 300.0),
+        ((14,30,0), (17,30,0), 150.0, 200.0, 300.0),
+        ((19,0,0), (22,0,0), 200.0, 250.0, 350.0),
+    ]
     cities = sorted({t['city'] for t in theatres})
-    timeslots = [(12, 0, 0), (16, 0, 0), (20, 0, 0)]  # fallback times
-    for day_offset in range(4):
-        date = datetime.now() + timedelta(days=day_offset)
+    for day_offset in range(4):  # Today + next 3 days
+        date = (datetime.now() + timedelta(days=day_offset)).replace(hour=0, minute=0, second=0, microsecond=0)
         for city in cities:
-            city_theatres = [t for t in theatres if t['city'] == city]
-            if not city_theatres:
-                continue
+            screens = [(t['theatre_id'], n) for t in theatres if t['city'] == city for n in range(1, 5+1)]
             for mi, m in enumerate(movies):
-                # Check if any show exists for this movie in this city on this date
-                existing = db.execute_query(
-                    """
-                    SELECT 1 FROM scheduled_screens ss
-                    JOIN theatres t ON ss.theatre_id = t.theatre_id
-                    WHERE t.city = ? AND ss.movie_id = ? AND DATE(ss.start_time) = DATE(?)
-                    LIMIT 1
-                    """,
-                    (city, m['movie_id'], date.isoformat()), fetch_one=True
-                )
-                if existing:
+                if (city, m['movie_id'], date.date()) in covered:
+                    continue
+                # rotate movies over the city's screens day by day; movies that
+                # share a screen get different slots, so no screen is double-booked
+                turn, pos = divmod(mi + day_offset * 7, len(screens))
+                if turn >= len(slots):
                     continue
-                # Insert a single show for coverage
-                theatre = city_theatres[mi % len(city_theatres)]
-                screen_num = (mi % 5) + 1
-                h, mn, s = timeslots[mi % len(timeslots)]
-                start_time = date.replace(hour=h, minute=mn, second=s)
-                end_time = start_time + timedelta(hours=3)
-                seat_map = [[0 for _ in range(10)] for _ in range(10)]
-                db.execute_query(
-                    """INSERT INTO scheduled_screens (theatre_id, movie_id, screen_number,
-                       start_time, end_time, seat_map_json, price_economy, price_central, price_premium)
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (theatre['theatre_id'], m['movie_id'], screen_num, start_time.isoformat(), end_time.isoformat(),
-                     json.dumps(seat_map), 150.0, 220.0, 320.0)
-                )
+                covered.add((city, m['movie_id'], date.date()))
+                theatre_id, screen_num = screens[pos]
+                st, et, pe, pc, pp = slots[(turn + pos) % len(slots)]
+                start_time = date.replace(hour=st[0], minute=st[1], second=st[2]).isoformat()
+                end_time = date.replace(hour=et[0], minute=et[1], second=et[2]).isoformat()
+                rows.append((theatre_id, m['movie_id'], screen_num, start_time, end_time, pe, pc, pp))
+    db.execute_many(
+        """INSERT INTO scheduled_screens (theatre_id, movie_id, screen_number,
+           start_time, end_time, price_economy, price_central, price_premium)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows
+    )
     print("✓ Scheduled screens populated (all movies covered in each city)")
 
 
@@ -445,6 +429,7 @@ def populate_employees():
     
     theatres_data = db.execute_query("SELECT name, city FROM theatres", fetch_all=True)
     
+    rows = []
     for theatre in theatres_data[:10]:  # Add employees for first 10 theatres
         for designation in designations:
             salary = {
@@ -455,11 +440,12 @@ def populate_employees():
                 'Cleaner': 15000
             }[designation]
             
-            db.execute_query(
-                """INSERT INTO employees (name, designation, salary, city, theatre)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (f"Employee {designation}", designation, salary, theatre['city'], theatre['name'])
-            )
+            rows.append((f"Employee {designation}", designation, salary, theatre['city'], theatre['name']))
+    db.execute_many(
+        """INSERT INTO employees (name, designation, salary, city, theatre)
+           VALUES (?, ?, ?, ?, ?)""",
+        rows
+    )
     
     print("✓ Employees populated")
 
@@ -476,11 +462,10 @@ def populate_users():
         ('grace', 'password', 'user', 'Grace Lee', 'grace@example.com', 900),
         ('henry', 'password', 'user', 'Henry Ford', 'henry@example.com', 1100),
     ]
-    for u in users:
-        db.execute_query(
-            "INSERT OR IGNORE INTO users (username, password, role, name, email, balance) VALUES (?, ?, ?, ?, ?, ?)",
-            u
-        )
+    db.execute_many(
+        "INSERT OR IGNORE INTO users (username, password, role, name, email, balance) VALUES (?, ?, ?, ?, ?, ?)",
+        users
+    )
     print("✓ Users populated")
 
 
@@ -497,47 +482,48 @@ def populate_event_schedules():
     if not theatres:
         print("! No theatres found for events")
         return
+    rows = []
     for day_offset in range(1, 5):
-        date = datetime.now() + timedelta(days=day_offset)
+        date = (datetime.now() + timedelta(days=day_offset)).replace(hour=0, minute=0, second=0, microsecond=0)
         for th in theatres[:6]:  # a subset to avoid explosion
             for idx, ev in enumerate(events[:3]):  # few events per theatre
                 start_dt = date.replace(hour=18 + (idx % 3)*2, minute=0, second=0)
                 end_dt = start_dt + timedelta(hours=2)
                 start_time = start_dt.isoformat()
                 end_time = end_dt.isoformat()
-                seat_map = [[0 for _ in range(10)] for _ in range(10)]
-                db.execute_query(
-                    """INSERT INTO scheduled_screens (theatre_id, event_id, screen_number, start_time, end_time, seat_map_json, price_economy, price_central, price_premium)
-                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (th['theatre_id'], ev['event_id'], (idx % 5) + 1, start_time, end_time, json.dumps(seat_map), 200.0, 300.0, 450.0)
-                )
+                rows.append((th['theatre_id'], ev['event_id'], (idx % 5) + 1, start_time, end_time, 200.0, 300.0, 450.0))
+    db.execute_many(
+        """INSERT INTO scheduled_screens (theatre_id, event_id, screen_number, start_time, end_time, price_economy, price_central, price_premium)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows
+    )
     print("✓ Event schedules populated")
 
 
 def populate_random_bookings():
     """Generate random bookings with limited volume for speed; update seat maps with progress logs"""
     users = db.execute_query("SELECT user_id, balance FROM users WHERE role='user'", fetch_all=True)
-    screens = db.execute_query("SELECT screen_id, seat_map_json, price_economy, price_central, price_premium FROM scheduled_screens", fetch_all=True)
+    screens = db.execute_query("SELECT screen_id, seat_bits, seat_rows, seat_cols, price_economy, price_central, price_premium FROM scheduled_screens", fetch_all=True)
     if not users or not screens:
         print("! Skipped bookings (no users or screens)")
         return
     # Limit processed screens to keep runtime reasonable
     max_screens = min(250, len(screens))
     screens = screens[:max_screens]
+    booking_rows = []
+    seat_bits_rows = []
     for idx, s in enumerate(screens, start=1):
         # pick 3-8 seats to book
         to_book = random.randint(3, 8)
-        try:
-            seat_map = json.loads(s['seat_map_json'])
-        except:
-            seat_map = [[0 for _ in range(10)] for _ in range(10)]
+        seat_bits = s['seat_bits']
+        hall_rows, hall_cols = s['seat_rows'], s['seat_cols']
         booked_now = 0
         attempts = 0
         while booked_now < to_book and attempts < 80:
             attempts += 1
-            r = random.randint(0,9)
-            c = random.randint(0,9)
-            if seat_map[r][c] == 1:
+            r = random.randint(0, hall_rows - 1)
+            c = random.randint(0, hall_cols - 1)
+            if seat_codec.is_booked(seat_bits, hall_cols, r, c):
                 continue
             # determine price based on row as per UI logic
             if r < 3:
@@ -546,21 +532,24 @@ def populate_random_bookings():
                 price = s['price_central'] or 300
             else:
                 price = s['price_economy'] or 200
-            seat_label = chr(ord('J') - r) + str(c+1)
+            seat_label = seat_codec.seat_label(r, c, hall_rows)
             user = random.choice(users)
             # insert booking, do not enforce wallet deduction here (demo data)
             when = datetime.now() - timedelta(days=random.randint(0, 14))
-            db.execute_query(
-                """INSERT INTO bookings (user_id, screen_id, seat, amount, status, refunded_flag, booking_date)
-                       VALUES (?, ?, ?, ?, 'confirmed', 0, ?)""",
-                (user['user_id'], s['screen_id'], seat_label, float(price), when.isoformat())
-            )
-            seat_map[r][c] = 1
+            booking_rows.append((user['user_id'], s['screen_id'], seat_label, float(price), when.isoformat()))
+            seat_bits = seat_codec.set_seats(seat_bits, hall_cols, [(r, c)])
             booked_now += 1
         # update seat map
-        db.execute_query("UPDATE scheduled_screens SET seat_map_json = ? WHERE screen_id = ?", (json.dumps(seat_map), s['screen_id']))
+        seat_bits_rows.append((seat_bits, seat_codec.count_booked(seat_bits), s['screen_id']))
         if idx % 50 == 0 or idx == max_screens:
-            print(f"  - Bookings progress: {idx}/{max_screens} screens updated")
+            print(f"  - Bookings progress: {idx}/{max_screens} screens prepared")
+    with db.transaction():
+        db.execute_many(
+            """INSERT INTO bookings (user_id, screen_id, seat, amount, status, refunded_flag, booking_date)
+                   VALUES (?, ?, ?, ?, 'confirmed', 0, ?)""",
+            booking_rows
+        )
+        db.execute_many("UPDATE scheduled_screens SET seat_bits = ?, seats_booked = ?, seat_version = seat_version + 1 WHERE screen_id = ?", seat_bits_rows)
     print("✓ Random bookings populated and seat maps updated")
 
 
@@ -570,12 +559,15 @@ def populate_watchlists_and_feedbacks():
     movies = db.execute_query("SELECT movie_id FROM movies", fetch_all=True)
     events = db.execute_query("SELECT event_id FROM events", fetch_all=True)
     if users:
+        movie_rows = []
+        event_rows = []
+        feedback_rows = []
         for u in users:
             # 3 random movies and 2 random events
             for m in random.sample(movies, min(3, len(movies))):
-                db.execute_query("INSERT INTO watchlist (user_id, movie_id) VALUES (?, ?)", (u['user_id'], m['movie_id']))
+                movie_rows.append((u['user_id'], m['movie_id']))
             for e in random.sample(events, min(2, len(events))):
-                db.execute_query("INSERT INTO watchlist (user_id, event_id) VALUES (?, ?)", (u['user_id'], e['event_id']))
+                event_rows.append((u['user_id'], e['event_id']))
             # feedback
             if random.random() < 0.6:
                 msg = random.choice([
@@ -585,10 +577,14 @@ def populate_watchlists_and_feedbacks():
                     "Payment was smooth",
                     "Please add more shows in my city",
                 ])
-                db.execute_query(
-                    "INSERT INTO feedbacks (user_id, text, timestamp, read_flag) VALUES (?, ?, ?, 0)",
-                    (u['user_id'], msg, datetime.now().isoformat())
-                )
+                feedback_rows.append((u['user_id'], msg, datetime.now().isoformat()))
+        with db.transaction():
+            db.execute_many("INSERT INTO watchlist (user_id, movie_id) VALUES (?, ?)", movie_rows)
+            db.execute_many("INSERT INTO watchlist (user_id, event_id) VALUES (?, ?)", event_rows)
+            db.execute_many(
+                "INSERT INTO feedbacks (user_id, text, timestamp, read_flag) VALUES (?, ?, ?, 0)",
+                feedback_rows
+            )
     print("✓ Watchlists and feedbacks populated")
 
 
@@ -75,7 +75,32 @@ def unbook_in_json(obj: Any) -> Any:
     return obj
 
 
+def has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    cur = conn.cursor()
+    cur.execute(f'PRAGMA table_info({table})')
+    return any(r[1] == column for r in cur.fetchall())
+
+
+def reset_seat_bits(conn: sqlite3.Connection) -> int:
+    # seat_bits is a bitset of (seat_rows * seat_cols) bits; all-zero = all free
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='seat_holds'")
+    if cur.fetchone():
+        cur.execute('DELETE FROM seat_holds')
+    counters = ', seats_booked = 0' if has_column(conn, 'scheduled_screens', 'seats_booked') else ''
+    if has_column(conn, 'scheduled_screens', 'seat_version'):
+        counters += ', seat_version = seat_version + 1'
+    cur.execute(
+        'UPDATE scheduled_screens SET seat_bits = zeroblob((seat_rows * seat_cols + 7) / 8)' + counters + ' '
+        'WHERE seat_bits IS NULL OR seat_bits <> zeroblob((seat_rows * seat_cols + 7) / 8)'
+    )
+    return cur.rowcount
+
+
 def reset_seat_maps(conn: sqlite3.Connection) -> int:
+    if has_column(conn, 'scheduled_screens', 'seat_bits'):
+        return reset_seat_bits(conn)
+    # databases not yet migrated still keep seats in seat_map_json
     cur = conn.cursor()
     cur.execute('SELECT screen_id, seat_map_json FROM scheduled_screens')
     rows = cur.fetchall()
@@ -131,7 +156,7 @@ def main():
             print('\nDry-run only. Will:')
             print(" - Upsert admin user '" + args.username + "'")
             print(' - Delete all rows from bookings (if table exists)')
-            print(' - Traverse seat_map_json and mark all seats available')
+            print(' - Clear seat_bits (or seat_map_json on older databases) so all seats are available')
             print('\nRe-run with --execute to apply.')
             return
 
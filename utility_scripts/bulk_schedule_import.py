@@ -0,0 +1,78 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(HERE), 'pqr-entertainment'))
+
+from backend import bulk_schedule  # noqa: E402
+
+# bulk import needs show_date (migration 1) and seat_rows/seat_cols (migration 2)
+MIN_SCHEMA_VERSION = 2
+
+
+def resolve_db(path_arg: str, here: str) -> str:
+    if os.path.isabs(path_arg):
+        return path_arg if os.path.exists(path_arg) else ''
+    cands = [
+        os.path.abspath(path_arg),
+        os.path.join(here, path_arg),
+        os.path.join(here, os.path.basename(path_arg)),
+    ]
+    for c in cands:
+        if os.path.exists(c):
+            return c
+    return ''
+
+
+def main():
+    p = argparse.ArgumentParser(description='Validate a CSV/JSON week plan of shows and insert the valid ones in one transaction.')
+    p.add_argument('plan', help='CSV (with header row) or .json file of shows')
+    p.add_argument('--db', default='pqr-entertainment/tbms.db')
+    p.add_argument('--strict', action='store_true', help='Insert nothing if any row is rejected')
+    p.add_argument('--max-report', type=int, default=50, help='Violations to print (0 = all)')
+    p.add_argument('--execute', action='store_true', help='Insert the shows; without it, dry-run only')
+    args = p.parse_args()
+
+    db_path = resolve_db(args.db, HERE)
+    if not db_path:
+        print('Database file not found.')
+        sys.exit(1)
+    try:
+        plan = bulk_schedule.read_plan(args.plan)
+    except Exception as e:
+        print(f'Could not read plan: {e}')
+        sys.exit(1)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < MIN_SCHEMA_VERSION:
+            print(f'Database schema version {version} is too old; start the app once to migrate it.')
+            sys.exit(1)
+        report = bulk_schedule.import_plan(conn, plan, strict=args.strict, dry_run=not args.execute)
+    except sqlite3.Error as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+    finally:
+        conn.close()
+
+    print(f'Database: {db_path}')
+    print(f"Rows in plan: {report['total']}  valid: {report['valid']}  rejected: {len(report['violations'])}")
+    shown = report['violations'] if args.max_report <= 0 else report['violations'][:args.max_report]
+    for v in shown:
+        print(f"  row {v['row']}: {'; '.join(v['reasons'])}")
+    if len(shown) < len(report['violations']):
+        print(f"  ... {len(report['violations']) - len(shown)} more")
+    if not args.execute:
+        print('\nDry-run only. Re-run with --execute to insert the valid rows.')
+    elif args.strict and report['violations']:
+        print('\nStrict mode: nothing inserted.')
+    else:
+        print(f"\nInserted {report['inserted']} shows.")
+
+
+if __name__ == '__main__':
+    main()